@@ -12,14 +12,16 @@ import numpy as np
 import math
 
 from plasma_physics.pysrc.theory.coulomb_collisions.coulomb_collision import ChargedParticle
-from plasma_physics.pysrc.simulation.pic.algo.geometry import vector_ops
 from plasma_physics.pysrc.utils.physical_constants import PhysicalConstants
+from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.diagnostics import SimulationRecorder
+from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.timestep_control import run_adaptive_steps
+from plasma_physics.pysrc.utils.random_streams import get_generator
 
 
 class AbeCoulombCollisionModel(object):
     def __init__(self, N_1, particle_1, w_1=1,
                  N_2=None, particle_2=None, w_2=None, freeze_species_2=False,
-                 coulomb_logarithm=10.0):
+                 coulomb_logarithm=10.0, rng=None, volume=1.0):
         """
         Used to simulate collisions between two particle species
 
@@ -31,6 +33,8 @@ class AbeCoulombCollisionModel(object):
         w_2: number of particles per simulated particle of species 2
         freeze_species_2: boolean to determine if second species is
                           frozen so that its velocities are not updated
+        rng: numpy Generator or seed used to sample collisions, defaulting to a seed of 1
+        volume: volume occupied by the particles, used to get the number densities of each species
         """
         assert isinstance(N_1, int) or isinstance(N_1, long), N_1
         assert isinstance(w_1, int) or isinstance(w_1, long), w_1
@@ -38,13 +42,14 @@ class AbeCoulombCollisionModel(object):
         assert N_2 is None or isinstance(N_2, int) or isinstance(N_2, long), N_2
         assert w_2 is None or isinstance(w_2, int) or isinstance(w_2, long), w_2
         assert particle_2 is None or isinstance(particle_2, ChargedParticle), particle_2
+        assert volume > 0.0, volume
 
         # Define first particle species
         self.__m_1 = particle_1.m
         self.__q_1 = particle_1.q
         self.__N_1 = N_1
         self.__w_1 = w_1
-        self.__n_1 = N_1 * w_1
+        self.__n_1 = N_1 * w_1 / volume
 
         # Define second particle species, if it exists
         if particle_2 is not None:
@@ -53,7 +58,7 @@ class AbeCoulombCollisionModel(object):
             self.__q_2 = particle_2.q
             self.__N_2 = N_2
             self.__w_2 = w_2
-            self.__n_2 = w_2 * N_2
+            self.__n_2 = w_2 * N_2 / volume
             self.__m_eff = self.__m_1 * self.__m_2 / (self.__m_1 + self.__m_2)
             self.__freeze_species_2 = freeze_species_2
 
@@ -75,78 +80,87 @@ class AbeCoulombCollisionModel(object):
         # Coulomb logarithm is currently fixed in method
         self.__coulomb_logarithm = coulomb_logarithm
 
-    def __randomise_velocities(self, vel):
+        # delta squared of all pairs in the last call to calculate_batch_post_collision_velocities
+        self.collision_parameters = None
+
+        self.rng = get_generator(1 if rng is None else rng)
+
+    def __get_pairs(self):
         """
-        Randomise the addresses of particles from each species. In such a way,
-        pairs of particles in adjacent indices are formed for collisions. The 
-        randomised velocities need to be unshuffled. 
+        Randomly pair particles for collisions. A single random permutation of each species is used to gather the
+        velocities of each pair, and to scatter the post collisional velocities back to the original ordering.
 
-        vel: Nx3 array of velocity components for particles, the velocities
-             contain the particles of each species sequentially, N = n_1 + n_2
+        return: indices of the first and second particle of each pair
         """
-        current_state = np.random.get_state()
-        indices = np.asarray(range(vel.shape[0]))
         if self.__single_species:
-            np.random.shuffle(vel)
-            np.random.set_state(current_state)
-
-            np.random.shuffle(indices)
+            perm = self.rng.permutation(self.__N_1)
+            return perm[0::2], perm[1::2]
         else:
-            np.random.shuffle(vel[:self.__N_1, :])
-            np.random.shuffle(vel[self.__N_1:, :])
-            np.random.set_state(current_state)
-
-            np.random.shuffle(indices[:self.__N_1])
-            np.random.shuffle(indices[self.__N_1:])
-
-        return indices
+            return self.rng.permutation(self.__N_1), self.__N_1 + self.rng.permutation(self.__N_2)
 
     def calculate_post_collision_velocities(self, v_1, v_2, dt, idx_1, idx_2):
         """
         Calculate the post collisional velocities of  a given pair of particles
         """
+        new_v_1, new_v_2 = self.calculate_batch_post_collision_velocities(v_1[np.newaxis, :], v_2[np.newaxis, :], dt)
+
+        return new_v_1[0], new_v_2[0]
+
+    def calculate_batch_post_collision_velocities(self, v_1, v_2, dt):
+        """
+        Calculate the post collisional velocities of all pairs of particles at once. Each row of v_1 collides with
+        the same row of v_2
+
+        v_1: Mx3 array of velocities of the first particle of each pair
+        v_2: Mx3 array of velocities of the second particle of each pair
+        dt: timestep size
+        """
+        assert v_1.shape == v_2.shape and v_1.shape[1] == 3
+        num_pairs = v_1.shape[0]
+
         # Step 1 - Get relative velocity u and perpendicular velocity u_xy
         u_rel = v_1 - v_2
-        u = vector_ops.magnitude(u_rel)
-        u_xy = np.sqrt(u_rel[0] ** 2 + u_rel[1] ** 2)
-        u = 1e-16 if u < 1e-16 else u
+        u = np.sqrt(u_rel[:, 0] ** 2 + u_rel[:, 1] ** 2 + u_rel[:, 2] ** 2)
+        u_xy = np.sqrt(u_rel[:, 0] ** 2 + u_rel[:, 1] ** 2)
+        u = np.maximum(u, 1e-16)
 
         # Step 2 - Get scattering angles THETA and PHI
-        PHI = np.random.uniform(0.0, 2.0 * np.pi)
+        PHI = self.rng.uniform(0.0, 2.0 * np.pi, num_pairs)
         c_phi = np.cos(PHI)
         s_phi = np.sin(PHI)
 
         delta_squared = self.__q_1 ** 2 * self.__q_2 ** 2 * max(self.__n_1, self.__n_2)
         delta_squared *= dt * self.__coulomb_logarithm
         delta_squared /= 8.0 * np.pi * u ** 3 * self.__m_eff ** 2 * PhysicalConstants.epsilon_0 ** 2
-        assert not np.isnan(delta_squared) and not np.isinf(delta_squared), "{}, {}".format(delta_squared, u)
+        assert np.all(np.isfinite(delta_squared)), "{}, {}".format(delta_squared, u)
+        self.collision_parameters = delta_squared
 
-        delta = np.random.normal(0.0, np.sqrt(delta_squared))
+        delta = self.rng.normal(0.0, np.sqrt(delta_squared))
         s_theta = 2 * delta / (1 + delta ** 2)
         one_minus_c_theta = 2 * delta ** 2 / (1 + delta ** 2)
 
-        # Step 3 - Calculate du
-        du = np.zeros((3,))
-        if u_xy != 0.0:
-            du[0] = u_rel[0] / u_xy * u_rel[2] * s_theta * c_phi - \
-                u_rel[1] / u_xy * u * s_theta * s_phi - \
-                u_rel[0] * one_minus_c_theta
-            du[1] = u_rel[1] / u_xy * u_rel[2] * s_theta * c_phi + \
-                u_rel[0] / u_xy * u * s_theta * s_phi - \
-                u_rel[1] * one_minus_c_theta
-            du[2] = -u_xy * s_theta * c_phi - u_rel[2] * one_minus_c_theta
-        else:
-            du[0] = u * s_theta * c_phi
-            du[1] = u * s_theta * s_phi
-            du[2] = -u * one_minus_c_theta
-
-        assert not np.any(np.isnan(du)), "{}, {}, {}, {}".format(du, delta, s_theta, one_minus_c_theta)
+        # Step 3 - Calculate du, using the scattering frame of the z axis for pairs with no perpendicular velocity
+        aligned = u_xy == 0.0
+        safe_u_xy = np.where(aligned, 1.0, u_xy)
+        du = np.zeros(u_rel.shape)
+        du[:, 0] = u_rel[:, 0] / safe_u_xy * u_rel[:, 2] * s_theta * c_phi - \
+            u_rel[:, 1] / safe_u_xy * u * s_theta * s_phi - \
+            u_rel[:, 0] * one_minus_c_theta
+        du[:, 1] = u_rel[:, 1] / safe_u_xy * u_rel[:, 2] * s_theta * c_phi + \
+            u_rel[:, 0] / safe_u_xy * u * s_theta * s_phi - \
+            u_rel[:, 1] * one_minus_c_theta
+        du[:, 2] = -u_xy * s_theta * c_phi - u_rel[:, 2] * one_minus_c_theta
+        du[aligned, 0] = u[aligned] * s_theta[aligned] * c_phi[aligned]
+        du[aligned, 1] = u[aligned] * s_theta[aligned] * s_phi[aligned]
+        du[aligned, 2] = -u[aligned] * one_minus_c_theta[aligned]
+
+        assert not np.any(np.isnan(du))
 
         # Step 4 - Update velocities
-        P_1 = 1.0 if np.random.uniform(0, 1) <= self.__collision_threshold_1 else 0.0
-        P_2 = 1.0 if np.random.uniform(0, 1) <= self.__collision_threshold_2 else 0.0
-        new_v_1 = v_1 + P_1 * self.__m_eff / self.__m_1 * du
-        new_v_2 = v_2 - P_2 * self.__m_eff / self.__m_2 * du
+        P_1 = self.rng.uniform(0, 1, num_pairs) <= self.__collision_threshold_1
+        P_2 = self.rng.uniform(0, 1, num_pairs) <= self.__collision_threshold_2
+        new_v_1 = v_1 + P_1[:, np.newaxis] * self.__m_eff / self.__m_1 * du
+        new_v_2 = v_2 - P_2[:, np.newaxis] * self.__m_eff / self.__m_2 * du
 
         return new_v_1, new_v_2
 
@@ -162,44 +176,23 @@ class AbeCoulombCollisionModel(object):
         # number
         if self.__single_species:
             assert(self.__N_1 % 2 == 0), "Uneven number of particles is not implemented"
-
-            # Step 1 - Randomly change addresses of velocities, for each species
-            indices = self.__randomise_velocities(vel)
-
-            # Step 2 - Calculate post-collisional velocities
-            new_vel = np.zeros(vel.shape)
-            for i in range(vel.shape[0] // 2):
-                idx_1 = 2 * i
-                idx_2 = idx_1 + 1
-                v_1 = vel[idx_1, :]
-                v_2 = vel[idx_2, :]
-                new_v_1, new_v_2 = self.calculate_post_collision_velocities(v_1, v_2, dt, idx_1, idx_2)
-                new_vel[idx_1, :] = new_v_1
-                new_vel[idx_2, :] = new_v_2
         else:
             assert(self.__N_1 == self.__N_2), "Different number of particles is not implemented"
 
-            # Step 1 - Randomly change addresses of velocities, for each species
-            indices = self.__randomise_velocities(vel)
+        # Step 1 - Randomly pair particles
+        idx_1, idx_2 = self.__get_pairs()
 
-            # Step 2 - Calculate post-collisional velocities
-            new_vel = np.zeros(vel.shape)
-            for i in range(self.__N_1):
-                idx_1 = i
-                idx_2 = self.__N_1 + i
-                v_1 = vel[idx_1, :]
-                v_2 = vel[idx_2, :]
-                new_v_1, new_v_2 = self.calculate_post_collision_velocities(v_1, v_2, dt, idx_1, idx_2)
-                new_vel[idx_1, :] = new_v_1
-                new_vel[idx_2, :] = v_2 if self.__freeze_species_2 else new_v_2
-
-        # Step 3 - Sort the indices of velocity to maintain ordering
-        new_vel = new_vel[indices.argsort(), :]
+        # Step 2 - Calculate post-collisional velocities, and scatter them back to the original ordering
+        new_v_1, new_v_2 = self.calculate_batch_post_collision_velocities(vel[idx_1, :], vel[idx_2, :], dt)
+        new_vel = np.empty(vel.shape)
+        new_vel[idx_1, :] = new_v_1
+        new_vel[idx_2, :] = vel[idx_2, :] if not self.__single_species and self.__freeze_species_2 else new_v_2
 
         return new_vel
 
 
-    def run_sim(self, vel, dt, final_time, seed=1):
+    def run_sim(self, vel, dt, final_time, seed=None, diagnostics=None, diagnostic_interval=1, history_interval=1,
+                timestep_controller=None):
         """
         Run simulation
 
@@ -207,6 +200,17 @@ class AbeCoulombCollisionModel(object):
              contain the particles of each species sequentially, N = n_1 + n_2
         dt: time step to be used in simulation
         final_time: time of simulation
+        seed: seed of a new Generator for the simulation, or None to continue with the Generator of the model
+        diagnostics: list of diagnostics, such as SpeciesMoments, evaluated during the simulation
+        diagnostic_interval: number of steps between evaluations of the diagnostics
+        history_interval: number of steps between stored velocities, or None to only store the initial and final
+                          velocities
+        timestep_controller: AdaptiveTimestepController used to adapt the time step, in which case dt is the initial
+                             time step, and outputs are recorded at the same times as with a fixed time step of dt.
+                             The interval between outputs caps the time step, so the history and diagnostic intervals
+                             should be larger than 1
+
+        return: times of the stored velocities, and stored velocities with shape (N, 3, num stored)
         """
         if self.__single_species:
             assert vel.shape[0] == self.__N_1
@@ -215,29 +219,31 @@ class AbeCoulombCollisionModel(object):
         assert vel.shape[1] == 3
 
         # Set seed
-        np.random.seed(seed)
+        if seed is not None:
+            self.rng = get_generator(seed)
 
         num_steps = int(math.ceil(final_time / dt) + 1)
-        vel_results = np.zeros((vel.shape[0], vel.shape[1], num_steps))
-        vel_results[:, :, 0] = vel
-        times = np.zeros((num_steps,))
+        recorder = SimulationRecorder(vel.shape[0], num_steps, diagnostics=diagnostics,
+                                      diagnostic_interval=diagnostic_interval, history_interval=history_interval)
         idx = 1
         t = 0.0
-        times[0] = t
+        recorder.record(0, t, vel)
         print("Starting simulation...")
-        while idx < num_steps:
-            t += dt
-            print("Timestep {}: t = {}".format(idx, t))
+        if timestep_controller is not None:
+            vel = run_adaptive_steps(self, vel, dt, recorder, timestep_controller)
+        else:
+            while idx < num_steps:
+                t += dt
+                print("Timestep {}: t = {}".format(idx, t))
 
-            vel = self.single_time_step(vel, dt)
+                vel = self.single_time_step(vel, dt)
 
-            vel_results[:, :, idx] = vel
-            times[idx] = t
+                recorder.record(idx, t, vel)
 
-            idx += 1
+                idx += 1
         print("Simulation Complete!")
 
-        return times, vel_results
+        return recorder.get_history()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,288 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains a driver for spatially resolved coulomb collisions. Particles are binned into the cells of a grid,
+and the Nanbu or Abe collision model is applied within each cell, using the density, temperature and coulomb logarithm
+of the cell.
+"""
+
+import numpy as np
+from multiprocessing.pool import ThreadPool
+
+from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.abe_collison_model import \
+    AbeCoulombCollisionModel
+from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.nanbu_collision_model import \
+    NanbuCollisionModel
+from plasma_physics.pysrc.theory.coulomb_collisions.coulomb_collision import ChargedParticle
+from plasma_physics.pysrc.utils.physical_constants import PhysicalConstants
+from plasma_physics.pysrc.utils.random_streams import get_generator, get_stream
+
+
+class CartesianCellGrid(object):
+    """
+    Uniform Cartesian grid of cells
+    """
+    def __init__(self, lower, upper, num_cells):
+        """
+        :param lower: lower corner of the grid
+        :param upper: upper corner of the grid
+        :param num_cells: number of cells in each direction
+        """
+        assert isinstance(lower, np.ndarray) and lower.shape == (3,)
+        assert isinstance(upper, np.ndarray) and upper.shape == (3,) and np.all(upper > lower)
+        assert isinstance(num_cells, np.ndarray) and num_cells.shape == (3,) and np.all(num_cells > 0)
+
+        self.lower = lower
+        self.upper = upper
+        self.num_cells_per_dim = num_cells.astype(int)
+        self.num_cells = int(np.prod(self.num_cells_per_dim))
+        self.cell_size = (upper - lower) / self.num_cells_per_dim
+
+    def get_cell_indices(self, X):
+        """
+        :param X: Nx3 array of positions
+        :return: flattened index of the cell of each position, or -1 for positions outside of the grid
+        """
+        idx = np.floor((X - self.lower) / self.cell_size).astype(int)
+        inside = np.all(np.logical_and(idx >= 0, idx < self.num_cells_per_dim), axis=1)
+        cells = np.ravel_multi_index(tuple(np.clip(idx, 0, self.num_cells_per_dim - 1).T), self.num_cells_per_dim)
+
+        return np.where(inside, cells, -1)
+
+    def get_volumes(self):
+        """
+        :return: volume of each cell
+        """
+        return np.ones(self.num_cells) * np.prod(self.cell_size)
+
+
+class RadialCellGrid(object):
+    """
+    Grid of spherical shells about a centre
+    """
+    def __init__(self, shell_edges, centre=None):
+        """
+        :param shell_edges: increasing radii of the edges of the shells
+        :param centre: centre of the shells, defaults to the origin
+        """
+        assert isinstance(shell_edges, np.ndarray) and len(shell_edges.shape) == 1 and shell_edges.shape[0] > 1
+        assert shell_edges[0] >= 0.0 and np.all(np.diff(shell_edges) > 0.0)
+
+        self.shell_edges = shell_edges
+        self.centre = np.zeros(3) if centre is None else centre
+        self.num_cells = shell_edges.shape[0] - 1
+
+    def get_cell_indices(self, X):
+        """
+        :param X: Nx3 array of positions
+        :return: index of the shell of each position, or -1 for positions outside of the grid
+        """
+        r = np.sqrt(np.sum((X - self.centre) ** 2, axis=1))
+        cells = np.searchsorted(self.shell_edges, r, side="right") - 1
+
+        return np.where(cells < self.num_cells, cells, -1)
+
+    def get_volumes(self):
+        """
+        :return: volume of each shell
+        """
+        return 4.0 / 3.0 * np.pi * (self.shell_edges[1:] ** 3 - self.shell_edges[:-1] ** 3)
+
+
+def sort_by_key(keys, num_keys):
+    """
+    Sort particles by an integer key with a counting sort, so that the particles with each key are contiguous. The
+    order is found with a stable radix sort of numpy on 16 bit digits of the keys, which is linear in the number of
+    particles. Keys of up to 32 bits are sorted in two passes, from the lowest digit
+
+    :param keys: integer key of each particle, in [0, num_keys)
+    :param num_keys: number of keys
+    :return: order of the particles, and the start of the particles with each key in the order, with num_keys + 1
+             entries
+    """
+    counts = np.bincount(keys, minlength=num_keys)
+    starts = np.concatenate(([0], np.cumsum(counts)))
+
+    # The stable sort of numpy is a radix sort for 16 bit integers
+    digit_size = np.iinfo(np.uint16).max + 1
+    assert num_keys <= digit_size ** 2, "Keys of more than 32 bits are not supported: {}".format(num_keys)
+    order = np.argsort((keys % digit_size).astype(np.uint16), kind="stable")
+    if num_keys > digit_size:
+        order = order[np.argsort((keys[order] // digit_size).astype(np.uint16), kind="stable")]
+
+    return order, starts
+
+
+def get_coulomb_logarithm(velocities, species_counts, particles, particle_weights, volume):
+    """
+    Get the coulomb logarithm of a cell from the Debye length of all species, and the distance of closest approach of
+    thermal particles
+
+    :param velocities: Nx3 array of velocities of the particles in the cell, stored sequentially by species
+    :param species_counts: number of particles of each species in the cell
+    :param particles: ChargedParticle of each species
+    :param particle_weights: weight of each species
+    :param volume: volume of the cell
+    :return: coulomb logarithm
+    """
+    k_B = PhysicalConstants.boltzmann_constant
+    start = 0
+    thermal_energy = 0.0
+    inverse_debye_length_sq = 0.0
+    max_charge = 0.0
+    for count, particle, weight in zip(species_counts, particles, particle_weights):
+        if count == 0:
+            continue
+        v = velocities[start:start + count, :]
+        start += count
+        thermal_energy += particle.m * np.sum(np.var(v, axis=0)) / 3.0 * count
+        inverse_debye_length_sq += count * weight / volume * particle.q ** 2
+        max_charge = max(max_charge, abs(particle.q))
+
+    k_T = max(thermal_energy / np.sum(species_counts), 1e-300)
+    debye_length = np.sqrt(PhysicalConstants.epsilon_0 * k_T / inverse_debye_length_sq)
+    b_90 = max_charge ** 2 / (4.0 * np.pi * PhysicalConstants.epsilon_0 * 3.0 * k_T)
+
+    return max(np.log(debye_length / b_90), 2.0)
+
+
+class CellCollisions(object):
+    """
+    Driver for coulomb collisions within the cells of a grid. Each step, particles are binned by cell and species with
+    a counting sort, and a collision model is applied to the particles of each cell, with the volume of the cell. If
+    the coulomb logarithm is not fixed, it is calculated from the density and temperature of each cell.
+
+    The Nanbu model handles any number of species. The Abe model is limited to a single species, and with an odd
+    number of particles in a cell, one particle does not collide in the step.
+
+    Cells are independent within a step, so they can be spread across a pool of threads, with the cells with the most
+    particles started first to balance the load. Each cell of each step has its own random number stream, spawned
+    from a root seed drawn from rng, so that results do not depend on the number of threads.
+    """
+    def __init__(self, grid, particles, particle_weights, model="Nanbu", coulomb_logarithm=None,
+                 frozen_species=None, rng=None, num_threads=1, scattering_table=None):
+        """
+        :param grid: CartesianCellGrid or RadialCellGrid
+        :param particles: list of ChargedParticle of each species
+        :param particle_weights: list of integer weights of each species
+        :param model: "Nanbu" or "Abe"
+        :param coulomb_logarithm: fixed coulomb logarithm, or None to calculate it in each cell
+        :param frozen_species: list of booleans, True for species with velocities that are not updated
+        :param rng: numpy Generator or seed used to draw the root seed of the streams of each cell
+        :param num_threads: number of threads used to carry out collisions in different cells
+        :param scattering_table: NanbuScatteringTable used to sample the scattering angles of the Nanbu model, or None
+        """
+        assert isinstance(grid, (CartesianCellGrid, RadialCellGrid))
+        assert isinstance(particles, list) and len(particles) == len(particle_weights)
+        for particle in particles:
+            assert isinstance(particle, ChargedParticle)
+        assert model in ["Nanbu", "Abe"], model
+        assert model == "Nanbu" or len(particles) == 1, "Abe cell collisions are limited to a single species"
+        assert isinstance(num_threads, int) and num_threads > 0
+
+        self.grid = grid
+        self.particles = particles
+        self.particle_weights = particle_weights
+        self.model = model
+        self.coulomb_logarithm = coulomb_logarithm
+        self.frozen_species = [False] * len(particles) if frozen_species is None else frozen_species
+        self.num_species = len(particles)
+        self.volumes = grid.get_volumes()
+        self.num_threads = num_threads
+        self.scattering_table = scattering_table
+        self.root_seed = int(get_generator(rng).integers(np.iinfo(np.int64).max))
+        self.num_steps = 0
+
+    def bin_particles(self, X, species):
+        """
+        Bin particles by cell and species
+
+        :param X: Nx3 array of positions
+        :param species: species index of each particle
+        :return: order of the particles sorted by cell and species, and the start of each (cell, species) bin in the
+                 order, with shape (num cells + 1) x num species. The final row holds the particles outside of the grid
+        """
+        cells = self.grid.get_cell_indices(X)
+        num_keys = (self.grid.num_cells + 1) * self.num_species
+        keys = np.where(cells >= 0, cells, self.grid.num_cells) * self.num_species + species
+        order, starts = sort_by_key(keys, num_keys)
+
+        return order, starts
+
+    def single_time_step(self, X, V, species, dt):
+        """
+        Carry out collisions within each cell for a single time step
+
+        :param X: Nx3 array of positions
+        :param V: Nx3 array of velocities
+        :param species: species index of each particle
+        :param dt: time step
+        :return: Nx3 array of velocities after collisions
+        """
+        assert X.shape == V.shape and X.shape[1] == 3
+        assert species.shape == (X.shape[0],)
+
+        order, starts = self.bin_particles(X, species)
+        new_V = np.copy(V)
+        cell_starts = starts[:-1:self.num_species]
+        cell_counts = np.diff(starts[::self.num_species])
+        step = self.num_steps
+        self.num_steps += 1
+
+        def collide(cell):
+            cell_particles = order[cell_starts[cell]:cell_starts[cell] + cell_counts[cell]]
+            species_counts = np.diff(starts[cell * self.num_species:(cell + 1) * self.num_species + 1])
+            rng = get_stream(self.root_seed, (step, int(cell)))
+            new_V[cell_particles] = self.collide_cell(V[cell_particles], species_counts, self.volumes[cell], dt, rng)
+
+        # Start with the largest cells, so that threads are not left waiting on a large cell at the end of the step
+        cells = np.nonzero(cell_counts[:self.grid.num_cells] > 1)[0]
+        cells = cells[np.argsort(-cell_counts[cells], kind="stable")]
+        if self.num_threads == 1:
+            for cell in cells:
+                collide(cell)
+        else:
+            with ThreadPool(self.num_threads) as pool:
+                pool.map(collide, cells, chunksize=1)
+
+        return new_V
+
+    def collide_cell(self, velocities, species_counts, volume, dt, rng):
+        """
+        Carry out collisions between the particles of a single cell
+
+        :param velocities: Nx3 array of velocities of the particles in the cell, stored sequentially by species
+        :param species_counts: number of particles of each species in the cell
+        :param volume: volume of the cell
+        :param dt: time step
+        :param rng: numpy Generator used to sample collisions
+        :return: Nx3 array of velocities after collisions
+        """
+        coulomb_logarithm = self.coulomb_logarithm
+        if coulomb_logarithm is None:
+            coulomb_logarithm = get_coulomb_logarithm(velocities, species_counts, self.particles,
+                                                      self.particle_weights, volume)
+
+        if self.model == "Abe":
+            num_colliding = species_counts[0] - species_counts[0] % 2
+            model = AbeCoulombCollisionModel(int(num_colliding), self.particles[0], self.particle_weights[0],
+                                             coulomb_logarithm=coulomb_logarithm, rng=rng, volume=volume)
+            # With an odd number of particles, a random particle sits out of the step
+            colliding = rng.permutation(species_counts[0])[:num_colliding]
+            new_velocities = np.copy(velocities)
+            new_velocities[colliding] = model.single_time_step(velocities[colliding], dt)
+            return new_velocities
+
+        # Species missing from the cell are kept, so that the pair densities of the self collisions of each species
+        # are the same in every cell
+        model = NanbuCollisionModel(species_counts, np.asarray(self.particles, dtype=object),
+                                    np.asarray(self.particle_weights), coulomb_logarithm=coulomb_logarithm,
+                                    frozen_species=np.asarray(self.frozen_species, dtype=bool),
+                                    include_self_collisions=True, rng=rng, volume=volume,
+                                    scattering_table=self.scattering_table)
+        return model.single_time_step(velocities, dt)
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,198 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains diagnostics that reduce the velocities of collision simulations as they run, so that the full
+velocity history does not need to be stored for long simulations.
+"""
+
+import numpy as np
+
+from plasma_physics.pysrc.utils.physical_constants import PhysicalConstants
+
+
+def get_species_slices(species_counts):
+    """
+    Get the slices of the velocity array holding each species, which are stored sequentially
+
+    :param species_counts: number of simulated particles of each species
+    :return: list of slices
+    """
+    ends = np.cumsum(species_counts)
+    return [slice(int(end - count), int(end)) for count, end in zip(species_counts, ends)]
+
+
+class SpeciesMoments(object):
+    """
+    Records the moments of the velocity distribution of each species: the mean velocity, mean speed, temperature
+    tensor and mean kinetic energy per particle.
+    """
+    def __init__(self, masses, species_counts):
+        """
+        :param masses: mass of each species
+        :param species_counts: number of simulated particles of each species
+        """
+        assert len(masses) == len(species_counts)
+
+        self.masses = np.asarray(masses, dtype=float)
+        self.species_slices = get_species_slices(species_counts)
+        self.reset()
+
+    def reset(self):
+        """
+        Clear the recorded moments
+        """
+        self.__times = []
+        self.__mean_velocities = []
+        self.__mean_speeds = []
+        self.__temperature_tensors = []
+        self.__energies = []
+
+    def record(self, t, velocities):
+        """
+        :param t: simulation time
+        :param velocities: Nx3 array of velocities of all species
+        """
+        mean_velocities = np.zeros((self.masses.shape[0], 3))
+        mean_speeds = np.zeros(self.masses.shape[0])
+        temperature_tensors = np.zeros((self.masses.shape[0], 3, 3))
+        energies = np.zeros(self.masses.shape[0])
+        for i, species_slice in enumerate(self.species_slices):
+            v = velocities[species_slice, :]
+            mean_velocities[i] = np.mean(v, axis=0)
+            v_sq = np.sum(v ** 2, axis=1)
+            mean_speeds[i] = np.mean(np.sqrt(v_sq))
+            dv = v - mean_velocities[i]
+            temperature_tensors[i] = self.masses[i] * np.dot(dv.T, dv) / v.shape[0]
+            energies[i] = 0.5 * self.masses[i] * np.mean(v_sq)
+
+        self.__times.append(t)
+        self.__mean_velocities.append(mean_velocities)
+        self.__mean_speeds.append(mean_speeds)
+        self.__temperature_tensors.append(temperature_tensors / PhysicalConstants.boltzmann_constant)
+        self.__energies.append(energies)
+
+    def get_results(self):
+        """
+        :return: dictionary of record times, and mean velocities (num records, num species, 3), mean speeds and
+                 temperatures (num records, num species), temperature tensors (num records, num species, 3, 3) and
+                 mean kinetic energies per particle (num records, num species)
+        """
+        num_species = self.masses.shape[0]
+        temperature_tensors = np.asarray(self.__temperature_tensors).reshape((-1, num_species, 3, 3))
+        return {
+            "time": np.asarray(self.__times),
+            "mean_velocity": np.asarray(self.__mean_velocities).reshape((-1, num_species, 3)),
+            "mean_speed": np.asarray(self.__mean_speeds).reshape((-1, num_species)),
+            "temperature_tensor": temperature_tensors,
+            "temperature": np.trace(temperature_tensors, axis1=2, axis2=3) / 3.0,
+            "energy": np.asarray(self.__energies).reshape((-1, num_species))
+        }
+
+
+class SpeciesSpeedHistogram(object):
+    """
+    Records histograms of the speeds of each species
+    """
+    def __init__(self, speed_bins, species_counts):
+        """
+        :param speed_bins: edges of the speed bins
+        :param species_counts: number of simulated particles of each species
+        """
+        assert isinstance(speed_bins, np.ndarray) and len(speed_bins.shape) == 1
+
+        self.speed_bins = speed_bins
+        self.species_slices = get_species_slices(species_counts)
+        self.reset()
+
+    def reset(self):
+        """
+        Clear the recorded histograms
+        """
+        self.__times = []
+        self.__counts = []
+
+    def record(self, t, velocities):
+        """
+        :param t: simulation time
+        :param velocities: Nx3 array of velocities of all species
+        """
+        speeds = np.sqrt(np.sum(velocities ** 2, axis=1))
+        self.__times.append(t)
+        self.__counts.append([np.histogram(speeds[species_slice], self.speed_bins)[0]
+                              for species_slice in self.species_slices])
+
+    def get_results(self):
+        """
+        :return: dictionary of record times, bin edges and counts with shape (num records, num species, num bins)
+        """
+        num_bins = self.speed_bins.shape[0] - 1
+        return {"time": np.asarray(self.__times), "speed_bins": self.speed_bins,
+                "count": np.asarray(self.__counts).reshape((-1, len(self.species_slices), num_bins))}
+
+
+class SimulationRecorder(object):
+    """
+    Records the state of a collision simulation. Diagnostics are evaluated every diagnostic_interval steps, and
+    snapshots of the velocities are stored every history_interval steps. The initial and final steps are always
+    recorded, so that only the initial and final velocities are stored if history_interval is None.
+    """
+    def __init__(self, num_particles, num_steps, diagnostics=None, diagnostic_interval=1, history_interval=1):
+        """
+        :param num_particles: number of simulated particles
+        :param num_steps: number of steps, including the initial state
+        :param diagnostics: list of diagnostics, with reset() and record(t, velocities) functions
+        :param diagnostic_interval: number of steps between evaluations of the diagnostics
+        :param history_interval: number of steps between stored velocities, or None to only store the initial and
+                                 final velocities
+        """
+        assert diagnostics is None or isinstance(diagnostics, list)
+        assert isinstance(diagnostic_interval, int) and diagnostic_interval > 0
+        assert history_interval is None or (isinstance(history_interval, int) and history_interval > 0)
+
+        self.num_steps = num_steps
+        self.diagnostics = list() if diagnostics is None else diagnostics
+        self.diagnostic_interval = diagnostic_interval
+        self.history_interval = history_interval
+        for diagnostic in self.diagnostics:
+            diagnostic.reset()
+
+        stored_steps = np.arange(0, num_steps, num_steps if history_interval is None else history_interval)
+        self.__stored_steps = np.unique(np.append(stored_steps, num_steps - 1))
+        self.__times = np.zeros(self.__stored_steps.shape)
+        self.__velocities = np.zeros((num_particles, 3, self.__stored_steps.shape[0]))
+
+    def record(self, step, t, velocities):
+        """
+        :param step: index of the step, where 0 is the initial state
+        :param t: simulation time
+        :param velocities: Nx3 array of velocities of all species
+        """
+        is_final_step = step == self.num_steps - 1
+        if step % self.diagnostic_interval == 0 or is_final_step:
+            for diagnostic in self.diagnostics:
+                diagnostic.record(t, velocities)
+
+        idx = np.searchsorted(self.__stored_steps, step)
+        if idx < self.__stored_steps.shape[0] and self.__stored_steps[idx] == step:
+            self.__times[idx] = t
+            self.__velocities[:, :, idx] = velocities
+
+    def get_record_steps(self):
+        """
+        :return: sorted steps at which diagnostics are evaluated or velocities are stored
+        """
+        diagnostic_steps = np.arange(0, self.num_steps, self.diagnostic_interval) if self.diagnostics else []
+        record_steps = np.concatenate((diagnostic_steps, self.__stored_steps, [self.num_steps - 1]))
+
+        return np.unique(record_steps.astype(int))
+
+    def get_history(self):
+        """
+        :return: times of the stored velocities, and stored velocities with shape (N, 3, num stored)
+        """
+        return self.__times, self.__velocities
+
+
+if __name__ == '__main__':
+    pass
@@ -9,7 +9,6 @@ This file contains the model for coulomb collisions outlined in:
 
 import numpy as np
 import math
-from scipy.interpolate import interp1d as interp1d
 import os
 import sys
 import matplotlib.pyplot as plt
@@ -18,16 +17,349 @@ from plasma_physics.pysrc.theory.coulomb_collisions.coulomb_collision import Cha
 from plasma_physics.pysrc.simulation.pic.algo.geometry import vector_ops
 from plasma_physics.pysrc.utils.physical_constants import PhysicalConstants
 from plasma_physics.pysrc.utils.unit_conversions import UnitConversions
+from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.diagnostics import SimulationRecorder
+from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.timestep_control import run_adaptive_steps
+from plasma_physics.pysrc.utils.random_streams import get_generator
+
+
+_A_DATA = dict()
+
+
+def get_A_data():
+    """
+    Load the table of A against s, which is shared between all instances of the model
+
+    return: 2xN array of s and A values
+    """
+    if "A" not in _A_DATA:
+        dir_path = os.path.dirname(os.path.realpath(__file__))
+        data_file = os.path.join(dir_path, "data", "A_interpolation_values.txt")
+        _A_DATA["A"] = np.loadtxt(data_file)
+
+    return _A_DATA["A"]
+
+
+def interpolate_A(s, A_data):
+    """
+    Interpolate A from pre-calculated values, using the asymptotic forms of A outside of the table
+
+    s: array of s parameters
+    A_data: 2xN array of s and A values
+    return: array of A values
+    """
+    s_data = A_data[0, :]
+    A = np.interp(s, s_data, A_data[1, :])
+    small_s = s < s_data[0]
+    large_s = s > s_data[-1]
+    A[small_s] = 1.0 / s[small_s]
+    A[large_s] = 3.0 * np.exp(-s[large_s])
+
+    return A
+
+
+def solve_A(s, num_iterations=20):
+    """
+    Solve coth(A) - 1 / A = exp(-s) for A with Newton iterations, starting from the interpolated values of A. This
+    is more expensive than interpolation, but A is smooth in s between the values of the table
+
+    s: array of s parameters
+    num_iterations: number of Newton iterations
+    return: array of A values
+    """
+    A = interpolate_A(s, get_A_data())
+    for _ in range(num_iterations):
+        residual = 1.0 / np.tanh(A) - 1.0 / A - np.exp(-s)
+        derivative = 1.0 / A ** 2 - 4.0 * np.exp(-2.0 * A) / np.expm1(-2.0 * A) ** 2
+        A = np.maximum(A - residual / derivative, 0.5 * A)
+
+    return A
+
+
+def invert_cos_chi_cdf(A, U):
+    """
+    Get the cosine of the scattering angle for random numbers U, for the anisotropic distribution of Nanbu:
+
+        cos_chi = 1 / A * log(exp(-A) + 2 * U * sinh(A)) = 1 + log(1 + (1 - U) * (exp(-2A) - 1)) / A
+
+    where the second form does not overflow for large A
+
+    A: array of A values, which must be positive
+    U: array of uniform random numbers
+    return: array of cosines of the scattering angles
+    """
+    with np.errstate(divide="ignore"):
+        cos_chi = 1.0 + np.log1p((1.0 - U) * np.expm1(-2.0 * A)) / A
+
+    return np.clip(cos_chi, -1.0, 1.0)
+
+
+class NanbuScatteringTable(object):
+    """
+    Table of the inverse CDF of the scattering angle on a grid of log s and U, so that the cosine of the scattering
+    angle of each pair is found with a bilinear lookup, rather than by interpolating A and evaluating the inverse CDF.
+
+    A is solved for each s of the table, rather than interpolated. The table holds (1 - cos_chi) / s, which tends to
+    -log(U) as s tends to 0, so values of s below the table are scaled from its first row. Values of s above the
+    table are left to the isotropic distribution of the model.
+    """
+    def __init__(self, s_min=1e-4, s_max=6.0, num_s=256, num_U=1024):
+        """
+        s_min: smallest s in the table
+        s_max: largest s in the table
+        num_s: number of log spaced values of s in the table
+        num_U: number of uniform intervals of U in the table
+        """
+        assert 0.0 < s_min < s_max, "{}, {}".format(s_min, s_max)
+        assert num_s > 1 and num_U > 1, "{}, {}".format(num_s, num_U)
+
+        self.log_s = np.linspace(np.log(s_min), np.log(s_max), num_s)
+        self.U = np.linspace(0.0, 1.0, num_U + 1)
+        s = np.exp(self.log_s)[:, np.newaxis]
+        A = solve_A(s[:, 0])[:, np.newaxis]
+        self.table = (1.0 - invert_cos_chi_cdf(A, self.U[np.newaxis, :])) / s
+
+        # (1 - cos_chi) / s changes rapidly as U tends to 0, so the value at U = 0 is set to give the exact mean over
+        # the first interval of U when interpolated linearly. The mean is integrated over log spaced values of U
+        dU = self.U[1]
+        x = np.linspace(0.0, 50.0, 2001)
+        integrand = (1.0 - invert_cos_chi_cdf(A, dU * np.exp(-x)[np.newaxis, :])) / s * np.exp(-x)[np.newaxis, :]
+        mean = np.sum(0.5 * (integrand[:, 1:] + integrand[:, :-1]) * np.diff(x), axis=1)
+        self.table[:, 0] = 2.0 * mean - self.table[:, 1]
+
+    def save(self, file_path):
+        """
+        Save the table to an npz file
+        """
+        np.savez(file_path, log_s=self.log_s, U=self.U, table=self.table)
+
+    @staticmethod
+    def load(file_path):
+        """
+        Load a table saved with save
+        """
+        table = NanbuScatteringTable.__new__(NanbuScatteringTable)
+        with np.load(file_path) as data:
+            table.log_s = data["log_s"]
+            table.U = data["U"]
+            table.table = data["table"]
+
+        return table
+
+    def get_cos_chi(self, s, U):
+        """
+        Get the cosine of the scattering angles by bilinear interpolation of the table
+
+        s: array of s parameters, which must be positive
+        U: array of uniform random numbers
+        return: array of cosines of the scattering angles
+        """
+        num_s, num_U = self.table.shape
+        x = np.clip((np.log(s) - self.log_s[0]) / (self.log_s[1] - self.log_s[0]), 0.0, num_s - 1)
+        i = np.minimum(x.astype(int), num_s - 2)
+        f_s = x - i
+        y = U * (num_U - 1)
+        j = np.minimum(y.astype(int), num_U - 2)
+        f_U = y - j
+
+        flat_table = self.table.ravel()
+        idx = i * num_U + j
+        lower = flat_table[idx] + f_U * (flat_table[idx + 1] - flat_table[idx])
+        upper = flat_table[idx + num_U] + f_U * (flat_table[idx + num_U + 1] - flat_table[idx + num_U])
+
+        return np.clip(1.0 - s * (lower + f_s * (upper - lower)), -1.0, 1.0)
+
+
+_SCATTERING_TABLE = dict()
+
+
+def get_scattering_table():
+    """
+    Get the default scattering table, which is built once and shared between all instances of the model
+
+    return: NanbuScatteringTable
+    """
+    if "table" not in _SCATTERING_TABLE:
+        _SCATTERING_TABLE["table"] = NanbuScatteringTable()
+
+    return _SCATTERING_TABLE["table"]
+
+
+def get_pair_density(N_A, N_B, w_A, w_B, single_species, volume):
+    """
+    Get the density of pairs used in the s parameter of collisions between two species. Each particle of the species
+    with more simulated particles collides once per step, and particles of the other species are reused. The density
+    is chosen so that, with the collision probabilities of the weights, each species on average sees the density of
+    the other species over a step
+
+    N_A: number of simulated particles of species A
+    N_B: number of simulated particles of species B
+    w_A: particle weight, or array of particle weights, of species A
+    w_B: particle weight, or array of particle weights, of species B
+    single_species: boolean that is True if the simulation has a single species
+    volume: volume occupied by the particles, or array of volumes
+    return: density of pairs
+    """
+    if single_species:
+        n = N_A * w_A / 2
+    else:
+        n = min(int(N_A), int(N_B)) * np.maximum(np.asarray(w_A, dtype=float), w_B)
+
+    return n / volume
+
+
+def get_s_factor(q_A, q_B, m_A, m_B, n, coulomb_logarithm, dt):
+    """
+    Get the factor of the s parameter of collisions that does not depend on the relative velocity g of each pair, so
+    that s = factor / g ** 3. Arguments may be scalars, or arrays of the properties of each replica of a simulation
+
+    q_A: charge of species A
+    q_B: charge of species B
+    m_A: mass of species A
+    m_B: mass of species B
+    n: density of pairs
+    coulomb_logarithm: coulomb logarithm of the collisions
+    dt: time step
+    return: factor of the s parameter
+    """
+    # b_90 = q_A * q_B / (2 * np.pi * PhysicalConstants.epsilon_0 * m_eff * g_mag ** 2)
+    # s = n * g_mag * np.pi * b_90 ** 2 * coulomb_logarithm * dt
+    m_eff = m_A * m_B / (m_A + m_B)
+    s_factor = coulomb_logarithm / (4 * np.pi) * (q_A * q_B / (PhysicalConstants.epsilon_0 * m_eff)) ** 2
+
+    return s_factor * n * dt
+
+
+def sample_cos_chi(rng, s, A, scattering_table, max_s):
+    """
+    Sample the cosine of the scattering angles. The distribution is isotropic for large s, and otherwise is sampled
+    from the inverse CDF, or from the scattering table if there is one
+
+    rng: numpy Generator
+    s: array of s parameters
+    A: array of A values, which is only used if there is no scattering table
+    scattering_table: NanbuScatteringTable, or None
+    max_s: s above which the distribution is isotropic
+    return: array of cosines of the scattering angles
+    """
+    U = rng.uniform(0, 1, s.shape)
+    if scattering_table is not None:
+        isotropic = s > max_s
+        cos_chi = scattering_table.get_cos_chi(s, U)
+    else:
+        isotropic = np.logical_or(s > max_s, A == 0.0)
+        cos_chi = invert_cos_chi_cdf(np.where(isotropic, 1.0, A), U)
+
+    return np.where(isotropic, 2 * U - 1, cos_chi)
+
+
+def deflect_pairs(rng, vel_A, vel_B, g_comp, g_mag, cos_chi, m_A, m_B, w_A, w_B, frozen_A, frozen_B):
+    """
+    Update the velocities of colliding pairs in place, with a random rotation of each relative velocity about its
+    axis. With unequal particle weights, the particle of the species with the smaller weight is deflected in each
+    pair, and the other particle is only deflected with the ratio of the weights as its probability. The masses and
+    weights may be scalars, or arrays of the values of each pair
+
+    rng: numpy Generator
+    vel_A: Px3 array of velocities of the particles of species A in each pair
+    vel_B: Px3 array of velocities of the particles of species B in each pair
+    g_comp: Px3 array of relative velocities of the pairs
+    g_mag: array of relative velocity magnitudes of the pairs
+    cos_chi: array of cosines of the scattering angles
+    m_A: mass of species A
+    m_B: mass of species B
+    w_A: particle weight of species A
+    w_B: particle weight of species B
+    frozen_A: boolean to determine if the velocities of species A are not updated
+    frozen_B: boolean to determine if the velocities of species B are not updated
+    """
+    epsilon = rng.uniform(0, 2 * np.pi, g_mag.shape)
+
+    # Get collision probabilities from the particle weights
+    w_max = np.maximum(w_A, w_B)
+    Z_A = rng.uniform(0, 1, size=g_mag.shape) < w_B / w_max
+    Z_B = rng.uniform(0, 1, size=g_mag.shape) < w_A / w_max
+
+    # Calculate mass factors
+    A_factor = m_B / (m_A + m_B)
+    B_factor = m_A / (m_A + m_B)
+
+    # Calculate h vectors
+    g_perp = np.sqrt(g_comp[:, 1] ** 2 + g_comp[:, 2] ** 2)
+    cos_e = np.cos(epsilon)
+    sin_e = np.sin(epsilon)
+    h_vec = np.zeros(g_comp.shape)
+    h_vec[:, 0] = g_perp * cos_e
+    h_vec[:, 1] = -(g_comp[:, 1] * g_comp[:, 0] * cos_e + g_mag * g_comp[:, 2] * sin_e) / g_perp
+    h_vec[:, 2] = -(g_comp[:, 2] * g_comp[:, 0] * cos_e - g_mag * g_comp[:, 1] * sin_e) / g_perp
+
+    # Give chi a new axis to allow matrix multiplication
+    cos_chi = cos_chi[:, np.newaxis]
+    sin_chi = np.sqrt(1.0 - cos_chi ** 2)
+    deflection_vec = g_comp * (1.0 - cos_chi) + h_vec * sin_chi
+    if not frozen_A:
+        vel_A -= (Z_A * A_factor)[:, np.newaxis] * deflection_vec
+    if not frozen_B:
+        vel_B += (Z_B * B_factor)[:, np.newaxis] * deflection_vec
+
+
+def get_pair_rounds(perm_A, perm_B=None, max_rounds=None):
+    """
+    Pair randomly permuted particles for coulomb collisions. For self collisions, the permutation of the species is
+    split in half. If the species have different numbers of simulated particles, the particles of the smaller species
+    are reused cyclically. The pairs are split into rounds in which each particle collides at most once, so that the
+    rounds can be carried out sequentially. Permutations are along the last axis, so that independent permutations of
+    each replica of a simulation can be paired together
+
+    Cyclic reuse needs ceil(N_max / N_min) rounds, each of which is a separate vectorised step, so that a single ion
+    among 10^4 electrons would take 10^4 rounds. If there are more than max_rounds rounds, only the first max_rounds
+    are kept, so that a random subset of the larger species collides with the smaller species each step. The s
+    parameters of the kept pairs are scaled up by the returned factor, so that the expected s accumulated by each
+    particle of either species is unchanged. This is accurate while the scaled s is small, as the mean deflection is
+    then linear in s
+
+    perm_A: array of permuted indices of the particles of species A
+    perm_B: array of permuted indices of the particles of species B, or None for self collisions
+    max_rounds: maximum number of rounds of pairs, or None for no limit
+    return: list of rounds of pairs, each with the indices of the particles of species A and B in each pair, and the
+            factor by which the s parameters of the pairs are scaled
+    """
+    assert max_rounds is None or max_rounds > 0, max_rounds
+    N_A = perm_A.shape[-1]
+    if perm_B is None:
+        num_pairs = N_A // 2
+        return [(perm_A[..., :num_pairs], perm_A[..., num_pairs:2 * num_pairs])], 1.0
+
+    N_B = perm_B.shape[-1]
+    if N_A >= N_B:
+        rounds = [(perm_A[..., i:i + N_B], perm_B[..., :min(N_B, N_A - i)]) for i in range(0, N_A, N_B)]
+    else:
+        rounds = [(perm_A[..., :min(N_A, N_B - i)], perm_B[..., i:i + N_A]) for i in range(0, N_B, N_A)]
+
+    if max_rounds is None or len(rounds) <= max_rounds:
+        return rounds, 1.0
+
+    # All kept rounds are full, as only the last round can be partial
+    return rounds[:max_rounds], max(N_A, N_B) / (max_rounds * min(N_A, N_B))
+
 
 class NanbuCollisionModel(object):
+    # Maximum number of rounds of pairs between two species per time step, see get_pair_rounds
+    max_pair_rounds = 16
+
     def __init__(self, number_densities, particles, particle_weightings, 
-                 coulomb_logarithm=None, frozen_species=None, include_self_collisions=False):
+                 coulomb_logarithm=None, frozen_species=None, include_self_collisions=False, rng=None,
+                 volume=1.0, scattering_table=None):
         """
         Initialiser for Nanbu simulation class
 
-        number_densities: array or integer of number densities of different species
+        number_densities: array or integer of number of simulated particles of different species. The number of
+                          simulated particles may differ between species, and species in an array may have none
         particles: array or ChargedParticle of different species
         particle_weightings: array or integer of particle weights
+        rng: numpy Generator or seed used to sample collisions, defaulting to a seed of 1
+        volume: volume occupied by the particles, used to get the number densities of each species
+        scattering_table: NanbuScatteringTable used to sample scattering angles, such as the one returned by
+                          get_scattering_table, or None to evaluate the inverse CDF for each pair
         """
         # Carry out defensive checks
         if isinstance(number_densities, np.ndarray):
@@ -36,8 +368,7 @@ class NanbuCollisionModel(object):
             assert number_densities.shape == particles.shape == particle_weightings.shape
             assert np.all(particle_weightings > 0)
             assert len(number_densities.shape) == 1
-            for i, n in enumerate(number_densities):
-                assert n == number_densities[0]
+            assert np.all(number_densities >= 0) and np.sum(number_densities) > 0
 
             # Set particle variables
             self.__num_species = number_densities.shape[0]
@@ -45,8 +376,6 @@ class NanbuCollisionModel(object):
             self.__particle_weights = particle_weightings
             self.__number_densities = number_densities
             self.__frozen_species = frozen_species if frozen_species is not None else np.zeros(number_densities.shape).astype(bool)
-            
-            assert np.all(self.__number_densities == self.__number_densities[0]), "Variable simulated particles currently not handled"
 
             # Set boolean to determine if self collisions are enabled
             self.__include_self_collisions = include_self_collisions
@@ -79,14 +408,12 @@ class NanbuCollisionModel(object):
         # Define temperatures of plasma - this will be set at the beginning of the simulation
         self.temperature = None
 
-        # Generator interpolator for A
-        dir_path = os.path.dirname(os.path.realpath(__file__))
-        data_file = os.path.join(dir_path, "data", "A_interpolation_values.txt")
-        self.__A_data = np.loadtxt(data_file)
-        s_data = self.__A_data[0, :]
-        A_data = self.__A_data[1, :]
-        A_interpolator = interp1d(s_data, A_data)
-        self._A_interpolator = A_interpolator
+        # s parameters of all pairs in the last time step
+        self.collision_parameters = None
+        self.__step_s = []
+
+        # Load table of A against s for interpolation
+        self.__A_data = get_A_data()
 
         # Set max s value to 6.0 as in Nanbu
         self.__max_s = 6.0
@@ -94,6 +421,14 @@ class NanbuCollisionModel(object):
         # Set coulomb logarithm to a fixed value if it is specified
         self.__coulomb_logarithm = coulomb_logarithm
 
+        assert volume > 0.0, volume
+        self.__volume = volume
+
+        assert scattering_table is None or isinstance(scattering_table, NanbuScatteringTable)
+        self.__scattering_table = scattering_table
+
+        self.rng = get_generator(1 if rng is None else rng)
+
     def __calculate_s(self, idx_A, idx_B, g_mag, dt):
         """
         Calculate s parameter for collisions
@@ -103,12 +438,9 @@ class NanbuCollisionModel(object):
         g_mag: relative velocity magnitude of collision
         dt: timestep
         """
-        if self.__num_species == 1:
-            n = self.__number_densities[0] / 2
-        else:
-            # Assume number of simulated particles is equal for all species and that species B is the 
-            # background species for the interaction
-            n = long(self.__number_densities[0]) * self.__particle_weights[idx_B]
+        n = get_pair_density(self.__number_densities[idx_A], self.__number_densities[idx_B],
+                             self.__particle_weights[idx_A], self.__particle_weights[idx_B], self.__num_species == 1,
+                             self.__volume)
 
         # Get charges, and calculate m_eff for collisions
         q_A = self.__particles[idx_A].q
@@ -130,52 +462,23 @@ class NanbuCollisionModel(object):
         else:
             coulomb_logarithm = self.__coulomb_logarithm
 
-        # Calculate s
-        # b_90 = q_A * q_B / (2 * np.pi * PhysicalConstants.epsilon_0 * m_eff * g_mag ** 2)
-        # s = n * g_mag * np.pi * b_90 ** 2 * coulomb_logarithm * dt
-        s = coulomb_logarithm / (4 * np.pi) * (q_A * q_B / (PhysicalConstants.epsilon_0 * m_eff)) ** 2
-        s *= n / g_mag ** 3 * dt
+        s = get_s_factor(q_A, q_B, m_A, m_B, n, coulomb_logarithm, dt) / g_mag ** 3
 
         return s
 
     def __calculate_A(self, s):
-        # Interpolate from pre-calculated values
-        A = np.zeros(s.shape)
-        for i, s_val in enumerate(s):
-            try:
-                A_val = self._A_interpolator(s_val)
-            except ValueError:
-                if s_val < self.__A_data[0, 0]:
-                    A_val = 1.0 / s_val
-                elif self.__A_data[0, -1] < s_val:
-                    A_val = 3.0 * np.exp(-s_val)
-                else:
-                    raise ValueError("Unexpected behaviour!")
-
-            A[i] = A_val
-
-        return A
+        """
+        Interpolate A from pre-calculated values, using the asymptotic forms of A outside of the table
+        """
+        return interpolate_A(s, self.__A_data)
 
     def __calculate_cos_chi(self, A, s, debug=False):
-        cos_chi = np.zeros(s.shape)
-        U = np.random.uniform(0, 1, s.shape)
-        for i, s_val in enumerate(s):
-            U_val = U[i]
-            A_val = A[i]
-            if s_val > self.__max_s or A_val == 0.0:
-                # Assume isotropic
-                cos_chi_val = 2 * U_val - 1
-            else:
-                cos_chi_val = 1 / A_val * np.log(np.exp(-A_val) + 2 * U_val * np.sinh(A_val))
-
-            # Correct overflow in simulations
-            if np.isinf(cos_chi_val):
-                cos_chi_val = 1 + s_val * np.log(U_val)
-
-            cos_chi[i] = cos_chi_val
-    
-        for i, cos_chi_val in enumerate(cos_chi):
-            assert -1.0 <= cos_chi_val <= 1.0, "{}, {}, {}, {}".format(cos_chi_val, s[i], A[i], U[i])
+        """
+        Sample the cosine of the scattering angles. The distribution is isotropic for large s, and otherwise is
+        sampled from the inverse CDF, or from the scattering table if there is one
+        """
+        cos_chi = sample_cos_chi(self.rng, s, A, self.__scattering_table, self.__max_s)
+        assert np.all(np.abs(cos_chi) <= 1.0), "{}, {}, {}".format(cos_chi, s, A)
 
         if debug:
             plt.figure()
@@ -184,143 +487,68 @@ class NanbuCollisionModel(object):
 
         return cos_chi
 
-    def __calculate_post_collision_velocities(self, idx_A, idx_B, vel_A, vel_B, g_comp, g_mag, cos_chi, epsilon):
+    def __get_pairs(self, idx_A, idx_B):
         """
-        Calculate new velocities after collision
+        Randomly pair particles for coulomb collisions. A single random permutation of each species is used to gather
+        the velocities of each pair, and to scatter the post collisional velocities back to the original ordering
 
-        idx_A: index of particle A in arrays
-        idx_B: index of particle B in arrays
-        vel_A: velocities of species A in collision
-        vel_B: velocities of species B in collision
-        g_comp: relative velocity components
-        g_mag: relative velocity magnitudes
-        cos_chi: cosine of scattering angles
-        epsilon: angle of rotation about x axis
-        """
-        # Get particle weightings and collision probabilities
-        w_A = self.__particle_weights[idx_A]
-        w_B = self.__particle_weights[idx_B]
-        w_max = float(max(w_A, w_B))
-        collision_threshold_A = w_B / w_max
-        collision_threshold_B = w_A / w_max
-        Z_A = np.random.uniform(0, 1, size=(g_comp.shape[0], 1)) < collision_threshold_A 
-        Z_B = np.random.uniform(0, 1, size=(g_comp.shape[0], 1)) < collision_threshold_B 
-
-        # Calculate mass factors
-        m_A = self.__particles[idx_A].m
-        m_B = self.__particles[idx_B].m
-        A_factor = (m_B / (m_A + m_B))
-        B_factor = (m_A / (m_A + m_B))
-
-        # Calculate h vectors
-        g_perp = np.sqrt(g_comp[:, 1] ** 2 + g_comp[:, 2] ** 2)
-        cos_e = np.cos(epsilon)
-        sin_e = np.sin(epsilon)
-        h_vec = np.zeros(g_comp.shape)
-        h_vec[:, 0] = g_perp * cos_e
-        h_vec[:, 1] = -(g_comp[:, 1] * g_comp[:, 0] * cos_e + g_mag * g_comp[:, 2] * sin_e) / g_perp
-        h_vec[:, 2] = -(g_comp[:, 2] * g_comp[:, 0] * cos_e - g_mag * g_comp[:, 1] * sin_e) / g_perp
-
-        # Give chi a new axis to allow matrix multiplication
-        cos_chi = cos_chi[:, np.newaxis]
-        sin_chi = np.sqrt(1.0 - cos_chi ** 2)
-        deflection_vec = (g_comp * (1.0 - cos_chi) + h_vec * sin_chi) 
-        if not self.__frozen_species[idx_A]:
-            vel_A -= Z_A * A_factor * deflection_vec
-        if not self.__frozen_species[idx_B]:
-            vel_B += Z_B * B_factor * deflection_vec
-
-    def __randomise_velocities(self, start_A, start_B, N_A, N_B, velocities):
+        idx_A: index of species A in arrays
+        idx_B: index of species B in arrays
+        return: list of rounds of pairs, each with the indices in the velocity array of the particles of species A and
+                B in each pair, and the factor by which the s parameters of the pairs are scaled
         """
-        Randomise velocities for coulomb collisions
+        perm_A = self.__species_start_idx[idx_A] + self.rng.permutation(int(self.__number_densities[idx_A]))
+        if idx_A == idx_B:
+            return get_pair_rounds(perm_A)
 
-        start_A: start index in velocities of species A
-        start_B: start index in velocities of species B
-        N_A: number of simulated particles of species A
-        N_B: number of simulated particles of species B
-        velocities: N_T X 3 array of all particle velocities in simulation
-        """
-        current_state = np.random.get_state()
-        indices_A = np.asarray(range(N_A))
-        indices_B = np.asarray(range(N_B))
-        velocities_A = velocities[start_A:start_A + N_A, :]
-        velocities_B = velocities[start_B:start_B + N_B, :]
-        np.random.shuffle(velocities_A)
-        np.random.shuffle(velocities_B)
-        np.random.set_state(current_state)
-        np.random.shuffle(indices_A)
-        np.random.shuffle(indices_B)
-
-        return velocities_A, velocities_B, indices_A, indices_B
-
-    def __unshuffle_velocities(self, start_A, start_B, N_A, N_B, velocities_A, velocities_B, indices_A, indices_B, new_vel):
-        """
-        Unshuffle velocities for coulomb collisions
-
-        start_A: start index in velocities of species A
-        start_B: start index in velocities of species B
-        N_A: number of simulated particles of species A
-        N_B: number of simulated particles of species B
-        velocities_A: N_A X 3 array of all particle velocities from species_A
-        velocities_B: N_B X 3 array of all particle velocities from species_B
-        indicies_A: randomised particle indices of species A
-        indicies_B: randomised particle indices of species B
-        new_vel: N_T X 3 array of all new particle velocities in simulation
-        """
-        velocities_A = velocities_A[indices_A.argsort(), :]
-        velocities_B = velocities_B[indices_B.argsort(), :]
-        new_vel[start_A:start_A+N_A, :] = velocities_A
-        new_vel[start_B:start_B+N_B, :] = velocities_B
+        perm_B = self.__species_start_idx[idx_B] + self.rng.permutation(int(self.__number_densities[idx_B]))
+        return get_pair_rounds(perm_A, perm_B, NanbuCollisionModel.max_pair_rounds)
 
-    def __simulate_coulomb_collisions(self, idx_A, idx_B, start_A, start_B, N_A, N_B, new_vel, dt):
+    def __simulate_coulomb_collisions(self, idx_A, idx_B, new_vel, dt):
         """
-        idx_A:start index of species properties for species A
-        idx_B: start index of species properties for species B
-        start_A: start index of velocities for species A
-        start_B: start index of velocities for species B
-        N_A: Number of simulated particles of species A
-        N_B: Number of simulated particles of species B
+        idx_A: index of species properties for species A
+        idx_B: index of species properties for species B
         new_vel: N_T X 3 array of particle velocities of all species within the simulation
         dt: time step of simulation
         """
-        velocities_A, velocities_B, indices_A, indices_B = self.__randomise_velocities(start_A, start_B, N_A, N_B, new_vel)
-
-        # Calculate relative velocities of species pairs and their magnitudes
-        g_components = velocities_A - velocities_B
-        g_mag = np.sqrt(g_components[:, 0] ** 2 + g_components[:, 1] ** 2 + g_components[:, 2] ** 2)
-
-        # Calculate scattering angles chi and epsilon
-        s = self.__calculate_s(idx_A, idx_B, g_mag, dt)
-        A = self.__calculate_A(s)
-        cos_chi = self.__calculate_cos_chi(A, s)
-        epsilon = np.random.uniform(0, 2 * np.pi, g_mag.shape)
-
-        self.__calculate_post_collision_velocities(idx_A, idx_B, velocities_A, velocities_B, g_components, g_mag, cos_chi, epsilon)
-        self.__unshuffle_velocities(start_A, start_B, N_A, N_B, velocities_A, velocities_B, indices_A, indices_B, new_vel)    
+        if self.__number_densities[idx_A] == 0 or self.__number_densities[idx_B] == 0:
+            return
+
+        pair_rounds, s_scale = self.__get_pairs(idx_A, idx_B)
+        for particles_A, particles_B in pair_rounds:
+            velocities_A = new_vel[particles_A, :]
+            velocities_B = new_vel[particles_B, :]
+
+            # Calculate relative velocities of species pairs and their magnitudes
+            g_components = velocities_A - velocities_B
+            g_mag = np.sqrt(g_components[:, 0] ** 2 + g_components[:, 1] ** 2 + g_components[:, 2] ** 2)
+
+            # Calculate scattering angles
+            s = s_scale * self.__calculate_s(idx_A, idx_B, g_mag, dt)
+            self.__step_s.append(s)
+            A = self.__calculate_A(s) if self.__scattering_table is None else None
+            cos_chi = self.__calculate_cos_chi(A, s)
+
+            deflect_pairs(self.rng, velocities_A, velocities_B, g_components, g_mag, cos_chi,
+                          self.__particles[idx_A].m, self.__particles[idx_B].m, self.__particle_weights[idx_A],
+                          self.__particle_weights[idx_B], self.__frozen_species[idx_A], self.__frozen_species[idx_B])
+            new_vel[particles_A, :] = velocities_A
+            new_vel[particles_B, :] = velocities_B
 
     def single_time_step(self, velocities, dt):
-        # Get array for new velocities, and number of simulated particles - assumed constant for all species
+        # Get array for new velocities
         new_vel = np.copy(velocities)
-        n = self.__number_densities[0]
+        self.__step_s = []
         
         # Carry out binary collisions between plasmas of different species
         for i in range(self.__num_species):
             for j in range(i+1, self.__num_species):
-                start_A = self.__species_start_idx[i]
-                start_B = self.__species_start_idx[j]
-
-                # Simulate collisions
-                self.__simulate_coulomb_collisions(i, j, start_A, start_B, n, n, new_vel, dt)
+                self.__simulate_coulomb_collisions(i, j, new_vel, dt)
 
         # Carry out self-collisions of each plasma species
         if self.__include_self_collisions:
-            n /= 2
             for i in range(self.__num_species):
-                start_A = self.__species_start_idx[i]
-                start_B = start_A + n
-
-                # Simulate collisions
-                self.__simulate_coulomb_collisions(i, i, start_A, start_B, n, n, new_vel, dt)
+                self.__simulate_coulomb_collisions(i, i, new_vel, dt)
 
         # Get plasma temperature
         if self.__num_species == 1:
@@ -330,9 +558,12 @@ class NanbuCollisionModel(object):
             # Setting temperature to None so that the code will break if coulomb logarithm is not set
             self.temperature = None
 
+        self.collision_parameters = np.concatenate(self.__step_s) if self.__step_s else np.zeros(0)
+
         return new_vel
         
-    def run_sim(self, velocities, dt, final_time, seed=1):
+    def run_sim(self, velocities, dt, final_time, seed=None, diagnostics=None, diagnostic_interval=1,
+                history_interval=1, timestep_controller=None):
         """
         Run simulation
 
@@ -340,38 +571,51 @@ class NanbuCollisionModel(object):
              contain the particles of each species sequentially, N = n_1 + n_2
         dt: time step to be used in simulation
         final_time: time of simulation
+        seed: seed of a new Generator for the simulation, or None to continue with the Generator of the model
+        diagnostics: list of diagnostics, such as SpeciesMoments, evaluated during the simulation
+        diagnostic_interval: number of steps between evaluations of the diagnostics
+        history_interval: number of steps between stored velocities, or None to only store the initial and final
+                          velocities
+        timestep_controller: AdaptiveTimestepController used to adapt the time step, in which case dt is the initial
+                             time step, and outputs are recorded at the same times as with a fixed time step of dt.
+                             The interval between outputs caps the time step, so the history and diagnostic intervals
+                             should be larger than 1
+
+        return: times of the stored velocities, and stored velocities with shape (N, 3, num stored)
         """
         assert velocities.shape[0] == np.sum(self.__number_densities), "{} != {}".format(velocities.shape[0], np.sum(self.__number_densities)) 
         assert velocities.shape[1] == 3, velocities.shape[1]
 
         # # Set seed before simulation
-        np.random.seed(seed)
+        if seed is not None:
+            self.rng = get_generator(seed)
 
         # Set temperature
         vel_mag = np.sqrt(velocities[:, 0] ** 2 + velocities[:, 1] ** 2 + velocities[:, 2] ** 2)
         self.temperature = np.std(vel_mag) ** 2 * self.__particles[0].m / (3.0 * PhysicalConstants.boltzmann_constant)
 
         num_steps = int(math.ceil(final_time / dt) + 1)
-        vel_results = np.zeros((velocities.shape[0], velocities.shape[1], num_steps))
-        vel_results[:, :, 0] = velocities
-        times = np.zeros((num_steps,))
+        recorder = SimulationRecorder(velocities.shape[0], num_steps, diagnostics=diagnostics,
+                                      diagnostic_interval=diagnostic_interval, history_interval=history_interval)
         idx = 1
         t = 0.0
-        times[0] = t
+        recorder.record(0, t, velocities)
         print("Starting simulation...")
-        while idx < num_steps:
-            t += dt
-            print("Timestep {}: t = {}".format(idx, t))
+        if timestep_controller is not None:
+            velocities = run_adaptive_steps(self, velocities, dt, recorder, timestep_controller)
+        else:
+            while idx < num_steps:
+                t += dt
+                print("Timestep {}: t = {}".format(idx, t))
 
-            velocities = self.single_time_step(velocities, dt)
+                velocities = self.single_time_step(velocities, dt)
 
-            vel_results[:, :, idx] = velocities
-            times[idx] = t
+                recorder.record(idx, t, velocities)
 
-            idx += 1
+                idx += 1
         print("Simulation Complete!")
 
-        return times, vel_results
+        return recorder.get_history()
 
 
 if __name__ == '__main__':
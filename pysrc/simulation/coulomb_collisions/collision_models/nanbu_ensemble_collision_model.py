@@ -0,0 +1,240 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains an ensemble form of the Nanbu collision model, in which independent replicas of a simulation with
+different particles, weights, volumes and time steps are stored in a single (R, N, 3) velocity array, and advanced
+together, so that parameter scans of small simulations are not dominated by the overhead of each step.
+"""
+
+import numpy as np
+import math
+
+from plasma_physics.pysrc.theory.coulomb_collisions.coulomb_collision import ChargedParticle
+from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.diagnostics import SimulationRecorder
+from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.nanbu_collision_model import \
+    NanbuScatteringTable, get_A_data, interpolate_A, get_pair_density, get_s_factor, sample_cos_chi, deflect_pairs, \
+    get_pair_rounds
+from plasma_physics.pysrc.utils.random_streams import get_generator
+
+
+class NanbuEnsembleCollisionModel(object):
+    # Maximum number of rounds of pairs between two species per time step, see get_pair_rounds
+    max_pair_rounds = 16
+
+    def __init__(self, number_densities, particles, particle_weightings, coulomb_logarithm,
+                 frozen_species=None, include_self_collisions=False, rng=None, volume=1.0, scattering_table=None):
+        """
+        Initialiser for an ensemble of R independent Nanbu simulations, with the same number of simulated particles of
+        each species
+
+        number_densities: array of number of simulated particles of different species, shared by all replicas
+        particles: RxS array of ChargedParticle of each species in each replica, or array of S particles shared by
+                   all replicas
+        particle_weightings: RxS array of particle weights, or array of S weights shared by all replicas
+        coulomb_logarithm: fixed coulomb logarithm, or array of the coulomb logarithm of each replica
+        frozen_species: array of booleans, True for species with velocities that are not updated
+        include_self_collisions: boolean to determine if self collisions are carried out. They are always carried out
+                                 for a single species
+        rng: numpy Generator or seed used to sample collisions, defaulting to a seed of 1
+        volume: volume occupied by the particles, or array of the volume of each replica
+        scattering_table: NanbuScatteringTable used to sample scattering angles, or None to evaluate the inverse CDF
+                          for each pair
+        """
+        assert isinstance(number_densities, np.ndarray) and len(number_densities.shape) == 1
+        assert np.all(number_densities > 0)
+        num_species = number_densities.shape[0]
+        particles = np.asarray(particles, dtype=object)
+        for particle in particles.ravel():
+            assert isinstance(particle, ChargedParticle)
+        particle_weightings = np.asarray(particle_weightings, dtype=float)
+        assert np.all(particle_weightings > 0)
+
+        # Store the properties of each replica as RxS arrays
+        shape = np.broadcast_shapes(particles.shape, particle_weightings.shape, (1, num_species))
+        assert len(shape) == 2, shape
+        self.__num_replicas = shape[0]
+        masses = np.asarray([particle.m for particle in particles.ravel()]).reshape(particles.shape)
+        charges = np.asarray([particle.q for particle in particles.ravel()]).reshape(particles.shape)
+        self.__m = np.broadcast_to(masses, shape)
+        self.__q = np.broadcast_to(charges, shape)
+        self.__particle_weights = np.broadcast_to(particle_weightings, shape)
+
+        self.__coulomb_logarithm = np.broadcast_to(np.asarray(coulomb_logarithm, dtype=float), (self.__num_replicas,))
+        self.__volume = np.broadcast_to(np.asarray(volume, dtype=float), (self.__num_replicas,))
+        assert np.all(self.__volume > 0.0)
+
+        self.__num_species = num_species
+        self.__number_densities = number_densities.astype(int)
+        self.__frozen_species = np.zeros(num_species, dtype=bool) if frozen_species is None else frozen_species
+        self.__include_self_collisions = include_self_collisions or num_species == 1
+        self.__species_start_idx = np.concatenate(([0], np.cumsum(self.__number_densities)[:-1]))
+
+        # Set max s value to 6.0 as in Nanbu
+        self.__A_data = get_A_data()
+        self.__max_s = 6.0
+
+        assert scattering_table is None or isinstance(scattering_table, NanbuScatteringTable)
+        self.__scattering_table = scattering_table
+
+        self.rng = get_generator(1 if rng is None else rng)
+
+    @property
+    def num_replicas(self):
+        return self.__num_replicas
+
+    def __calculate_s(self, idx_A, idx_B, g_mag, dt, pair_replicas):
+        """
+        Calculate s parameter for collisions, with the density of pairs of the serial model
+
+        idx_A: index of species A in arrays
+        idx_B: index of species B in arrays
+        g_mag: relative velocity magnitude of each pair
+        dt: array of the time step of each replica
+        pair_replicas: replica of each pair
+        """
+        n = get_pair_density(self.__number_densities[idx_A], self.__number_densities[idx_B],
+                             self.__particle_weights[:, idx_A], self.__particle_weights[:, idx_B],
+                             self.__num_species == 1, self.__volume)
+        s_factor = get_s_factor(self.__q[:, idx_A], self.__q[:, idx_B], self.__m[:, idx_A], self.__m[:, idx_B], n,
+                                self.__coulomb_logarithm, dt)
+
+        return s_factor[pair_replicas] / g_mag ** 3
+
+    def __get_pairs(self, idx_A, idx_B):
+        """
+        Randomly pair particles for coulomb collisions, with an independent permutation of each species in each
+        replica. The rounds of pairs are the same as in the serial model
+
+        idx_A: index of species A in arrays
+        idx_B: index of species B in arrays
+        return: list of rounds of pairs, each with RxP arrays of the indices in the velocity array of the particles of
+                species A and B in each pair, and the factor by which the s parameters of the pairs are scaled
+        """
+        perm_A = self.__species_start_idx[idx_A] + self.__permute(self.__number_densities[idx_A])
+        if idx_A == idx_B:
+            return get_pair_rounds(perm_A)
+
+        perm_B = self.__species_start_idx[idx_B] + self.__permute(self.__number_densities[idx_B])
+        return get_pair_rounds(perm_A, perm_B, NanbuEnsembleCollisionModel.max_pair_rounds)
+
+    def __permute(self, num_particles):
+        """
+        Get an independent random permutation of num_particles for each replica
+        """
+        return self.rng.permuted(np.tile(np.arange(num_particles), (self.__num_replicas, 1)), axis=1)
+
+    def __simulate_coulomb_collisions(self, idx_A, idx_B, new_vel, dt):
+        """
+        The pairs of all replicas are flattened into a single array, so that each pair is gathered from and scattered
+        back to the flattened velocity array of all replicas
+
+        idx_A: index of species properties for species A
+        idx_B: index of species properties for species B
+        new_vel: R x N_T X 3 array of particle velocities of all species in each replica
+        dt: array of the time step of each replica
+        """
+        flat_vel = new_vel.reshape((-1, 3))
+        replica_offsets = new_vel.shape[1] * np.arange(self.__num_replicas)[:, np.newaxis]
+        pair_rounds, s_scale = self.__get_pairs(idx_A, idx_B)
+        for particles_A, particles_B in pair_rounds:
+            pair_replicas = np.repeat(np.arange(self.__num_replicas), particles_A.shape[1])
+            particles_A = (particles_A + replica_offsets).ravel()
+            particles_B = (particles_B + replica_offsets).ravel()
+            velocities_A = flat_vel[particles_A, :]
+            velocities_B = flat_vel[particles_B, :]
+
+            # Calculate relative velocities of species pairs and their magnitudes
+            g_components = velocities_A - velocities_B
+            g_mag = np.sqrt(g_components[:, 0] ** 2 + g_components[:, 1] ** 2 + g_components[:, 2] ** 2)
+
+            # Calculate scattering angles
+            s = s_scale * self.__calculate_s(idx_A, idx_B, g_mag, dt, pair_replicas)
+            A = interpolate_A(s, self.__A_data) if self.__scattering_table is None else None
+            cos_chi = sample_cos_chi(self.rng, s, A, self.__scattering_table, self.__max_s)
+
+            deflect_pairs(self.rng, velocities_A, velocities_B, g_components, g_mag, cos_chi,
+                          self.__m[pair_replicas, idx_A], self.__m[pair_replicas, idx_B],
+                          self.__particle_weights[pair_replicas, idx_A], self.__particle_weights[pair_replicas, idx_B],
+                          self.__frozen_species[idx_A], self.__frozen_species[idx_B])
+            flat_vel[particles_A, :] = velocities_A
+            flat_vel[particles_B, :] = velocities_B
+
+    def single_time_step(self, velocities, dt):
+        """
+        velocities: R x N x 3 array of velocities of each replica
+        dt: time step, or array of the time step of each replica
+        """
+        dt = np.broadcast_to(np.asarray(dt, dtype=float), (self.__num_replicas,))
+        new_vel = np.array(velocities, dtype=float, order="C")
+
+        # Carry out binary collisions between plasmas of different species
+        for i in range(self.__num_species):
+            for j in range(i + 1, self.__num_species):
+                self.__simulate_coulomb_collisions(i, j, new_vel, dt)
+
+        # Carry out self-collisions of each plasma species
+        if self.__include_self_collisions:
+            for i in range(self.__num_species):
+                self.__simulate_coulomb_collisions(i, i, new_vel, dt)
+
+        return new_vel
+
+    def run_sim(self, velocities, dt, final_time, seed=None, diagnostics=None, diagnostic_interval=1,
+                history_interval=1):
+        """
+        Run simulation of all replicas. Replicas may have different time steps and final times, but must take the same
+        number of steps
+
+        velocities: R x N x 3 array of velocities of each replica, the velocities contain the particles of each
+                    species sequentially
+        dt: time step, or array of the time step of each replica
+        final_time: time of simulation, or array of the final time of each replica
+        seed: seed of a new Generator for the simulation, or None to continue with the Generator of the model
+        diagnostics: list of the list of diagnostics of each replica, evaluated during the simulation
+        diagnostic_interval: number of steps between evaluations of the diagnostics
+        history_interval: number of steps between stored velocities, or None to only store the initial and final
+                          velocities
+
+        return: R x num stored array of times of the stored velocities, and stored velocities with shape
+                (R, N, 3, num stored)
+        """
+        assert velocities.shape == (self.__num_replicas, np.sum(self.__number_densities), 3), velocities.shape
+        assert diagnostics is None or len(diagnostics) == self.__num_replicas
+
+        if seed is not None:
+            self.rng = get_generator(seed)
+
+        dt = np.broadcast_to(np.asarray(dt, dtype=float), (self.__num_replicas,))
+        final_time = np.broadcast_to(np.asarray(final_time, dtype=float), (self.__num_replicas,))
+        replica_steps = np.asarray([int(math.ceil(t_f / h) + 1) for t_f, h in zip(final_time, dt)])
+        assert np.all(replica_steps == replica_steps[0]), "Replicas must take the same number of steps"
+        num_steps = replica_steps[0]
+
+        recorders = [SimulationRecorder(velocities.shape[1], num_steps,
+                                        diagnostics=None if diagnostics is None else diagnostics[r],
+                                        diagnostic_interval=diagnostic_interval, history_interval=history_interval)
+                     for r in range(self.__num_replicas)]
+        idx = 1
+        t = np.zeros(self.__num_replicas)
+        for r, recorder in enumerate(recorders):
+            recorder.record(0, t[r], velocities[r])
+        print("Starting simulation...")
+        while idx < num_steps:
+            t += dt
+            print("Timestep {}".format(idx))
+
+            velocities = self.single_time_step(velocities, dt)
+
+            for r, recorder in enumerate(recorders):
+                recorder.record(idx, t[r], velocities[r])
+
+            idx += 1
+        print("Simulation Complete!")
+
+        histories = [recorder.get_history() for recorder in recorders]
+        return np.stack([times for times, _ in histories]), np.stack([v for _, v in histories])
+
+
+if __name__ == '__main__':
+    pass
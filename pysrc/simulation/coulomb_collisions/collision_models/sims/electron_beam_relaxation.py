@@ -122,10 +122,11 @@ def run_electon_beam_into_electron_gas_sim(sim_type):
     velocities[:n, :] = np.asarray([0.0, 0.0, beam_velocity])
 
     # Set initial velocity conditions of background
+    rng = np.random.default_rng(1)
     k_T = 2.0
     sigma = np.sqrt(2 * k_T * PhysicalConstants.electron_charge / p_1.m)
     # Not sure if this is correct - taking the 3D velocity magnitude, and dividing by sqrt(3)
-    maxwell_velocities = np.random.normal(loc=0.0, scale=sigma, size=velocities[n:, :].shape) / np.sqrt(3)
+    maxwell_velocities = rng.normal(loc=0.0, scale=sigma, size=velocities[n:, :].shape) / np.sqrt(3)
     velocities[n:] = maxwell_velocities
 
     tau = get_relaxation_time(p_1, n * w_2, beam_velocity)
@@ -215,13 +216,14 @@ def run_electon_beam_into_argon_gas_sim(sim_type):
     velocities[:n, :] = np.asarray([0.0, 0.0, beam_velocity])
 
     # Set initial velocity conditions of background
+    rng = np.random.default_rng(1)
     k_T = 2.0
     sigma = np.sqrt(2 * k_T * PhysicalConstants.electron_charge / p_2.m)
-    electron_velocities = np.random.normal(loc=0.0, scale=sigma, size=velocities[n:2*n, :].shape) / np.sqrt(3)
+    electron_velocities = rng.normal(loc=0.0, scale=sigma, size=velocities[n:2*n, :].shape) / np.sqrt(3)
     velocities[n:2*n, :] = electron_velocities
     k_T = 0.02
     sigma = np.sqrt(2 * k_T * PhysicalConstants.electron_charge / p_3.m)
-    ion_velocities = np.random.normal(loc=0.0, scale=sigma, size=velocities[2*n:, :].shape) / np.sqrt(3)
+    ion_velocities = rng.normal(loc=0.0, scale=sigma, size=velocities[2*n:, :].shape) / np.sqrt(3)
     velocities[2*n:, :] = ion_velocities
 
     tau = get_relaxation_time(p_1, n * w_2, beam_velocity)
@@ -42,12 +42,12 @@ def run_electron_thermal_relaxation_sim(sim_type):
     Run a simulation of single species electron thermal relaxation
     """
     # Set seed
-    np.random.seed(1)
+    rng = np.random.default_rng(1)
     
     p_1 = ChargedParticle(PhysicalConstants.electron_mass, -PhysicalConstants.electron_charge)
     n = int(1e4)
 
-    sim = sim_type(n, p_1, 1, coulomb_logarithm=10.0)
+    sim = sim_type(n, p_1, 1, coulomb_logarithm=10.0, rng=rng)
 
     T_y = 11500.0
     T_factor = 1.3
@@ -55,9 +55,9 @@ def run_electron_thermal_relaxation_sim(sim_type):
     velocities = np.zeros((n, 3))
     sigma_ort = np.sqrt(PhysicalConstants.boltzmann_constant * T_y / p_1.m)
     sigma_x = np.sqrt(PhysicalConstants.boltzmann_constant * T_factor * T_y / p_1.m)
-    velocities[:, 0] = np.random.normal(loc=0.0, scale=sigma_x, size=velocities[:, 0].shape)
-    velocities[:, 1] = np.random.normal(loc=0.0, scale=sigma_ort, size=velocities[:, 1].shape)
-    velocities[:, 2] = np.random.normal(loc=0.0, scale=sigma_ort, size=velocities[:, 2].shape)
+    velocities[:, 0] = rng.normal(loc=0.0, scale=sigma_x, size=velocities[:, 0].shape)
+    velocities[:, 1] = rng.normal(loc=0.0, scale=sigma_ort, size=velocities[:, 1].shape)
+    velocities[:, 2] = rng.normal(loc=0.0, scale=sigma_ort, size=velocities[:, 2].shape)
 
     # Get simulation time
     tau = get_relaxation_time(p_1, n, T_e)
@@ -68,7 +68,7 @@ def run_electron_thermal_relaxation_sim(sim_type):
     T_y = np.std(velocities[:, 1], axis=0) ** 2 * p_1.m / (PhysicalConstants.boltzmann_constant)
     T_z = np.std(velocities[:, 2], axis=0) ** 2 * p_1.m / (PhysicalConstants.boltzmann_constant)
 
-    t, v_results = sim.run_sim(velocities, dt, final_time)
+    t, v_results = sim.run_sim(velocities, dt, final_time, seed=None)
 
     t /= tau
     dT_0 = (T_factor - 1.0) * T_y
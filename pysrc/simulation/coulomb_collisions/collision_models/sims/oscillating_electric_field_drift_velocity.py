@@ -28,13 +28,14 @@ def run_sim():
                               coulomb_logarithm=15.9, frozen_species=np.asarray([False, True]))
 
     # Set initial velocity conditions of background
+    rng = np.random.default_rng(1)
     velocities = np.zeros((2 * n, 3))
     k_T = 1e3
     sigma = np.sqrt(2 * k_T * PhysicalConstants.electron_charge / p_1.m)
-    electron_velocities = np.random.normal(loc=0.0, scale=sigma, size=velocities[:n, :].shape) / np.sqrt(3)
+    electron_velocities = rng.normal(loc=0.0, scale=sigma, size=velocities[:n, :].shape) / np.sqrt(3)
     velocities[:n, :] = electron_velocities
     sigma = np.sqrt(2 * k_T * PhysicalConstants.electron_charge / p_2.m)
-    ion_velocities = np.random.normal(loc=0.0, scale=sigma, size=velocities[:n, :].shape) / np.sqrt(3)
+    ion_velocities = rng.normal(loc=0.0, scale=sigma, size=velocities[:n, :].shape) / np.sqrt(3)
     velocities[n:, :] = ion_velocities
 
     V = np.sqrt(8.0 * k_T / (np.pi * p_1.m))
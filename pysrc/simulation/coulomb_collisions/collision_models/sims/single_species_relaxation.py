@@ -27,7 +27,7 @@ def run_sim(sim_type):
     # Set seed
     # for seed in range(5):
     seed = 1
-    np.random.seed(seed)
+    rng = np.random.default_rng(seed)
 
     # Set up simulation
     particle = ChargedParticle(2.01410178 * 1.66054e-27, PhysicalConstants.electron_charge)
@@ -35,11 +35,11 @@ def run_sim(sim_type):
     weight = 1
     weighted_particle = ChargedParticle(2.01410178 * 1.66054e-27 * weight,
                                         PhysicalConstants.electron_charge * weight)
-    sim = sim_type(n, particle, weight)
+    sim = sim_type(n, particle, weight, rng=rng)
 
     # Get initial uniform velocities
     v_max = 1.0
-    velocities = np.random.uniform(-v_max, v_max, size=(n, 3))
+    velocities = rng.uniform(-v_max, v_max, size=(n, 3))
 
     # Get time step from collisional frequencies
     c = CoulombCollision(weighted_particle, weighted_particle, 1.0, 2.0 * v_max)
@@ -50,7 +50,7 @@ def run_sim(sim_type):
     dt = 0.1 * collision_time
     final_time = 2.5 * collision_time
 
-    t, v_results = sim.run_sim(velocities, dt, final_time)
+    t, v_results = sim.run_sim(velocities, dt, final_time, seed=None)
 
     post_process_results(t, v_results)
 
@@ -0,0 +1,78 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains tests of the batched pair collisions of the Takizuka-Abe collision model
+"""
+
+import unittest
+import numpy as np
+
+from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.abe_collison_model import \
+    AbeCoulombCollisionModel
+from plasma_physics.pysrc.theory.coulomb_collisions.coulomb_collision import ChargedParticle
+from plasma_physics.pysrc.utils.physical_constants import PhysicalConstants
+
+
+class AbeCollisionModelTest(unittest.TestCase):
+    def setUp(self):
+        self.electron = ChargedParticle(PhysicalConstants.electron_mass, -PhysicalConstants.electron_charge)
+        self.ion = ChargedParticle(2.01410178 * 1.66054e-27, PhysicalConstants.electron_charge)
+        self.n = 1000
+        self.dt = 0.1
+        self.velocities = np.random.default_rng(0).normal(0.0, 1e3, size=(self.n, 3))
+
+    def test_single_species_conservation(self):
+        sim = AbeCoulombCollisionModel(self.n, self.electron, 1, rng=1)
+        velocities = self.velocities.copy()
+        new_vel = sim.single_time_step(velocities, self.dt)
+
+        np.testing.assert_array_equal(velocities, self.velocities)
+        self.assertFalse(np.allclose(new_vel, self.velocities))
+        np.testing.assert_allclose(np.sum(new_vel, axis=0), np.sum(self.velocities, axis=0), atol=1e-6)
+        np.testing.assert_allclose(np.sum(new_vel ** 2), np.sum(self.velocities ** 2), rtol=1e-12)
+
+    def test_two_species_conservation(self):
+        sim = AbeCoulombCollisionModel(self.n // 2, self.electron, 1, N_2=self.n // 2, particle_2=self.ion, w_2=1,
+                                       rng=1)
+        new_vel = sim.single_time_step(self.velocities.copy(), self.dt)
+
+        masses = np.concatenate((np.ones(self.n // 2) * self.electron.m, np.ones(self.n // 2) * self.ion.m))
+        momentum = np.sum(masses[:, np.newaxis] * self.velocities, axis=0)
+        energy = np.sum(masses * np.sum(self.velocities ** 2, axis=1))
+        np.testing.assert_allclose(np.sum(masses[:, np.newaxis] * new_vel, axis=0), momentum,
+                                   atol=1e-12 * np.max(np.abs(momentum)))
+        np.testing.assert_allclose(np.sum(masses * np.sum(new_vel ** 2, axis=1)), energy, rtol=1e-12)
+
+    def test_frozen_species(self):
+        sim = AbeCoulombCollisionModel(self.n // 2, self.electron, 1, N_2=self.n // 2, particle_2=self.ion, w_2=1,
+                                       freeze_species_2=True, rng=1)
+        new_vel = sim.single_time_step(self.velocities.copy(), self.dt)
+
+        np.testing.assert_array_equal(new_vel[self.n // 2:], self.velocities[self.n // 2:])
+        self.assertFalse(np.allclose(new_vel[:self.n // 2], self.velocities[:self.n // 2]))
+
+    def test_aligned_relative_velocity(self):
+        sim = AbeCoulombCollisionModel(2, self.electron, 1, rng=1)
+        v_1 = np.asarray([[0.0, 0.0, 1e3], [1.0, 2.0, 1e3]])
+        v_2 = np.asarray([[0.0, 0.0, -1e3], [1.0, 2.0, -1e3]])
+        new_v_1, new_v_2 = sim.calculate_batch_post_collision_velocities(v_1, v_2, self.dt)
+
+        self.assertTrue(np.all(np.isfinite(new_v_1)) and np.all(np.isfinite(new_v_2)))
+        np.testing.assert_allclose(new_v_1 + new_v_2, v_1 + v_2, atol=1e-9)
+        np.testing.assert_allclose(np.linalg.norm(new_v_1 - new_v_2, axis=1), np.linalg.norm(v_1 - v_2, axis=1))
+
+    def test_single_pair_matches_batch(self):
+        v_1 = self.velocities[:1]
+        v_2 = self.velocities[1:2]
+        sim = AbeCoulombCollisionModel(2, self.electron, 1, rng=3)
+        new_v_1, new_v_2 = sim.calculate_post_collision_velocities(v_1[0], v_2[0], self.dt, 0, 1)
+        sim = AbeCoulombCollisionModel(2, self.electron, 1, rng=3)
+        batch_v_1, batch_v_2 = sim.calculate_batch_post_collision_velocities(v_1, v_2, self.dt)
+
+        np.testing.assert_array_equal(new_v_1, batch_v_1[0])
+        np.testing.assert_array_equal(new_v_2, batch_v_2[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains tests of the cell-local coulomb collision driver
+"""
+
+import unittest
+import numpy as np
+
+from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.cell_collisions import CartesianCellGrid, \
+    RadialCellGrid, CellCollisions, sort_by_key
+from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.nanbu_collision_model import \
+    NanbuCollisionModel
+from plasma_physics.pysrc.theory.coulomb_collisions.coulomb_collision import ChargedParticle
+from plasma_physics.pysrc.utils.physical_constants import PhysicalConstants
+
+
+class CellGridTest(unittest.TestCase):
+    def test_cartesian_grid(self):
+        grid = CartesianCellGrid(np.zeros(3), np.asarray([2.0, 1.0, 1.0]), np.asarray([2, 1, 2]))
+        X = np.asarray([[0.5, 0.5, 0.25], [1.5, 0.5, 0.75], [2.5, 0.5, 0.5], [0.5, -0.1, 0.5]])
+        np.testing.assert_array_equal(grid.get_cell_indices(X), np.asarray([0, 3, -1, -1]))
+        np.testing.assert_allclose(grid.get_volumes(), np.ones(4) * 0.5)
+
+    def test_radial_grid(self):
+        grid = RadialCellGrid(np.asarray([0.0, 1.0, 2.0]))
+        X = np.asarray([[0.5, 0.0, 0.0], [0.0, -1.5, 0.0], [0.0, 0.0, 3.0]])
+        np.testing.assert_array_equal(grid.get_cell_indices(X), np.asarray([0, 1, -1]))
+        np.testing.assert_allclose(grid.get_volumes(), 4.0 / 3.0 * np.pi * np.asarray([1.0, 7.0]))
+
+    def test_sort_by_key(self):
+        keys = np.asarray([2, 0, 2, 1, 0, 2])
+        order, starts = sort_by_key(keys, 4)
+        np.testing.assert_array_equal(keys[order], np.sort(keys))
+        np.testing.assert_array_equal(order, np.asarray([1, 4, 3, 0, 2, 5]))
+        np.testing.assert_array_equal(starts, np.asarray([0, 2, 3, 6, 6]))
+
+    def test_sort_by_key_with_many_keys(self):
+        # Keys of more than 16 bits are sorted with two passes of the radix sort
+        num_keys = 65 ** 3 * 2
+        keys = np.random.default_rng(0).integers(0, num_keys, 10000)
+        order, starts = sort_by_key(keys, num_keys)
+        np.testing.assert_array_equal(order, np.argsort(keys, kind="stable"))
+        np.testing.assert_array_equal(starts, np.searchsorted(np.sort(keys), np.arange(num_keys + 1)))
+
+
+class CellCollisionsTest(unittest.TestCase):
+    def setUp(self):
+        self.electron = ChargedParticle(PhysicalConstants.electron_mass, -PhysicalConstants.electron_charge)
+        self.grid = CartesianCellGrid(np.zeros(3), np.asarray([2.0, 1.0, 1.0]), np.asarray([2, 1, 1]))
+        rng = np.random.default_rng(0)
+        self.n = 401
+        self.X = rng.uniform(0.0, 1.0, size=(self.n, 3)) * np.asarray([2.5, 1.0, 1.0])
+        self.V = rng.normal(0.0, 1e3, size=(self.n, 3))
+        self.V[self.X[:, 0] < 1.0, 2] += 5e3
+        self.cells = self.grid.get_cell_indices(self.X)
+
+    def check_cell_conservation(self, new_V):
+        for cell in range(self.grid.num_cells):
+            in_cell = self.cells == cell
+            np.testing.assert_allclose(np.sum(new_V[in_cell], axis=0), np.sum(self.V[in_cell], axis=0),
+                                       atol=1e-6)
+            np.testing.assert_allclose(np.sum(new_V[in_cell] ** 2), np.sum(self.V[in_cell] ** 2), rtol=1e-10)
+        outside = self.cells == -1
+        np.testing.assert_array_equal(new_V[outside], self.V[outside])
+
+    def test_nanbu_cells(self):
+        collisions = CellCollisions(self.grid, [self.electron], [10 ** 6], rng=1)
+        new_V = collisions.single_time_step(self.X, self.V, np.zeros(self.n, dtype=int), 1e-3)
+
+        self.assertFalse(np.allclose(new_V[self.cells >= 0], self.V[self.cells >= 0]))
+        self.check_cell_conservation(new_V)
+
+    def test_abe_cells(self):
+        collisions = CellCollisions(self.grid, [self.electron], [10 ** 6], model="Abe", rng=1)
+        new_V = collisions.single_time_step(self.X, self.V, np.zeros(self.n, dtype=int), 1e-3)
+
+        self.assertFalse(np.allclose(new_V[self.cells >= 0], self.V[self.cells >= 0]))
+        self.check_cell_conservation(new_V)
+
+    def test_abe_odd_particle_numbers(self):
+        # With an odd number of particles in a cell, the particle that sits out of each step is chosen at random
+        X = np.ones((5, 3)) * 0.5
+        V = np.random.default_rng(0).normal(0.0, 1e3, size=(5, 3))
+        collisions = CellCollisions(self.grid, [self.electron], [10 ** 6], model="Abe", rng=1)
+        num_unchanged = np.zeros(5)
+        for _ in range(50):
+            new_V = collisions.single_time_step(X, V, np.zeros(5, dtype=int), 1e-3)
+            unchanged = np.all(new_V == V, axis=1)
+            self.assertEqual(np.sum(unchanged), 1)
+            num_unchanged += unchanged
+            V = new_V
+        self.assertTrue(np.all(num_unchanged > 0))
+        self.assertTrue(np.all(num_unchanged < 50))
+
+    def test_multiple_species(self):
+        ion = ChargedParticle(2.014102 * 1.66054e-27, PhysicalConstants.electron_charge)
+        species = np.arange(self.n) % 2
+        collisions = CellCollisions(self.grid, [self.electron, ion], [10 ** 6, 10 ** 6], rng=1)
+        new_V = collisions.single_time_step(self.X, self.V, species, 1e-3)
+
+        masses = np.where(species == 0, self.electron.m, ion.m)
+        for cell in range(self.grid.num_cells):
+            in_cell = self.cells == cell
+            np.testing.assert_allclose(np.sum(masses[in_cell, np.newaxis] * new_V[in_cell], axis=0),
+                                       np.sum(masses[in_cell, np.newaxis] * self.V[in_cell], axis=0),
+                                       atol=1e-10 * ion.m * 1e3)
+
+    def test_absent_species_are_kept(self):
+        # A cell holding a single species is collided by a model of all species, so that the self collisions of the
+        # species do not depend on which other species are in the cell
+        ion = ChargedParticle(2.014102 * 1.66054e-27, PhysicalConstants.electron_charge)
+        collisions = CellCollisions(self.grid, [self.electron, ion], [10 ** 6, 10 ** 6], coulomb_logarithm=10.0)
+        V = self.V[:50]
+        new_V = collisions.collide_cell(V, np.asarray([50, 0]), 0.5, 1e-3, np.random.default_rng(3))
+
+        model = NanbuCollisionModel(np.asarray([50, 0]), np.asarray([self.electron, ion]),
+                                    np.asarray([10 ** 6, 10 ** 6]), coulomb_logarithm=10.0,
+                                    include_self_collisions=True, rng=3, volume=0.5)
+        np.testing.assert_array_equal(new_V, model.single_time_step(V, 1e-3))
+
+    def test_results_are_independent_of_threads(self):
+        for model in ["Nanbu", "Abe"]:
+            results = []
+            for num_threads in [1, 4]:
+                collisions = CellCollisions(self.grid, [self.electron], [10 ** 6], model=model, rng=1,
+                                            num_threads=num_threads)
+                V = self.V
+                for _ in range(3):
+                    V = collisions.single_time_step(self.X, V, np.zeros(self.n, dtype=int), 1e-3)
+                results.append(V)
+            np.testing.assert_array_equal(results[0], results[1])
+
+    def test_steps_use_different_streams(self):
+        collisions = CellCollisions(self.grid, [self.electron], [10 ** 6], rng=1)
+        V_1 = collisions.single_time_step(self.X, self.V, np.zeros(self.n, dtype=int), 1e-3)
+        V_2 = collisions.single_time_step(self.X, self.V, np.zeros(self.n, dtype=int), 1e-3)
+        self.assertFalse(np.array_equal(V_1[self.cells >= 0], V_2[self.cells >= 0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
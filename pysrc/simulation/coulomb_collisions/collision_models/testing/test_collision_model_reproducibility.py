@@ -0,0 +1,69 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains tests of the reproducibility of collision models with explicit random number streams
+"""
+
+import unittest
+import numpy as np
+
+from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.abe_collison_model import \
+    AbeCoulombCollisionModel
+from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.nanbu_collision_model import \
+    NanbuCollisionModel
+from plasma_physics.pysrc.theory.coulomb_collisions.coulomb_collision import ChargedParticle
+from plasma_physics.pysrc.utils.physical_constants import PhysicalConstants
+
+
+class CollisionModelReproducibilityTest(unittest.TestCase):
+    def setUp(self):
+        self.particle = ChargedParticle(PhysicalConstants.electron_mass, -PhysicalConstants.electron_charge)
+        self.n = 50
+        self.velocities = np.random.default_rng(0).normal(0.0, 1e3, size=(self.n, 3))
+        self.dt = 0.1
+        self.final_time = 0.5
+
+    def run_model(self, model_type, seed, run_seed=None):
+        if model_type == "Abe":
+            sim = AbeCoulombCollisionModel(self.n, self.particle, 1, rng=seed)
+        else:
+            sim = NanbuCollisionModel(self.n, self.particle, 1, coulomb_logarithm=10.0, rng=seed)
+
+        return sim.run_sim(self.velocities.copy(), self.dt, self.final_time, seed=run_seed)
+
+    def test_same_seed_is_reproducible(self):
+        for model_type in ["Abe", "Nanbu"]:
+            t_1, v_1 = self.run_model(model_type, 5)
+            t_2, v_2 = self.run_model(model_type, 5)
+            np.testing.assert_array_equal(t_1, t_2)
+            np.testing.assert_array_equal(v_1, v_2)
+
+    def test_different_seeds_differ(self):
+        for model_type in ["Abe", "Nanbu"]:
+            _, v_1 = self.run_model(model_type, 5)
+            _, v_2 = self.run_model(model_type, 6)
+            self.assertFalse(np.array_equal(v_1[:, :, -1], v_2[:, :, -1]))
+
+    def test_global_state_is_not_used(self):
+        np.random.seed(1)
+        _, v_1 = self.run_model("Nanbu", 5)
+        np.random.seed(2)
+        _, v_2 = self.run_model("Nanbu", 5)
+        np.testing.assert_array_equal(v_1, v_2)
+
+    def test_run_sim_seed_replaces_generator(self):
+        for model_type in ["Abe", "Nanbu"]:
+            _, v_1 = self.run_model(model_type, 5)
+            _, v_2 = self.run_model(model_type, 6, run_seed=5)
+            np.testing.assert_array_equal(v_1, v_2)
+
+    def test_default_seed(self):
+        for model_type in ["Abe", "Nanbu"]:
+            _, v_1 = self.run_model(model_type, None)
+            _, v_2 = self.run_model(model_type, 1)
+            np.testing.assert_array_equal(v_1, v_2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains tests of the diagnostics of collision simulations
+"""
+
+import unittest
+import numpy as np
+
+from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.diagnostics import SpeciesMoments, \
+    SpeciesSpeedHistogram, SimulationRecorder
+from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.nanbu_collision_model import \
+    NanbuCollisionModel
+from plasma_physics.pysrc.theory.coulomb_collisions.coulomb_collision import ChargedParticle
+from plasma_physics.pysrc.utils.physical_constants import PhysicalConstants
+
+
+class SpeciesMomentsTest(unittest.TestCase):
+    def test_moments(self):
+        masses = [1.0, 2.0]
+        velocities = np.asarray([[1.0, 0.0, 0.0], [-1.0, 0.0, 0.0], [2.0, 1.0, 0.0], [2.0, -1.0, 0.0]])
+        moments = SpeciesMoments(masses, [2, 2])
+        moments.record(0.5, velocities)
+        results = moments.get_results()
+
+        np.testing.assert_array_equal(results["time"], np.asarray([0.5]))
+        np.testing.assert_allclose(results["mean_velocity"][0], np.asarray([[0.0, 0.0, 0.0], [2.0, 0.0, 0.0]]))
+        np.testing.assert_allclose(results["mean_speed"][0], np.asarray([1.0, np.sqrt(5.0)]))
+        np.testing.assert_allclose(results["energy"][0], np.asarray([0.5, 5.0]))
+        k_B = PhysicalConstants.boltzmann_constant
+        np.testing.assert_allclose(results["temperature_tensor"][0, 0], np.diag([1.0, 0.0, 0.0]) / k_B)
+        np.testing.assert_allclose(results["temperature_tensor"][0, 1], np.diag([0.0, 2.0, 0.0]) / k_B)
+        np.testing.assert_allclose(results["temperature"][0], np.asarray([1.0, 2.0]) / (3.0 * k_B))
+
+    def test_speed_histogram(self):
+        velocities = np.asarray([[0.5, 0.0, 0.0], [1.5, 0.0, 0.0], [0.0, 1.5, 0.0]])
+        histogram = SpeciesSpeedHistogram(np.asarray([0.0, 1.0, 2.0]), [1, 2])
+        histogram.record(0.0, velocities)
+        np.testing.assert_array_equal(histogram.get_results()["count"], np.asarray([[[1, 0], [0, 2]]]))
+
+
+class SimulationRecorderTest(unittest.TestCase):
+    def test_intervals(self):
+        moments = SpeciesMoments([1.0], [2])
+        recorder = SimulationRecorder(2, 8, diagnostics=[moments], diagnostic_interval=3, history_interval=5)
+        for step in range(8):
+            recorder.record(step, 0.1 * step, np.ones((2, 3)) * step)
+
+        times, velocities = recorder.get_history()
+        np.testing.assert_allclose(times, np.asarray([0.0, 0.5, 0.7]))
+        np.testing.assert_array_equal(velocities[0, 0, :], np.asarray([0.0, 5.0, 7.0]))
+        np.testing.assert_allclose(moments.get_results()["time"], np.asarray([0.0, 0.3, 0.6, 0.7]))
+
+    def test_no_history(self):
+        recorder = SimulationRecorder(2, 4, history_interval=None)
+        for step in range(4):
+            recorder.record(step, float(step), np.ones((2, 3)) * step)
+
+        times, velocities = recorder.get_history()
+        np.testing.assert_array_equal(times, np.asarray([0.0, 3.0]))
+        self.assertEqual(velocities.shape, (2, 3, 2))
+
+    def test_run_sim_diagnostics(self):
+        n = 100
+        electron = ChargedParticle(PhysicalConstants.electron_mass, -PhysicalConstants.electron_charge)
+        velocities = np.random.default_rng(0).normal(0.0, 1e3, size=(n, 3))
+        moments = SpeciesMoments([electron.m], [n])
+        sim = NanbuCollisionModel(n, electron, 1, coulomb_logarithm=10.0, rng=1)
+        times, v_results = sim.run_sim(velocities, 0.1, 1.0, seed=None, diagnostics=[moments], history_interval=None)
+
+        results = moments.get_results()
+        self.assertEqual(v_results.shape, (n, 3, 2))
+        self.assertEqual(results["time"].shape[0], 11)
+        np.testing.assert_allclose(results["energy"][:, 0], results["energy"][0, 0], rtol=1e-10)
+
+
+if __name__ == '__main__':
+    unittest.main()
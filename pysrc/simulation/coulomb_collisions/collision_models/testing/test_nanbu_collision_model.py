@@ -0,0 +1,215 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains tests of the scattering angle sampling of the Nanbu collision model
+"""
+
+import os
+import tempfile
+import unittest
+import warnings
+import numpy as np
+
+from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.nanbu_collision_model import \
+    NanbuCollisionModel, NanbuScatteringTable, get_pair_rounds, get_scattering_table, invert_cos_chi_cdf, solve_A
+from plasma_physics.pysrc.theory.coulomb_collisions.coulomb_collision import ChargedParticle
+from plasma_physics.pysrc.utils.physical_constants import PhysicalConstants
+from plasma_physics.pysrc.utils.unit_conversions import UnitConversions
+
+
+class NanbuScatteringAngleTest(unittest.TestCase):
+    def setUp(self):
+        electron = ChargedParticle(PhysicalConstants.electron_mass, -PhysicalConstants.electron_charge)
+        self.sim = NanbuCollisionModel(100, electron, 1, coulomb_logarithm=10.0, rng=1)
+        self.calculate_A = self.sim._NanbuCollisionModel__calculate_A
+        self.calculate_cos_chi = self.sim._NanbuCollisionModel__calculate_cos_chi
+
+    def test_A(self):
+        # A is defined by coth(A) - 1 / A = exp(-s)
+        s = np.asarray([0.01, 0.1, 0.5, 1.0, 3.0, 5.0])
+        A = self.calculate_A(s)
+        np.testing.assert_allclose(1.0 / np.tanh(A) - 1.0 / A, np.exp(-s), rtol=1e-3)
+
+        # Asymptotic forms outside of the table
+        s = np.asarray([1e-5, 7.0])
+        np.testing.assert_allclose(self.calculate_A(s), np.asarray([1e5, 3.0 * np.exp(-7.0)]))
+
+    def test_mean_cos_chi(self):
+        num_samples = 200000
+        for s_val in [1e-4, 0.01, 0.5, 2.0, 5.0]:
+            s = np.ones(num_samples) * s_val
+            cos_chi = self.calculate_cos_chi(self.calculate_A(s), s)
+            self.assertTrue(np.all(np.abs(cos_chi) <= 1.0))
+            self.assertAlmostEqual(np.mean(cos_chi), np.exp(-s_val), delta=5.0 / np.sqrt(num_samples))
+
+    def test_isotropic(self):
+        s = np.ones(200000) * 10.0
+        cos_chi = self.calculate_cos_chi(self.calculate_A(s), s)
+        self.assertAlmostEqual(np.mean(cos_chi), 0.0, delta=0.01)
+        self.assertAlmostEqual(np.var(cos_chi), 1.0 / 3.0, delta=0.01)
+
+    def test_no_overflow(self):
+        s = np.asarray([1e-8, 1e-6, 1e-3])
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            cos_chi = self.calculate_cos_chi(self.calculate_A(s), s)
+        self.assertTrue(np.all(np.isfinite(cos_chi)))
+        self.assertTrue(np.all(cos_chi > 0.9))
+
+
+class NanbuScatteringTableTest(unittest.TestCase):
+    def setUp(self):
+        self.table = get_scattering_table()
+        num_samples = 100000
+        self.U = (np.arange(num_samples) + 0.5) / num_samples
+
+    def test_solve_A(self):
+        s = np.logspace(-6, np.log10(6.0), 50)
+        A = solve_A(s)
+        np.testing.assert_allclose(1.0 / np.tanh(A) - 1.0 / A, np.exp(-s), rtol=1e-10)
+
+    def test_moments(self):
+        # The moments of the table match the inverse CDF, including values of s between or below the values of A
+        for s_val in [1e-6, 1e-4, 1.3e-3, 0.01, 0.1, 0.5, 2.0, 5.9]:
+            s = np.ones(self.U.shape) * s_val
+            exact_cos_chi = invert_cos_chi_cdf(solve_A(s), self.U)
+            cos_chi = self.table.get_cos_chi(s, self.U)
+            self.assertTrue(np.all(np.abs(cos_chi) <= 1.0))
+            np.testing.assert_allclose(np.mean(1.0 - cos_chi), 1.0 - np.exp(-s_val), rtol=1e-3)
+            np.testing.assert_allclose(np.mean((1.0 - cos_chi) ** 2), np.mean((1.0 - exact_cos_chi) ** 2), rtol=1e-3)
+
+    def test_model_sampling(self):
+        electron = ChargedParticle(PhysicalConstants.electron_mass, -PhysicalConstants.electron_charge)
+        sim = NanbuCollisionModel(100, electron, 1, coulomb_logarithm=10.0, rng=1, scattering_table=self.table)
+        calculate_cos_chi = sim._NanbuCollisionModel__calculate_cos_chi
+        for s_val in [0.01, 0.5, 5.0, 10.0]:
+            s = np.ones(200000) * s_val
+            cos_chi = calculate_cos_chi(None, s)
+            expected_mean = np.exp(-s_val) if s_val < 6.0 else 0.0
+            self.assertAlmostEqual(np.mean(cos_chi), expected_mean, delta=5.0 / np.sqrt(s.shape[0]))
+
+    def test_save_and_load(self):
+        table = NanbuScatteringTable(num_s=16, num_U=32)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "table.npz")
+            table.save(file_path)
+            loaded_table = NanbuScatteringTable.load(file_path)
+
+        s = np.logspace(-5, 0, 10)
+        U = self.U[::10000]
+        np.testing.assert_array_equal(loaded_table.get_cos_chi(s, U), table.get_cos_chi(s, U))
+
+
+class NanbuPairingTest(unittest.TestCase):
+    def setUp(self):
+        self.electron = ChargedParticle(PhysicalConstants.electron_mass, -PhysicalConstants.electron_charge)
+        self.dt = 0.1
+
+    def test_self_collision_conservation(self):
+        for n in [1000, 1001]:
+            velocities = np.random.default_rng(0).normal(0.0, 1e3, size=(n, 3))
+            initial_velocities = velocities.copy()
+            sim = NanbuCollisionModel(n, self.electron, 1, coulomb_logarithm=10.0, rng=1)
+            new_vel = sim.single_time_step(velocities, self.dt)
+
+            np.testing.assert_array_equal(velocities, initial_velocities)
+            self.assertEqual(np.sum(np.all(new_vel == velocities, axis=1)), n % 2)
+            np.testing.assert_allclose(np.sum(new_vel, axis=0), np.sum(velocities, axis=0), atol=1e-6)
+            np.testing.assert_allclose(np.sum(new_vel ** 2), np.sum(velocities ** 2), rtol=1e-12)
+
+    def test_self_collisions_with_absent_species(self):
+        # The s parameter of the self collisions of a species is the same whether or not other species are present.
+        # The ions have a negligible weight, so the electrons are not deflected by them, and the single electron pair
+        # has the same relative velocity in each run
+        ion = ChargedParticle(2.014102 * UnitConversions.amu_to_kg, PhysicalConstants.electron_charge)
+        velocities = np.random.default_rng(0).normal(0.0, 1e3, size=(3, 3))
+        s = []
+        for num_ions in [0, 1]:
+            sim = NanbuCollisionModel(np.asarray([2, num_ions]), np.asarray([self.electron, ion]),
+                                      np.asarray([10 ** 12, 1]), coulomb_logarithm=10.0,
+                                      frozen_species=np.asarray([False, True]), include_self_collisions=True, rng=1)
+            sim.single_time_step(velocities[:2 + num_ions], self.dt)
+            s.append(sim.collision_parameters[-1])
+
+        self.assertEqual(s[0], s[1])
+
+
+class NanbuUnequalParticleNumbersTest(unittest.TestCase):
+    def setUp(self):
+        self.alpha = ChargedParticle(6.64424e-27, 2 * PhysicalConstants.electron_charge)
+        self.deuteron = ChargedParticle(2.014102 * UnitConversions.amu_to_kg, PhysicalConstants.electron_charge)
+        self.beam_velocity = np.sqrt(2 * 3.5e6 * PhysicalConstants.electron_charge / self.alpha.m)
+        self.thermal_velocity = np.sqrt(PhysicalConstants.boltzmann_constant * 1e4 / self.deuteron.m)
+
+    def get_velocities(self, N_A, N_B):
+        velocities = np.zeros((N_A + N_B, 3))
+        velocities[:N_A, 2] = self.beam_velocity
+        velocities[N_A:] = np.random.default_rng(0).normal(0.0, self.thermal_velocity, size=(N_B, 3))
+        return velocities
+
+    def test_conservation(self):
+        for N_A, N_B in [(300, 100), (100, 350)]:
+            velocities = self.get_velocities(N_A, N_B)
+            sim = NanbuCollisionModel(np.asarray([N_A, N_B]), np.asarray([self.alpha, self.deuteron]),
+                                      np.asarray([10 ** 15, 10 ** 15]), coulomb_logarithm=10.0, rng=1)
+            new_vel = sim.single_time_step(velocities, 1e-3)
+
+            masses = np.concatenate((np.ones(N_A) * self.alpha.m, np.ones(N_B) * self.deuteron.m))
+            momentum = np.sum(masses[:, np.newaxis] * velocities, axis=0)
+            energy = np.sum(masses * np.sum(velocities ** 2, axis=1))
+            self.assertFalse(np.allclose(new_vel, velocities))
+            np.testing.assert_allclose(np.sum(masses[:, np.newaxis] * new_vel, axis=0), momentum,
+                                       atol=1e-10 * np.max(np.abs(momentum)))
+            np.testing.assert_allclose(np.sum(masses * np.sum(new_vel ** 2, axis=1)), energy, rtol=1e-10)
+
+    def test_trace_species_slowing(self):
+        # The slowing of a trace beam should not depend on the number of simulated beam particles, if the beam
+        # density is the same
+        N_B = 8000
+        slowing = []
+        for N_A, w_A in [(4000, 10 ** 10), (200, 2 * 10 ** 11)]:
+            velocities = self.get_velocities(N_A, N_B)
+            sim = NanbuCollisionModel(np.asarray([N_A, N_B]), np.asarray([self.alpha, self.deuteron]),
+                                      np.asarray([w_A, 10 ** 16]), coulomb_logarithm=10.0, rng=1)
+            for i in range(20):
+                velocities = sim.single_time_step(velocities, 1e-3)
+            slowing.append(1.0 - np.mean(velocities[:N_A, 2]) / self.beam_velocity)
+
+        self.assertGreater(slowing[0], 0.0)
+        self.assertAlmostEqual(slowing[1] / slowing[0], 1.0, delta=0.05)
+
+    def test_max_pair_rounds(self):
+        # A single ion among many electrons would otherwise need a round for every electron
+        perm_A = np.arange(10000)
+        pair_rounds, s_scale = get_pair_rounds(perm_A, np.arange(1), max_rounds=16)
+        self.assertEqual(len(pair_rounds), 16)
+        self.assertEqual(s_scale, 10000 / 16)
+        self.assertEqual(len(np.unique(np.concatenate([particles_A for particles_A, _ in pair_rounds]))), 16)
+        self.assertEqual(get_pair_rounds(perm_A, np.arange(1000), max_rounds=16)[1], 1.0)
+
+    def test_capped_trace_species_slowing(self):
+        # Capping the rounds of a few beam particles among many background particles does not change the slowing of
+        # the beam
+        N_A = 200
+        N_B = 8000
+        slowing = []
+        max_pair_rounds = NanbuCollisionModel.max_pair_rounds
+        try:
+            for max_rounds in [None, max_pair_rounds]:
+                NanbuCollisionModel.max_pair_rounds = max_rounds
+                velocities = self.get_velocities(N_A, N_B)
+                sim = NanbuCollisionModel(np.asarray([N_A, N_B]), np.asarray([self.alpha, self.deuteron]),
+                                          np.asarray([10 ** 10, 10 ** 16]), coulomb_logarithm=10.0, rng=1)
+                for i in range(20):
+                    velocities = sim.single_time_step(velocities, 1e-3)
+                slowing.append(1.0 - np.mean(velocities[:N_A, 2]) / self.beam_velocity)
+        finally:
+            NanbuCollisionModel.max_pair_rounds = max_pair_rounds
+
+        self.assertGreater(slowing[0], 0.0)
+        self.assertAlmostEqual(slowing[1] / slowing[0], 1.0, delta=0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
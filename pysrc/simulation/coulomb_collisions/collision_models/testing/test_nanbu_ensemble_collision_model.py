@@ -0,0 +1,103 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains tests of the ensemble form of the Nanbu collision model
+"""
+
+import unittest
+import numpy as np
+
+from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.diagnostics import SpeciesMoments
+from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.nanbu_collision_model import \
+    NanbuCollisionModel, get_scattering_table
+from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.nanbu_ensemble_collision_model import \
+    NanbuEnsembleCollisionModel
+from plasma_physics.pysrc.theory.coulomb_collisions.coulomb_collision import ChargedParticle
+from plasma_physics.pysrc.utils.physical_constants import PhysicalConstants
+from plasma_physics.pysrc.utils.unit_conversions import UnitConversions
+
+
+class NanbuEnsembleCollisionModelTest(unittest.TestCase):
+    def setUp(self):
+        self.alpha = ChargedParticle(6.64424e-27, 2 * PhysicalConstants.electron_charge)
+        self.deuteron = ChargedParticle(2.014102 * UnitConversions.amu_to_kg, PhysicalConstants.electron_charge)
+        self.N = 200
+        self.number_densities = np.asarray([self.N, self.N])
+        self.beam_velocity = 1e6
+
+    def get_velocities(self, num_replicas, seed=0):
+        velocities = np.zeros((num_replicas, 2 * self.N, 3))
+        velocities[:, :self.N, 2] = self.beam_velocity
+        velocities[:, self.N:, :] = np.random.default_rng(seed).normal(0.0, 1e5, size=(num_replicas, self.N, 3))
+
+        return velocities
+
+    def test_conservation(self):
+        # Replicas of reactant and product beams, with equal weights so that momentum and energy are conserved
+        particles = np.asarray([[self.deuteron, self.deuteron], [self.alpha, self.deuteron]])
+        weights = np.asarray([[10 ** 12, 10 ** 12], [10 ** 13, 10 ** 13]])
+        for scattering_table in [None, get_scattering_table()]:
+            sim = NanbuEnsembleCollisionModel(self.number_densities, particles, weights, 10.0,
+                                              include_self_collisions=True, rng=1, scattering_table=scattering_table)
+            velocities = self.get_velocities(2)
+            new_vel = sim.single_time_step(velocities, np.asarray([1e-4, 2e-4]))
+
+            self.assertFalse(np.allclose(new_vel, velocities))
+            for r in range(2):
+                masses = np.repeat([particles[r, 0].m, particles[r, 1].m], self.N)[:, np.newaxis]
+                np.testing.assert_allclose(np.sum(masses * new_vel[r], axis=0), np.sum(masses * velocities[r], axis=0),
+                                           atol=1e-12 * np.sum(masses) * self.beam_velocity)
+                np.testing.assert_allclose(np.sum(masses * new_vel[r] ** 2), np.sum(masses * velocities[r] ** 2),
+                                           rtol=1e-12)
+
+    def test_matches_serial_model(self):
+        # A trace beam slows on a background at densities spanning the relaxation time, and each replica slows by the
+        # same amount as the serial model on average
+        background_weights = np.asarray([2.5e16, 5e16, 1e17])
+        weights = np.stack((np.ones(3), background_weights), axis=1)
+        dt = 2e-3
+        num_steps = 10
+        num_trials = 4
+        ensemble_velocity = np.zeros(3)
+        serial_velocity = np.zeros(3)
+        for trial in range(num_trials):
+            sim = NanbuEnsembleCollisionModel(self.number_densities, np.asarray([self.deuteron, self.deuteron]),
+                                              weights, 10.0, frozen_species=np.asarray([False, True]), rng=trial)
+            velocities = self.get_velocities(3, seed=trial)
+            for _ in range(num_steps):
+                velocities = sim.single_time_step(velocities, dt)
+            ensemble_velocity += np.mean(velocities[:, :self.N, 2], axis=1) / num_trials
+
+            for r, w in enumerate(background_weights):
+                serial_sim = NanbuCollisionModel(self.number_densities, np.asarray([self.deuteron, self.deuteron]),
+                                                 np.asarray([1, int(w)]), coulomb_logarithm=10.0,
+                                                 frozen_species=np.asarray([False, True]), rng=trial)
+                velocities = self.get_velocities(1, seed=trial)[0]
+                for _ in range(num_steps):
+                    velocities = serial_sim.single_time_step(velocities, dt)
+                serial_velocity[r] += np.mean(velocities[:self.N, 2]) / num_trials
+
+        self.assertTrue(np.all(np.diff(ensemble_velocity) < 0.0))
+        self.assertTrue(serial_velocity[-1] < 0.9 * self.beam_velocity)
+        np.testing.assert_allclose(ensemble_velocity, serial_velocity, rtol=0.05)
+
+    def test_run_sim(self):
+        particles = np.asarray([self.deuteron, self.deuteron])
+        weights = np.asarray([[10 ** 12, 10 ** 12], [10 ** 13, 10 ** 13]])
+        sim = NanbuEnsembleCollisionModel(self.number_densities, particles, weights, 10.0, rng=1)
+        dt = np.asarray([1e-4, 2e-4])
+        moments = [[SpeciesMoments([self.deuteron.m, self.deuteron.m], self.number_densities)] for _ in range(2)]
+        t, v = sim.run_sim(self.get_velocities(2), dt, 10 * dt, diagnostics=moments, history_interval=5)
+
+        self.assertEqual(sim.num_replicas, 2)
+        self.assertEqual(v.shape, (2, 2 * self.N, 3, 3))
+        np.testing.assert_allclose(t, np.outer(dt, [0.0, 5.0, 10.0]))
+        np.testing.assert_allclose(moments[1][0].get_results()["time"], np.arange(11) * dt[1])
+
+        with self.assertRaises(AssertionError):
+            sim.run_sim(self.get_velocities(2), dt, 1e-3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains tests of adaptive time step control of collision simulations
+"""
+
+import unittest
+import numpy as np
+
+from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.abe_collison_model import \
+    AbeCoulombCollisionModel
+from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.diagnostics import SpeciesMoments
+from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.nanbu_collision_model import \
+    NanbuCollisionModel
+from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.timestep_control import \
+    AdaptiveTimestepController
+from plasma_physics.pysrc.theory.coulomb_collisions.coulomb_collision import ChargedParticle
+from plasma_physics.pysrc.utils.physical_constants import PhysicalConstants
+
+
+class AdaptiveTimestepControllerTest(unittest.TestCase):
+    def setUp(self):
+        self.controller = AdaptiveTimestepController(0.01, 0.04, percentile=50.0, max_change=4.0)
+
+    def test_timestep_is_kept_within_band(self):
+        self.assertEqual(self.controller.get_next_timestep(1.0, 1.0, np.asarray([0.02])), 1.0)
+
+    def test_timestep_is_shrunk_above_band(self):
+        self.assertAlmostEqual(self.controller.get_next_timestep(1.0, 1.0, np.asarray([0.04 * 1.25])), 0.4)
+        self.assertAlmostEqual(self.controller.get_next_timestep(1.0, 1.0, np.asarray([1.0])), 0.25)
+
+    def test_timestep_is_grown_below_band(self):
+        self.assertAlmostEqual(self.controller.get_next_timestep(1.0, 1.0, np.asarray([0.008])), 2.5)
+        self.assertAlmostEqual(self.controller.get_next_timestep(1.0, 1.0, np.asarray([0.0])), 4.0)
+
+    def test_timestep_is_grown_without_pairs(self):
+        # No pairs collide in a step if a species is absent
+        self.assertAlmostEqual(self.controller.get_next_timestep(1.0, 1.0, np.zeros(0)), 4.0)
+
+    def test_shortened_steps_are_scaled(self):
+        # A step shortened to reach an output time has proportionally smaller collision parameters
+        self.assertEqual(self.controller.get_next_timestep(0.25, 1.0, np.asarray([0.005])), 1.0)
+        self.assertEqual(self.controller.timesteps, [0.25])
+
+    def test_timestep_limits(self):
+        controller = AdaptiveTimestepController(0.01, 0.04, min_dt=0.8, max_dt=1.5)
+        self.assertEqual(controller.get_next_timestep(1.0, 1.0, np.asarray([0.0])), 1.5)
+        self.assertEqual(controller.get_next_timestep(1.0, 1.0, np.asarray([1.0])), 0.8)
+
+
+class AdaptiveCollisionSimulationTest(unittest.TestCase):
+    def setUp(self):
+        self.particle = ChargedParticle(PhysicalConstants.electron_mass, -PhysicalConstants.electron_charge)
+        self.n = 200
+        self.velocities = np.random.default_rng(0).normal(0.0, 1e3, size=(self.n, 3))
+        self.dt = 1e-3
+        self.final_time = 0.2
+
+    def run_models(self, controller):
+        models = [AbeCoulombCollisionModel(self.n, self.particle, 1, rng=1),
+                  NanbuCollisionModel(self.n, self.particle, 1, coulomb_logarithm=10.0, rng=1)]
+        results = []
+        for model in models:
+            moments = SpeciesMoments([self.particle.m], [self.n])
+            t, v = model.run_sim(self.velocities.copy(), self.dt, self.final_time, diagnostics=[moments],
+                                 diagnostic_interval=50, history_interval=None, timestep_controller=controller)
+            results.append((t, v, moments.get_results()))
+
+        return results
+
+    def test_outputs_are_at_fixed_times(self):
+        fixed_results = self.run_models(None)
+        controller = AdaptiveTimestepController(0.01, 0.04)
+        adaptive_results = self.run_models(controller)
+        for (t_fixed, _, moments_fixed), (t, v, moments) in zip(fixed_results, adaptive_results):
+            np.testing.assert_allclose(t, t_fixed)
+            np.testing.assert_allclose(moments["time"], moments_fixed["time"])
+            self.assertEqual(v.shape, (self.n, 3, 2))
+
+            # Energy is conserved by collisions between particles of the same species
+            np.testing.assert_allclose(moments["energy"][:, 0], moments["energy"][0, 0], rtol=1e-10)
+
+        self.assertAlmostEqual(np.sum(controller.timesteps), self.final_time)
+
+    def test_timestep_is_grown_for_weak_collisions(self):
+        controller = AdaptiveTimestepController(0.01, 0.04)
+        self.run_models(controller)
+
+        # Collisions are weak over the initial time step, so far fewer steps are needed
+        self.assertLess(len(controller.timesteps), self.final_time / self.dt / 4)
+        self.assertGreater(max(controller.timesteps), 4 * self.dt)
+
+    def test_every_step_output_warns(self):
+        # Storing the velocities of every step caps the time step at dt
+        controller = AdaptiveTimestepController(0.01, 0.04)
+        model = NanbuCollisionModel(self.n, self.particle, 1, coulomb_logarithm=10.0, rng=1)
+        with self.assertWarns(RuntimeWarning):
+            model.run_sim(self.velocities.copy(), self.dt, 5 * self.dt, timestep_controller=controller)
+        self.assertEqual(controller.timesteps, [self.dt] * 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains adaptive time step control for collision simulations. The time step is grown or shrunk so that a
+percentile of the collision parameters of the pairs in each step, the s parameter of the Nanbu model or delta squared
+of the Abe model, stays within a target band. Both parameters are proportional to the time step.
+"""
+
+import warnings
+import numpy as np
+
+
+class AdaptiveTimestepController(object):
+    """
+    Controls the time step of a collision simulation from the distribution of the collision parameters of each step
+    """
+    def __init__(self, lower_target, upper_target, percentile=90.0, max_change=2.0, min_dt=0.0, max_dt=np.inf):
+        """
+        lower_target: lower bound of the target band of the collision parameter percentile
+        upper_target: upper bound of the target band of the collision parameter percentile
+        percentile: percentile of the collision parameters that is kept within the target band
+        max_change: largest factor by which the time step is changed in a single step
+        min_dt: smallest allowed time step
+        max_dt: largest allowed time step
+        """
+        assert 0.0 < lower_target < upper_target, "{}, {}".format(lower_target, upper_target)
+        assert 0.0 <= percentile <= 100.0, percentile
+        assert max_change > 1.0, max_change
+        assert 0.0 <= min_dt < max_dt, "{}, {}".format(min_dt, max_dt)
+
+        self.lower_target = lower_target
+        self.upper_target = upper_target
+        self.percentile = percentile
+        self.max_change = max_change
+        self.min_dt = min_dt
+        self.max_dt = max_dt
+        self.reset()
+
+    def reset(self):
+        """
+        Clear the time steps taken
+        """
+        self.timesteps = []
+
+    def get_next_timestep(self, dt, step_dt, collision_parameters):
+        """
+        Get the time step of the next step
+
+        dt: time step that was taken
+        step_dt: time step of the controller, which is larger than dt if the step was shortened to reach an output time
+        collision_parameters: collision parameters of the pairs in the step, which are empty if no pairs collided
+        return: time step of the controller for the next step
+        """
+        self.timesteps.append(dt)
+
+        # Scale the percentile to the time step of the controller, as the collision parameters are proportional to dt.
+        # If no pairs collided, the time step is not limited by collisions and is grown
+        if np.size(collision_parameters) == 0:
+            parameter = 0.0
+        else:
+            parameter = np.percentile(collision_parameters, self.percentile) * step_dt / dt
+        if self.lower_target <= parameter <= self.upper_target:
+            new_dt = step_dt
+        elif parameter == 0.0:
+            new_dt = step_dt * self.max_change
+        else:
+            target = np.sqrt(self.lower_target * self.upper_target)
+            new_dt = step_dt * np.clip(target / parameter, 1.0 / self.max_change, self.max_change)
+
+        return float(np.clip(new_dt, self.min_dt, self.max_dt))
+
+
+def run_adaptive_steps(model, velocities, dt, recorder, controller):
+    """
+    Run a collision simulation with an adaptive time step. Outputs are recorded at the same times as a simulation
+    with a fixed time step of dt, so steps are shortened to reach each step of the fixed time step simulation at
+    which the recorder evaluates diagnostics or stores velocities. The interval between output times therefore caps
+    the time step, and the time step cannot be grown beyond dt if every step is an output step
+
+    model: collision model, with a single_time_step function and the collision parameters of its last step
+    velocities: Nx3 array of initial velocities, which has already been recorded
+    dt: time step of the output times, which is also the initial time step
+    recorder: SimulationRecorder
+    controller: AdaptiveTimestepController
+    return: final velocities
+    """
+    assert isinstance(controller, AdaptiveTimestepController)
+    controller.reset()
+
+    record_steps = recorder.get_record_steps()
+    if len(record_steps) > 2 and np.max(np.diff(record_steps)) == 1:
+        warnings.warn("Every step is an output step, so the adaptive time step cannot grow beyond dt. Increase the "
+                      "history and diagnostic intervals, or set history_interval to None", RuntimeWarning)
+
+    step_dt = dt
+    t = 0.0
+    for output_step in record_steps[1:]:
+        output_time = output_step * dt
+        while t < output_time:
+            # Split the remaining time in two rather than leaving a short step before the output time
+            remaining = output_time - t
+            if remaining <= step_dt:
+                step_time = remaining
+            elif remaining < 2.0 * step_dt:
+                step_time = 0.5 * remaining
+            else:
+                step_time = step_dt
+            print("Timestep {}: t = {}, dt = {}".format(len(controller.timesteps) + 1, t + step_time, step_time))
+
+            velocities = model.single_time_step(velocities, step_time)
+
+            t = output_time if step_time == remaining else t + step_time
+            step_dt = controller.get_next_timestep(step_time, step_dt, model.collision_parameters)
+        recorder.record(output_step, t, velocities)
+
+    return velocities
+
+
+if __name__ == '__main__':
+    pass
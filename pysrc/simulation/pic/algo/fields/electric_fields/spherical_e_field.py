@@ -0,0 +1,96 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains a self consistent electric field solver for spherically symmetric systems. By the shell theorem, the
+radial field at any radius only depends on the charge enclosed within it, which is found for all particles by sorting
+their radii and taking a cumulative sum of their charges.
+"""
+
+import numpy as np
+
+from plasma_physics.pysrc.utils.physical_constants import PhysicalConstants
+
+
+class SphericalEField(object):
+    """
+    Radial E field of a spherically symmetric charge distribution of particles, with an optional fixed background
+    charge. The particle charge distribution is set with update, after which the field can be evaluated at any points
+    in O(log N) per point.
+    """
+    def __init__(self, centre=None, background_enclosed_charge=None):
+        """
+        :param centre: centre of symmetry, defaults to the origin
+        :param background_enclosed_charge: function returning the background charge enclosed within an array of radii
+        """
+        assert background_enclosed_charge is None or callable(background_enclosed_charge)
+
+        self.centre = np.zeros(3) if centre is None else centre
+        self.background_enclosed_charge = background_enclosed_charge
+        self.sorted_radii = np.zeros(0)
+        self.cumulative_charge = np.zeros(1)
+
+    @staticmethod
+    def uniform_background(charge_density, radius):
+        """
+        Get the enclosed charge function of a uniformly charged sphere
+
+        :param charge_density: charge density of the sphere
+        :param radius: radius of the sphere
+        :return: function returning the charge enclosed within an array of radii
+        """
+        assert isinstance(charge_density, float)
+        assert isinstance(radius, float)
+
+        def enclosed_charge(r):
+            return charge_density * 4.0 / 3.0 * np.pi * np.minimum(r, radius) ** 3
+
+        return enclosed_charge
+
+    def update(self, X, Q):
+        """
+        Set the particle charge distribution
+
+        :param X: Nx3 array of particle positions
+        :param Q: (N,) array of particle charges
+        """
+        assert isinstance(X, np.ndarray) and X.shape[1] == 3
+        assert Q.shape[0] == X.shape[0]
+
+        radii = np.sqrt(np.sum((X - self.centre) ** 2, axis=1))
+        order = np.argsort(radii)
+        self.sorted_radii = radii[order]
+        self.cumulative_charge = np.concatenate((np.zeros(1), np.cumsum(Q.flatten()[order])))
+
+    def enclosed_charge(self, r):
+        """
+        Get the charge strictly enclosed within each radius. Particles at the same radius as a field point, including
+        a particle at its own position, do not contribute to the field.
+
+        :param r: array of radii
+        :return: array of enclosed charges
+        """
+        enclosed = self.cumulative_charge[np.searchsorted(self.sorted_radii, r, side='left')]
+        if self.background_enclosed_charge is not None:
+            enclosed = enclosed + self.background_enclosed_charge(r)
+
+        return enclosed
+
+    def e_field(self, field_point):
+        """
+        Calculate the E field at an array of points
+
+        :param field_point: Nx3 array of points
+        :return: Nx3 array of E field vectors
+        """
+        offset = field_point - self.centre
+        r = np.sqrt(np.sum(offset ** 2, axis=1))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            e_radial = self.enclosed_charge(r) / (4.0 * np.pi * PhysicalConstants.epsilon_0 * r ** 3)
+        e_radial[r == 0.0] = 0.0
+
+        return e_radial[:, np.newaxis] * offset
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,280 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains a Barnes-Hut tree code for the mutual Coulomb fields of a set of charged particles. The octree is
+built from the sorted Morton keys of the particles, so that all nodes at each level are found with vectorised
+operations. Distant nodes are approximated by their monopole and dipole moments, and nearby leaves are summed directly.
+"""
+
+import numpy as np
+
+from plasma_physics.pysrc.utils.physical_constants import PhysicalConstants
+
+
+def direct_sum_e_field(X, Q, field_point, softening=0.0, max_pairs_per_chunk=int(1e6)):
+    """
+    Calculate the E field of a set of point charges by direct summation. Charges at the same position as a field point
+    do not contribute to its field.
+
+    :param X: Nx3 array of particle positions
+    :param Q: (N,) array of particle charges
+    :param field_point: Mx3 array of points at which to evaluate the field
+    :param softening: Plummer softening length
+    :param max_pairs_per_chunk: maximum number of point-particle pairs evaluated together
+    :return: Mx3 array of E field vectors
+    """
+    Q = Q.flatten()
+    E = np.zeros(field_point.shape)
+    chunk_size = max(1, max_pairs_per_chunk // max(1, X.shape[0]))
+    for start in range(0, field_point.shape[0], chunk_size):
+        end = min(start + chunk_size, field_point.shape[0])
+        points = field_point[start:end]
+        separation = [points[:, dim, np.newaxis] - X[np.newaxis, :, dim] for dim in range(3)]
+        squared_distance = separation[0] ** 2 + separation[1] ** 2 + separation[2] ** 2
+        with np.errstate(divide='ignore'):
+            weights = Q / (squared_distance + softening ** 2) ** 1.5
+        weights[squared_distance == 0.0] = 0.0
+        for dim in range(3):
+            E[start:end, dim] = np.sum(weights * separation[dim], axis=1)
+
+    return E / (4.0 * np.pi * PhysicalConstants.epsilon_0)
+
+
+class BarnesHutField(object):
+    """
+    E field of a set of charged particles, evaluated with a Barnes-Hut tree. A node is approximated by its multipole
+    expansion if the field point is outside the node, and the node size is less than the opening angle multiplied by
+    the distance to the node. The particle distribution is set with update, after which the field can be evaluated
+    at any points.
+    """
+    max_depth = 21
+    points_per_chunk = 4096
+    group_size = 8
+
+    def __init__(self, opening_angle=0.5, leaf_size=16, softening=0.0, direct=False):
+        """
+        :param opening_angle: opening angle of the Barnes-Hut criterion, smaller angles are more accurate
+        :param leaf_size: maximum number of particles in a leaf node
+        :param softening: Plummer softening length
+        :param direct: if True, the field is calculated by direct summation, for validation
+        """
+        assert isinstance(opening_angle, float) and opening_angle >= 0.0
+        assert isinstance(leaf_size, int) and leaf_size > 0
+        assert isinstance(softening, float) and softening >= 0.0
+        assert isinstance(direct, bool)
+
+        self.opening_angle = opening_angle
+        self.leaf_size = leaf_size
+        self.softening = softening
+        self.direct = direct
+        self.X = np.zeros((0, 3))
+        self.Q = np.zeros(0)
+
+    @staticmethod
+    def __get_morton_keys(int_coords):
+        """
+        Interleave the bits of integer coordinates into Morton keys
+        """
+        keys = np.zeros(int_coords.shape[0], dtype=np.uint64)
+        for bit in range(BarnesHutField.max_depth):
+            for dim in range(3):
+                keys |= ((int_coords[:, dim] >> np.uint64(bit)) & np.uint64(1)) << np.uint64(3 * bit + 2 - dim)
+
+        return keys
+
+    def update(self, X, Q):
+        """
+        Build the tree for a set of particles
+
+        :param X: Nx3 array of particle positions
+        :param Q: (N,) array of particle charges
+        """
+        assert isinstance(X, np.ndarray) and X.shape[1] == 3
+        assert Q.shape[0] == X.shape[0]
+        self.X = X.copy()
+        self.Q = Q.flatten().astype(float)
+        if self.direct or X.shape[0] == 0:
+            return
+
+        # Sort particles along a Morton curve through a cube containing them
+        self.lower = np.min(X, axis=0)
+        self.width = max(np.max(np.max(X, axis=0) - self.lower), 1e-300) * (1.0 + 1e-12)
+        num_cells = 2 ** BarnesHutField.max_depth
+        int_coords = np.floor((X - self.lower) / self.width * num_cells).astype(np.uint64)
+        int_coords = np.minimum(int_coords, np.uint64(num_cells - 1))
+        keys = BarnesHutField.__get_morton_keys(int_coords)
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        int_coords = int_coords[order]
+        self.X = self.X[order]
+        self.Q = self.Q[order]
+        abs_Q = np.abs(self.Q)
+
+        # Find nodes at each level as the runs of particles with the same key prefix
+        starts = []
+        counts = []
+        cell_lower = []
+        sizes = []
+        first_child = []
+        num_children = []
+        is_leaf = []
+        charges = []
+        centres = []
+        dipoles = []
+        num_nodes = 0
+        previous_starts = None
+        for level in range(BarnesHutField.max_depth + 1):
+            shift = np.uint64(3 * (BarnesHutField.max_depth - level))
+            prefix = keys >> shift
+            level_starts = np.flatnonzero(np.concatenate(([True], prefix[1:] != prefix[:-1])))
+            level_counts = np.diff(np.append(level_starts, keys.shape[0]))
+            size = self.width / 2 ** level
+            level_lower = self.lower + (int_coords[level_starts] >> np.uint64(BarnesHutField.max_depth - level)) * size
+            level_leaf = level_counts <= self.leaf_size
+            if level == BarnesHutField.max_depth:
+                level_leaf[:] = True
+
+            # Link parents to their first child, children are contiguous as particles are sorted
+            if previous_starts is not None:
+                parents = np.searchsorted(previous_starts, level_starts, side='right') - 1
+                is_first = np.concatenate(([True], parents[1:] != parents[:-1]))
+                first_child[-1][parents[is_first]] = num_nodes + np.flatnonzero(is_first)
+                num_children[-1][:] = np.bincount(parents, minlength=previous_starts.shape[0])
+
+            # Multipole moments about the centre of the absolute charge of each node
+            charge = np.add.reduceat(self.Q, level_starts)
+            abs_charge = np.add.reduceat(abs_Q, level_starts)
+            position_sum = np.add.reduceat(abs_Q[:, np.newaxis] * self.X, level_starts, axis=0)
+            mean_position = np.add.reduceat(self.X, level_starts, axis=0) / level_counts[:, np.newaxis]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                centre = np.where(abs_charge[:, np.newaxis] > 0.0, position_sum / abs_charge[:, np.newaxis],
+                                  mean_position)
+            charges.append(charge)
+            centres.append(centre)
+            dipoles.append(np.add.reduceat(self.Q[:, np.newaxis] * self.X, level_starts, axis=0) -
+                           charge[:, np.newaxis] * centre)
+
+            starts.append(level_starts)
+            counts.append(level_counts)
+            cell_lower.append(level_lower)
+            sizes.append(np.ones(level_starts.shape[0]) * size)
+            first_child.append(-np.ones(level_starts.shape[0], dtype=np.int64))
+            num_children.append(np.zeros(level_starts.shape[0], dtype=np.int64))
+            is_leaf.append(level_leaf)
+            num_nodes += level_starts.shape[0]
+            previous_starts = level_starts
+            if np.all(level_leaf):
+                break
+
+        self.node_start = np.concatenate(starts)
+        self.node_count = np.concatenate(counts)
+        self.node_lower = np.concatenate(cell_lower)
+        self.node_size = np.concatenate(sizes)
+        self.node_first_child = np.concatenate(first_child)
+        self.node_num_children = np.concatenate(num_children)
+        self.node_is_leaf = np.concatenate(is_leaf)
+
+        self.node_charge = np.concatenate(charges)
+        self.node_centre = np.concatenate(centres)
+        self.node_dipole = np.concatenate(dipoles)
+
+    def e_field(self, field_point):
+        """
+        Calculate the E field at an array of points. Particles at the same position as a field point do not contribute
+        to its field, so that the field at the particle positions excludes the self field.
+
+        :param field_point: Mx3 array of points
+        :return: Mx3 array of E field vectors
+        """
+        if self.direct or self.X.shape[0] == 0:
+            return direct_sum_e_field(self.X, self.Q, field_point, softening=self.softening)
+
+        # Sort points along the Morton curve of the tree, so that consecutive points are close together
+        num_cells = 2 ** BarnesHutField.max_depth
+        int_coords = np.clip(np.floor((field_point - self.lower) / self.width * num_cells), 0, num_cells - 1)
+        order = np.argsort(BarnesHutField.__get_morton_keys(int_coords.astype(np.uint64)), kind="stable")
+        sorted_points = field_point[order]
+
+        E = np.zeros(field_point.shape)
+        for start in range(0, field_point.shape[0], BarnesHutField.points_per_chunk):
+            end = min(start + BarnesHutField.points_per_chunk, field_point.shape[0])
+            E[order[start:end]] = self.__traverse(sorted_points[start:end])
+
+        return E / (4.0 * np.pi * PhysicalConstants.epsilon_0)
+
+    @staticmethod
+    def __expand(idx, counts):
+        """
+        Repeat each index by its count, and get the offset of each repeat
+        """
+        offsets = np.arange(np.sum(counts)) - np.repeat(np.cumsum(counts) - counts, counts)
+        return np.repeat(idx, counts), offsets
+
+    def __traverse(self, points):
+        """
+        Walk the tree for a set of points, level by level. Consecutive points are grouped, and a node is accepted for
+        all points in a group if it is well separated from the bounding box of the group.
+        """
+        num_points = points.shape[0]
+        group_starts = np.arange(0, num_points, BarnesHutField.group_size)
+        group_counts = np.diff(np.append(group_starts, num_points))
+        group_lower = np.minimum.reduceat(points, group_starts, axis=0)
+        group_upper = np.maximum.reduceat(points, group_starts, axis=0)
+
+        E = np.zeros((num_points, 3))
+        pair_group = np.arange(group_starts.shape[0])
+        pair_node = np.zeros(group_starts.shape[0], dtype=np.int64)
+        while pair_group.shape[0] > 0:
+            centre = self.node_centre[pair_node]
+            lower = group_lower[pair_group]
+            upper = group_upper[pair_group]
+            distance = np.sqrt(np.sum(np.maximum(np.maximum(lower - centre, centre - upper), 0.0) ** 2, axis=1))
+
+            # Accept nodes that do not overlap the group, and are well separated from it
+            node_lower = self.node_lower[pair_node]
+            size = self.node_size[pair_node]
+            overlap = np.all(np.logical_and(lower <= node_lower + size[:, np.newaxis], upper >= node_lower), axis=1)
+            accept = np.logical_and(np.logical_not(overlap), size < self.opening_angle * distance)
+
+            # Sum leaves directly, and open the remaining nodes
+            leaf = np.logical_and(np.logical_not(accept), self.node_is_leaf[pair_node])
+            for mask, func in [(accept, self.__add_multipole), (leaf, self.__add_direct)]:
+                if np.any(mask):
+                    point_node, offsets = BarnesHutField.__expand(pair_node[mask], group_counts[pair_group[mask]])
+                    point_idx = np.repeat(group_starts[pair_group[mask]], group_counts[pair_group[mask]]) + offsets
+                    func(E, points, point_idx, point_node)
+
+            opened = np.logical_not(np.logical_or(accept, leaf))
+            pair_group, offsets = BarnesHutField.__expand(pair_group[opened], self.node_num_children[pair_node[opened]])
+            pair_node = np.repeat(self.node_first_child[pair_node[opened]],
+                                  self.node_num_children[pair_node[opened]]) + offsets
+
+        return E
+
+    def __add_multipole(self, E, points, point_idx, node_idx):
+        separation = points[point_idx] - self.node_centre[node_idx]
+        squared_distance = np.sum(separation ** 2, axis=1) + self.softening ** 2
+        inverse_distance_3 = squared_distance ** -1.5
+        dipole = self.node_dipole[node_idx]
+        dipole_dot = np.sum(dipole * separation, axis=1)
+        monopole_weight = (self.node_charge[node_idx] + 3.0 * dipole_dot / squared_distance) * inverse_distance_3
+        field = monopole_weight[:, np.newaxis] * separation - inverse_distance_3[:, np.newaxis] * dipole
+        for dim in range(3):
+            E[:, dim] += np.bincount(point_idx, weights=field[:, dim], minlength=E.shape[0])
+
+    def __add_direct(self, E, points, point_idx, node_idx):
+        point_idx, offsets = BarnesHutField.__expand(point_idx, self.node_count[node_idx])
+        particle_idx = np.repeat(self.node_start[node_idx], self.node_count[node_idx]) + offsets
+
+        separation = points[point_idx] - self.X[particle_idx]
+        squared_distance = np.sum(separation ** 2, axis=1)
+        with np.errstate(divide='ignore'):
+            weights = self.Q[particle_idx] / (squared_distance + self.softening ** 2) ** 1.5
+        weights[squared_distance == 0.0] = 0.0
+        for dim in range(3):
+            E[:, dim] += np.bincount(point_idx, weights=weights * separation[:, dim], minlength=E.shape[0])
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,230 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains a tracer for magnetic field lines. All lines are integrated together in arc length with an adaptive
+Dormand-Prince RK45 scheme, so that any B field provider accepting an Nx3 array of points can be used.
+"""
+
+import numpy as np
+
+
+class FieldLineTracer(object):
+    """
+    This class traces field lines from seed points until they leave the domain, reach the surface of a coil, exceed a
+    maximum length, or reach a field null. Each line takes its own step size, which is controlled by comparing the 4th
+    and 5th order solutions of the Dormand-Prince scheme.
+    """
+    termination_reasons = ["domain", "coil", "max_length", "max_steps", "field_null"]
+
+    # Dormand-Prince coefficients
+    c = np.asarray([0.0, 1.0 / 5.0, 3.0 / 10.0, 4.0 / 5.0, 8.0 / 9.0, 1.0, 1.0])
+    a = [[],
+         [1.0 / 5.0],
+         [3.0 / 40.0, 9.0 / 40.0],
+         [44.0 / 45.0, -56.0 / 15.0, 32.0 / 9.0],
+         [19372.0 / 6561.0, -25360.0 / 2187.0, 64448.0 / 6561.0, -212.0 / 729.0],
+         [9017.0 / 3168.0, -355.0 / 33.0, 46732.0 / 5247.0, 49.0 / 176.0, -5103.0 / 18656.0],
+         [35.0 / 384.0, 0.0, 500.0 / 1113.0, 125.0 / 192.0, -2187.0 / 6784.0, 11.0 / 84.0]]
+    b_5 = np.asarray([35.0 / 384.0, 0.0, 500.0 / 1113.0, 125.0 / 192.0, -2187.0 / 6784.0, 11.0 / 84.0, 0.0])
+    b_4 = np.asarray([5179.0 / 57600.0, 0.0, 7571.0 / 16695.0, 393.0 / 640.0, -92097.0 / 339200.0, 187.0 / 2100.0,
+                      1.0 / 40.0])
+
+    def __init__(self, field, dom_size, coils=None, winding_radius=0.0, tolerance=1e-6, max_step=None,
+                 min_step=None, max_length=None, max_steps=10000):
+        """
+        Initialise the tracer
+
+        :param field: B field provider, with a b_field function that evaluates an Nx3 array of points
+        :param dom_size: The domain is assumed to be a cube between (-dom_size, dom_size) in each dimension
+        :param coils: list of CurrentLoops, lines stop when they are within winding_radius of the windings
+        :param winding_radius: minor radius of the coils
+        :param tolerance: error tolerance of each step, relative to dom_size. Lines end within sqrt(tolerance) *
+                          dom_size of the coil surfaces and domain boundary
+        :param max_step: maximum step length, defaults to a tenth of dom_size
+        :param min_step: minimum step length, defaults to 1e-6 of dom_size
+        :param max_length: maximum length of each line, defaults to 100 times dom_size
+        :param max_steps: maximum number of steps taken by each line
+        """
+        assert isinstance(dom_size, float)
+        assert coils is None or isinstance(coils, list)
+        assert isinstance(winding_radius, float)
+        assert isinstance(tolerance, float) and tolerance > 0.0
+        assert isinstance(max_steps, int)
+
+        self.field = field
+        self.dom_size = dom_size
+        self.winding_radius = winding_radius
+        self.tolerance = tolerance
+        self.max_step = 0.1 * dom_size if max_step is None else max_step
+        self.min_step = 1e-6 * dom_size if min_step is None else min_step
+        self.max_length = 100.0 * dom_size if max_length is None else max_length
+        self.max_steps = max_steps
+        self.exit_length = np.sqrt(tolerance) * dom_size
+
+        # Get the geometry of each coil
+        coils = list() if coils is None else coils
+        self.coil_centres = np.asarray([np.mean(coil.radial_locations, axis=0) for coil in coils]).reshape((-1, 3))
+        self.coil_normals = np.asarray([coil.normal / np.sqrt(np.sum(coil.normal ** 2)) for coil in coils]).reshape((-1, 3))
+        self.coil_radii = np.asarray([coil.radius for coil in coils])
+
+    def coil_distance(self, points):
+        """
+        Get the distance from each point to the nearest coil winding
+
+        :param points: Nx3 array of points
+        :return: (N,) array of distances
+        """
+        distance = np.ones(points.shape[0]) * np.inf
+        for centre, normal, radius in zip(self.coil_centres, self.coil_normals, self.coil_radii):
+            offset = points - centre
+            axial_distance = np.dot(offset, normal)
+            radial_distance = np.sqrt(np.maximum(np.sum(offset ** 2, axis=1) - axial_distance ** 2, 0.0))
+            distance = np.minimum(distance, np.sqrt((radial_distance - radius) ** 2 + axial_distance ** 2))
+
+        return distance
+
+    def __is_inside(self, points):
+        return np.all(np.abs(points) <= self.dom_size, axis=1)
+
+    def __get_directions(self, points, direction):
+        """
+        Get the unit vector along the field at each point, which is NaN outside the domain and at field nulls
+        """
+        directions = np.ones(points.shape) * np.nan
+        inside = self.__is_inside(points)
+        if np.any(inside):
+            b = self.field.b_field(points[inside])
+            with np.errstate(divide='ignore', invalid='ignore'):
+                directions[inside] = direction * b / np.sqrt(np.sum(b ** 2, axis=1))[:, np.newaxis]
+
+        return directions
+
+    def __exit_point(self, points, directions):
+        """
+        Get the point at which each line leaves the domain, moving in a straight line along directions
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            distance_to_faces = (np.sign(directions) * self.dom_size - points) / directions
+        distance_to_faces[np.logical_not(np.isfinite(distance_to_faces))] = np.inf
+        exit_distance = np.maximum(np.min(distance_to_faces, axis=1), 0.0)
+
+        return points + exit_distance[:, np.newaxis] * directions, exit_distance
+
+    def trace(self, seeds, direction=1.0):
+        """
+        Trace field lines from seed points
+
+        :param seeds: Nx3 array of points from which to trace lines
+        :param direction: 1.0 to trace along the field, -1.0 to trace against it
+        :return: list of Mx3 arrays of points along each line, array of termination reasons, and array of line lengths
+        """
+        assert direction == 1.0 or direction == -1.0
+        num_lines = seeds.shape[0]
+
+        positions = seeds.copy()
+        step_sizes = np.ones(num_lines) * self.max_step
+        lengths = np.zeros(num_lines)
+        num_steps = np.zeros(num_lines, dtype=int)
+        reasons = np.asarray([""] * num_lines, dtype=object)
+        active = np.ones(num_lines, dtype=bool)
+
+        # Check seeds are valid
+        k_first = self.__get_directions(positions, direction)
+        reasons[np.logical_not(self.__is_inside(positions))] = "domain"
+        reasons[np.logical_and(reasons == "", np.any(np.isnan(k_first), axis=1))] = "field_null"
+        reasons[np.logical_and(reasons == "", self.coil_distance(positions) < self.winding_radius)] = "coil"
+        active[reasons != ""] = False
+
+        history_idx = [np.arange(num_lines)]
+        history_positions = [positions.copy()]
+        while np.any(active):
+            idx = np.where(active)[0]
+            x = positions[idx]
+            h = np.minimum(step_sizes[idx], self.max_length - lengths[idx])
+
+            # Limit steps so that lines do not pass far into the coils
+            if self.coil_radii.shape[0] > 0:
+                surface_distance = np.maximum(self.coil_distance(x) - self.winding_radius, 0.0)
+                h = np.minimum(h, surface_distance + self.exit_length)
+
+            # Evaluate Runge Kutta stages, the first stage is reused from the end of the last accepted step
+            k = np.zeros((7, idx.shape[0], 3))
+            k[0] = k_first[idx]
+            for stage in range(1, 7):
+                stage_x = x + h[:, np.newaxis] * np.einsum('s,snd->nd', np.asarray(FieldLineTracer.a[stage]), k[:stage])
+                k[stage] = self.__get_directions(stage_x, direction)
+            x_new = x + h[:, np.newaxis] * np.einsum('s,snd->nd', FieldLineTracer.b_5, k)
+            error = h * np.max(np.abs(np.einsum('s,snd->nd', FieldLineTracer.b_5 - FieldLineTracer.b_4, k)), axis=1)
+            error /= self.tolerance * self.dom_size
+
+            # Steps with stages outside the domain, or at field nulls, are rejected
+            invalid = np.any(np.isnan(k), axis=(0, 2))
+            at_min_step = h <= self.min_step
+            accept = np.logical_and(np.logical_not(invalid), np.logical_or(error <= 1.0, at_min_step))
+
+            # Lines close to the boundary finish with a straight segment to the boundary, which is short enough that
+            # its error is within tolerance. Lines that cannot take a valid minimum step have reached a field null
+            exit_points, exit_distance = self.__exit_point(x, k[0])
+            leaving = np.logical_and(invalid, exit_distance <= np.maximum(self.exit_length, self.min_step))
+            stalled = np.logical_and(np.logical_and(invalid, at_min_step), np.logical_not(leaving))
+            if np.any(leaving):
+                leaving_idx = idx[leaving]
+                positions[leaving_idx] = exit_points[leaving]
+                lengths[leaving_idx] += exit_distance[leaving]
+                reasons[leaving_idx] = "domain"
+                active[leaving_idx] = False
+                history_idx.append(leaving_idx)
+                history_positions.append(exit_points[leaving])
+            reasons[idx[stalled]] = "field_null"
+            active[idx[stalled]] = False
+
+            # Update accepted steps
+            accepted_idx = idx[accept]
+            positions[accepted_idx] = x_new[accept]
+            lengths[accepted_idx] += h[accept]
+            num_steps[accepted_idx] += 1
+            k_first[accepted_idx] = self.__get_directions(x_new[accept], direction)
+            history_idx.append(accepted_idx)
+            history_positions.append(x_new[accept])
+
+            # Adjust step sizes
+            with np.errstate(divide='ignore'):
+                scale = np.where(invalid, 0.5, np.clip(0.9 * error ** -0.2, 0.2, 5.0))
+            step_sizes[idx] = np.clip(h * scale, self.min_step, self.max_step)
+
+            # Check termination conditions of accepted steps
+            new_positions = positions[accepted_idx]
+            done_reasons = np.asarray([""] * accepted_idx.shape[0], dtype=object)
+            done_reasons[np.any(np.isnan(k_first[accepted_idx]), axis=1)] = "field_null"
+            done_reasons[self.coil_distance(new_positions) < self.winding_radius] = "coil"
+            done_reasons[np.logical_and(done_reasons == "", lengths[accepted_idx] >= self.max_length)] = "max_length"
+            done_reasons[np.logical_and(done_reasons == "", num_steps[accepted_idx] >= self.max_steps)] = "max_steps"
+            done = done_reasons != ""
+            reasons[accepted_idx[done]] = done_reasons[done]
+            active[accepted_idx[done]] = False
+
+        # Assemble polylines in the order points were added to each line
+        history_idx = np.concatenate(history_idx)
+        history_positions = np.concatenate(history_positions)
+        order = np.argsort(history_idx, kind="stable")
+        split_points = np.cumsum(np.bincount(history_idx, minlength=num_lines))[:-1]
+        polylines = np.split(history_positions[order], split_points)
+
+        return polylines, reasons.astype(str), lengths
+
+    def connection_lengths(self, seeds):
+        """
+        Get the total length of the field line through each seed point, traced in both directions
+
+        :param seeds: Nx3 array of points
+        :return: array of connection lengths, and the termination reasons in the forward and backward directions
+        """
+        forward_lines, forward_reasons, forward_lengths = self.trace(seeds, 1.0)
+        backward_lines, backward_reasons, backward_lengths = self.trace(seeds, -1.0)
+
+        return forward_lengths + backward_lengths, forward_reasons, backward_reasons
+
+
+if __name__ == '__main__':
+    pass
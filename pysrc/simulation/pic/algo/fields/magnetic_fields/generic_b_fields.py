@@ -8,15 +8,27 @@ This file contains simple B fields to be used in a simplified PIC code with a fr
 import numpy as np
 from matplotlib import pyplot as plt
 from scipy.interpolate import RegularGridInterpolator
+from scipy.ndimage import map_coordinates, spline_filter
 
-from plasma_physics.pysrc.simulation.pic.algo.geometry.vector_ops import cross, magnitude, arbitrary_axis_rotation_3d
+from plasma_physics.pysrc.simulation.pic.algo.geometry.vector_ops import cross, magnitude, batch_cross, \
+    batch_arbitrary_axis_rotation_3d
 from plasma_physics.pysrc.utils.physical_constants import PhysicalConstants
 
 
 class CurrentLoop(object):
+    """
+    This class calculates the field of a circular current loop by integrating the Biot Savart law around the loop. The
+    integral can be evaluated with a rectangle rule, a composite Gauss Legendre rule, or adaptively. The adaptive
+    quadrature bisects the Gauss Legendre panels that are close to each field point until the error estimated from
+    each bisection is within tolerance, so that points close to the windings do not need a high point count everywhere.
+    """
     mu_0 = PhysicalConstants.mu_0
+    max_points_per_chunk = 1024
+    quadrature_types = ["rectangle", "gauss_legendre", "adaptive"]
+    gauss_order = 8
+    max_adaptive_levels = 20
 
-    def __init__(self, I, radius, centre, normal, num_pts):
+    def __init__(self, I, radius, centre, normal, num_pts, quadrature="rectangle", tolerance=1e-8):
         """"
         Initialise primary and secondary variables of the class
 
@@ -24,19 +36,27 @@ class CurrentLoop(object):
         radius: Radius of the loop
         normal: Normal to the loop. This also defines the direction of the current, as the normal is in the direction
                 of the B field.
-        num_pts: Number of points that are used to integrate the biot savart law across the loop
+        num_pts: Number of points that are used to integrate the biot savart law across the loop. For Gauss Legendre
+                 and adaptive quadrature, the loop is split into num_pts // gauss_order panels.
+        quadrature: quadrature used to integrate the biot savart law, one of quadrature_types
+        tolerance: error tolerance of the adaptive quadrature, relative to the magnitude of the field
         """
         assert isinstance(I, float)
         assert isinstance(radius, float)
         assert isinstance(centre, np.ndarray)
         assert isinstance(normal, np.ndarray)
         assert isinstance(num_pts, int)
+        assert quadrature in CurrentLoop.quadrature_types
+        assert quadrature == "rectangle" or num_pts >= CurrentLoop.gauss_order
+        assert isinstance(tolerance, float) and tolerance > 0.0
 
         self.__I = I
         self.__radius = radius
         self.__centre = centre
-        self.__normal = normal
+        self.__normal = normal / magnitude(normal)
         self.__num_pts = num_pts
+        self.__quadrature = quadrature
+        self.__tolerance = tolerance
 
         # Discretise the loop by angle
         self.d_theta = 2.0 * np.pi / num_pts
@@ -48,11 +68,25 @@ class CurrentLoop(object):
         self.r_unit = self.r / magnitude(self.r)
         self.R = self.r_unit * self.__radius
 
-        self.radial_locations = np.zeros((num_pts, 3))
-        self.current_direction = np.zeros((num_pts, 3))
-        for i, rotation_angle in enumerate(self.theta):
-            self.radial_locations[i, :] = arbitrary_axis_rotation_3d(self.R, self.__normal, rotation_angle) - self.__centre
-            self.current_direction[i, :] = cross(self.__normal, self.radial_locations[i, :] - self.__centre)
+        self.radial_locations = batch_arbitrary_axis_rotation_3d(self.R, self.__normal, self.theta) - self.__centre
+        self.current_direction = batch_cross(self.__normal, self.radial_locations - self.__centre)
+        self.current_unit = self.current_direction / np.sqrt(np.sum(self.current_direction ** 2, axis=1))[:, np.newaxis]
+        self.quadrature_weights = np.ones(num_pts) * self.__radius * self.d_theta
+
+        # Orthonormal basis in the plane of the loop, so that windings can be found at arbitrary angles
+        self.e_1 = self.r_unit
+        self.e_2 = np.cross(self.__normal, self.e_1)
+
+        # Use Gauss Legendre nodes on each panel
+        if quadrature != "rectangle":
+            self.num_panels = num_pts // CurrentLoop.gauss_order
+            self.panel_edges = np.linspace(0.0, 2.0 * np.pi, self.num_panels + 1)
+            self.theta, self.quadrature_weights = self.__get_gauss_legendre_rule(self.panel_edges[:-1], self.panel_edges[1:],
+                                                                                 CurrentLoop.gauss_order)
+            self.theta = self.theta.flatten()
+            self.quadrature_weights = self.quadrature_weights.flatten()
+            self.radial_locations, self.current_unit = self.__get_windings(self.theta)
+            self.current_direction = self.current_unit * self.__radius
 
     @property
     def I(self):
@@ -74,31 +108,160 @@ class CurrentLoop(object):
     def num_pts(self):
         return self.__num_pts
 
+    @property
+    def quadrature(self):
+        return self.__quadrature
+
+    @property
+    def tolerance(self):
+        return self.__tolerance
+
     def b_field(self, field_point):
         """
         Calculate the B field at an arbitrary point from the loop
+
+        :param field_point: either a single 3D point, or an Nx3 array of points
+        :return: B field with the same shape as field_point
+        """
+        return self.b_field_with_error(field_point, estimate_error=False)[0]
+
+    def b_field_with_error(self, field_point, estimate_error=True):
+        """
+        Calculate the B field at an arbitrary point from the loop, along with an estimate of the quadrature error. For
+        the rectangle and Gauss Legendre rules, the error is estimated by comparison with a rule using half the points,
+        so that it is an upper bound on the actual error. For adaptive quadrature, it is the sum of the bisection
+        error estimates of each panel.
+
+        :param field_point: either a single 3D point, or an Nx3 array of points
+        :param estimate_error: if False, the error is not calculated and is returned as zero
+        :return: B field with the same shape as field_point, and the magnitude of the error at each point
         """
         assert isinstance(field_point, np.ndarray)
 
-        permeability_constant = CurrentLoop.mu_0 / (4 * np.pi)
-        d_arc_length = self.__radius * self.d_theta
-        integral_constant = permeability_constant * d_arc_length * self.__I
+        points = field_point.reshape((-1, 3))
+        b_field = np.zeros(points.shape)
+        error = np.zeros(points.shape[0])
+        for start in range(0, points.shape[0], CurrentLoop.max_points_per_chunk):
+            end = start + CurrentLoop.max_points_per_chunk
+            if self.__quadrature == "adaptive":
+                b_field[start:end, :], error[start:end] = self.__integrate_adaptively(points[start:end, :])
+            else:
+                b_field[start:end, :] = self.__integrate_biot_savart(points[start:end, :], self.radial_locations,
+                                                                     self.current_unit, self.quadrature_weights)
+                if estimate_error:
+                    b_coarse = self.__integrate_coarse_rule(points[start:end, :])
+                    error[start:end] = np.sqrt(np.sum((b_field[start:end, :] - b_coarse) ** 2, axis=1))
+
+        return b_field.reshape(field_point.shape), error.reshape(field_point.shape[:-1])
+
+    def __get_windings(self, theta):
+        """
+        Get the location of the windings, and the direction of the current, at an array of angles around the loop
+        """
+        cos_theta = np.cos(theta)[..., np.newaxis]
+        sin_theta = np.sin(theta)[..., np.newaxis]
+        windings = self.__radius * (cos_theta * self.e_1 + sin_theta * self.e_2) - self.__centre
+        current_unit = cos_theta * self.e_2 - sin_theta * self.e_1
+
+        return windings, current_unit
 
-        # Integrate vector contributions
-        b_field_contributions = np.zeros((self.theta.shape[0], 3))
-        for i, rotation_angle in enumerate(self.theta):
-            # Get b field direction
-            loop_to_point = self.radial_locations[i, :] - field_point
-            b_field_direction = cross(loop_to_point, self.current_direction[i, :])
-            b_unit = b_field_direction / magnitude(b_field_direction)
+    def __get_gauss_legendre_rule(self, lower, upper, order):
+        """
+        Get the angles and arc length weights of Gauss Legendre rules on each panel between lower and upper
 
-            loop_distance = magnitude(loop_to_point)
-            b_field_contributions[i, :] = b_unit / loop_distance ** 2
+        :return: angles and weights, with shape (num panels, order)
+        """
+        nodes, weights = np.polynomial.legendre.leggauss(order)
+        half_width = 0.5 * (upper - lower)[:, np.newaxis]
+        theta = 0.5 * (upper + lower)[:, np.newaxis] + half_width * nodes[np.newaxis, :]
 
-        b_field_contributions *= integral_constant
-        b_field = np.sum(b_field_contributions, axis=0)
+        return theta, self.__radius * half_width * weights[np.newaxis, :]
 
-        return b_field
+    def __integrate_biot_savart(self, points, windings, current_unit, weights):
+        """
+        Integrate the contribution of each loop segment to the field at an Nx3 array of points. The windings, current
+        directions and weights either apply to all points, or have a leading dimension for each point.
+        """
+        integral_constant = CurrentLoop.mu_0 / (4 * np.pi) * self.__I
+
+        # Get vectors from each point to each loop segment, with shape (num points, num segments, 3)
+        windings = windings.reshape((-1, weights.shape[-1], 3))
+        current_unit = current_unit.reshape((-1, weights.shape[-1], 3))
+        loop_to_point = windings - points[:, np.newaxis, :]
+        loop_distance = np.sqrt(np.sum(loop_to_point ** 2, axis=2))
+
+        # dl x r / |r|^3 for each segment, where dl is in the direction of the current
+        b_field_contributions = np.cross(loop_to_point, current_unit)
+        b_field_contributions *= (weights / loop_distance ** 3)[:, :, np.newaxis]
+
+        return integral_constant * np.sum(b_field_contributions, axis=1)
+
+    def __integrate_coarse_rule(self, points):
+        """
+        Integrate with half the points of the fixed quadrature rule, to estimate its error
+        """
+        if self.__quadrature == "rectangle":
+            num_pts = max(self.__num_pts // 2, 1)
+            theta = np.arange(num_pts) * 2.0 * np.pi / num_pts
+            weights = np.ones(num_pts) * self.__radius * 2.0 * np.pi / num_pts
+        else:
+            theta, weights = self.__get_gauss_legendre_rule(self.panel_edges[:-1], self.panel_edges[1:],
+                                                            CurrentLoop.gauss_order // 2)
+            theta = theta.flatten()
+            weights = weights.flatten()
+        windings, current_unit = self.__get_windings(theta)
+
+        return self.__integrate_biot_savart(points, windings, current_unit, weights)
+
+    def __integrate_panels(self, points, lower, upper):
+        """
+        Integrate over a separate panel for each point with a Gauss Legendre rule
+        """
+        theta, weights = self.__get_gauss_legendre_rule(lower, upper, CurrentLoop.gauss_order)
+        windings, current_unit = self.__get_windings(theta)
+
+        return self.__integrate_biot_savart(points, windings, current_unit, weights)
+
+    def __integrate_adaptively(self, points):
+        """
+        Integrate adaptively by bisecting panels until the difference between the integral over a panel, and the sum of
+        the integrals over its halves, is within tolerance. The tolerance on each panel is proportional to its width.
+        All panels that need refinement are bisected together at each level.
+        """
+        # Integrate over the initial panels
+        point_idx = np.repeat(np.arange(points.shape[0]), self.num_panels)
+        lower = np.tile(self.panel_edges[:-1], points.shape[0])
+        upper = np.tile(self.panel_edges[1:], points.shape[0])
+        panel_integrals = self.__integrate_panels(points[point_idx], lower, upper)
+        initial_estimate = np.zeros(points.shape)
+        np.add.at(initial_estimate, point_idx, panel_integrals)
+        absolute_tolerance = self.__tolerance * np.sqrt(np.sum(initial_estimate ** 2, axis=1))
+
+        b_field = np.zeros(points.shape)
+        error = np.zeros(points.shape[0])
+        for level in range(CurrentLoop.max_adaptive_levels + 1):
+            mid = 0.5 * (lower + upper)
+            lower_integrals = self.__integrate_panels(points[point_idx], lower, mid)
+            upper_integrals = self.__integrate_panels(points[point_idx], mid, upper)
+            bisected_integrals = lower_integrals + upper_integrals
+            panel_error = np.sqrt(np.sum((bisected_integrals - panel_integrals) ** 2, axis=1))
+
+            # Accept converged panels, including those at the maximum level
+            converged = panel_error <= absolute_tolerance[point_idx] * (upper - lower) / (2.0 * np.pi)
+            if level == CurrentLoop.max_adaptive_levels:
+                converged[:] = True
+            np.add.at(b_field, point_idx[converged], bisected_integrals[converged])
+            np.add.at(error, point_idx[converged], panel_error[converged])
+
+            # Bisect the remaining panels
+            refine = np.logical_not(converged)
+            if not np.any(refine):
+                break
+            point_idx = np.concatenate((point_idx[refine], point_idx[refine]))
+            lower, upper = np.concatenate((lower[refine], mid[refine])), np.concatenate((mid[refine], upper[refine]))
+            panel_integrals = np.concatenate((lower_integrals[refine], upper_integrals[refine]))
+
+        return b_field, error
 
 
 class CombinedField(object):
@@ -123,7 +286,7 @@ class CombinedField(object):
         """
         Calculate the overall field by combining the fields of components
 
-        :param field_point: point at which the field is evaluated
+        :param field_point: point at which the field is evaluated, or an Nx3 array of points
         :return:
         """
         if self.domain_size is not None: 
@@ -132,7 +295,7 @@ class CombinedField(object):
 
         b_tot = np.zeros(field_point.shape)
         for comp in self.component_fields:
-            b_comp = comp.b_field(field_point[0])
+            b_comp = comp.b_field(field_point)
             b_tot += b_comp
 
         return b_tot
@@ -140,10 +303,14 @@ class CombinedField(object):
 
 class InterpolatedBField(object):
     """
-    This class reads in a pre-calculated B field from file, and linearly interpolated the points to get the overall
-    field
+    This class reads in a pre-calculated B field from file, and interpolates the points to get the overall field. The
+    field is either linearly interpolated, or interpolated with cubic B-splines. The cubic splines give a field with a
+    continuous gradient, so that coarser meshes can be used for the same trajectory accuracy
     """
-    def __init__(self, data_file, dom_pts_idx=4, dom_size_idx=5):
+    interpolation_types = ["linear", "cubic"]
+    spline_padding = 4
+
+    def __init__(self, data_file, dom_pts_idx=4, dom_size_idx=5, interpolation="linear"):
         """"
         Read in fields
 
@@ -152,34 +319,108 @@ class InterpolatedBField(object):
                       getting the value from this index
         :dom_size_idx: The name of the file must be split in such a way that the domain size can be determined by 
                       getting the value from this index
+        :param interpolation: interpolation scheme used between mesh points, either "linear" or "cubic"
         """
         split_name = data_file.split("_")
 
         dom_pts = int(split_name[dom_pts_idx])
         dom_size = float(split_name[dom_size_idx])
 
-        b_points_x = np.loadtxt("{}_x".format(data_file)).reshape((dom_pts, dom_pts, dom_pts))
-        b_points_y = np.loadtxt("{}_y".format(data_file)).reshape((dom_pts, dom_pts, dom_pts))
-        b_points_z = np.loadtxt("{}_z".format(data_file)).reshape((dom_pts, dom_pts, dom_pts))
-        x = np.linspace(-dom_size, dom_size, dom_pts)
-        y = np.linspace(-dom_size, dom_size, dom_pts)
-        z = np.linspace(-dom_size, dom_size, dom_pts)
+        b_points = np.zeros((dom_pts, dom_pts, dom_pts, 3))
+        b_points[:, :, :, 0] = np.loadtxt("{}_x".format(data_file)).reshape((dom_pts, dom_pts, dom_pts))
+        b_points[:, :, :, 1] = np.loadtxt("{}_y".format(data_file)).reshape((dom_pts, dom_pts, dom_pts))
+        b_points[:, :, :, 2] = np.loadtxt("{}_z".format(data_file)).reshape((dom_pts, dom_pts, dom_pts))
 
-        self.b_interpolator_x = RegularGridInterpolator((x, y, z), b_points_x)
-        self.b_interpolator_y = RegularGridInterpolator((x, y, z), b_points_y)
-        self.b_interpolator_z = RegularGridInterpolator((x, y, z), b_points_z)
+        self.__set_field(b_points, dom_size, interpolation)
+
+    @classmethod
+    def from_array(cls, b_points, dom_size, interpolation="linear"):
+        """
+        Generate an interpolated field from field values that are already in memory
+
+        :param b_points: (dom_pts, dom_pts, dom_pts, 3) array of field values, on a uniform mesh between
+                         (-dom_size, dom_size) in each dimension
+        :param dom_size: size of the domain
+        :param interpolation: interpolation scheme used between mesh points, either "linear" or "cubic"
+        :return:
+        """
+        field = cls.__new__(cls)
+        field.__set_field(b_points, dom_size, interpolation)
+
+        return field
+
+    def __set_field(self, b_points, dom_size, interpolation):
+        assert isinstance(b_points, np.ndarray) and len(b_points.shape) == 4 and b_points.shape[3] == 3
+        assert b_points.shape[0] == b_points.shape[1] == b_points.shape[2]
+        assert interpolation in InterpolatedBField.interpolation_types, interpolation
+
+        dom_pts = b_points.shape[0]
+        self.dom_pts = dom_pts
+        self.dom_size = float(dom_size)
+        self.dx = 2.0 * self.dom_size / (dom_pts - 1)
+        self.interpolation = interpolation
+
+        if interpolation == "linear":
+            x = np.linspace(-dom_size, dom_size, dom_pts)
+            y = np.linspace(-dom_size, dom_size, dom_pts)
+            z = np.linspace(-dom_size, dom_size, dom_pts)
+            self.b_interpolator = RegularGridInterpolator((x, y, z), b_points)
+        else:
+            # Precompute the B-spline coefficients of each component, so that evaluating the field only requires a
+            # local sum over the 4x4x4 neighbouring coefficients. The mesh is padded with an odd reflection so that the
+            # boundary condition of the spline does not force the gradient to zero at the edge of the domain
+            padding = ((self.spline_padding, self.spline_padding), ) * 3
+            self.spline_coefficients = []
+            for i in range(3):
+                padded_points = np.pad(b_points[:, :, :, i], padding, mode="reflect", reflect_type="odd")
+                self.spline_coefficients.append(spline_filter(padded_points, order=3, mode="mirror"))
 
     def b_field(self, field_point):
         """
         Return the field at location
+
+        :param field_point: Nx3 array of points at which the field is evaluated
+        :return: Nx3 array of field values
         """
+        if np.any(field_point < -self.dom_size) or np.any(field_point > self.dom_size):
+            raise ValueError("Field point is outside simulations domain")
+
+        if self.interpolation == "linear":
+            return self.b_interpolator(field_point)
+
         B = np.zeros(field_point.shape)
-        B[0, 0] = self.b_interpolator_x(field_point[0])
-        B[0, 1] = self.b_interpolator_y(field_point[0])
-        B[0, 2] = self.b_interpolator_z(field_point[0])
+        mesh_coordinates = ((field_point + self.dom_size) / self.dx + self.spline_padding).transpose()
+        for i, coefficients in enumerate(self.spline_coefficients):
+            B[:, i] = map_coordinates(coefficients, mesh_coordinates, order=3, mode="mirror", prefilter=False)
+
         return B
 
 
+def get_polywell_field(I, radius, loop_offset, loop_pts, quadrature="rectangle", tolerance=1e-8):
+    """
+    Get the combined field of the six coils of a polywell. Adaptive quadrature of the coil integrals allows fewer
+    loop_pts to be used for the same accuracy near the coils.
+
+    :param I: current in each coil
+    :param radius: radius of each coil
+    :param loop_offset: distance of each coil from the centre, as a ratio of the radius
+    :param loop_pts: number of points used to integrate the biot savart law across each coil
+    :param quadrature: quadrature used to integrate the biot savart law, one of CurrentLoop.quadrature_types
+    :param tolerance: error tolerance of the adaptive quadrature
+    :return: CombinedField of the coils
+    """
+    comp_loops = list()
+    for dim in range(3):
+        for sign in [-1.0, 1.0]:
+            centre = np.zeros(3)
+            centre[dim] = sign * loop_offset * radius
+            normal = np.zeros(3)
+            normal[dim] = -sign
+            comp_loops.append(CurrentLoop(I, radius, centre, normal, loop_pts, quadrature, tolerance))
+
+    return CombinedField(comp_loops)
+
+
 """"
 TESTING
 """
@@ -0,0 +1,208 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains a multipole expansion of the field of a set of coils. Away from the windings each Cartesian component
+of the field is a harmonic function, so it can be expanded in spherical harmonics about the centre of the coil set. The
+interior expansion converges inside the windings, and the exterior expansion outside them. The exact Biot Savart sum is
+used in the shell containing the windings.
+"""
+
+import warnings
+import numpy as np
+
+
+def real_spherical_harmonics(max_degree, cos_theta, phi):
+    """
+    Evaluate orthonormal real spherical harmonics up to max_degree
+
+    :param max_degree: maximum degree of the harmonics
+    :param cos_theta: (N,) array of the cosine of the polar angle
+    :param phi: (N,) array of the azimuthal angle
+    :return: (N, (max_degree + 1) ** 2) array of harmonics, with Y_lm at index l ** 2 + l + m
+    """
+    sin_theta = np.sqrt(np.maximum(1.0 - cos_theta ** 2, 0.0))
+    Y = np.zeros((cos_theta.shape[0], (max_degree + 1) ** 2))
+
+    # Fully normalised associated Legendre functions, calculated for increasing m
+    p_mm = np.ones(cos_theta.shape) / np.sqrt(4.0 * np.pi)
+    for m in range(max_degree + 1):
+        if m > 0:
+            p_mm = -np.sqrt((2.0 * m + 1.0) / (2.0 * m)) * sin_theta * p_mm
+
+        p_lm_2 = np.zeros(cos_theta.shape)
+        p_lm_1 = p_mm
+        for l in range(m, max_degree + 1):
+            if l == m:
+                p_lm = p_mm
+            elif l == m + 1:
+                p_lm = np.sqrt(2.0 * m + 3.0) * cos_theta * p_mm
+            else:
+                a_lm = np.sqrt((4.0 * l ** 2 - 1.0) / (l ** 2 - m ** 2))
+                b_lm = np.sqrt(((l - 1.0) ** 2 - m ** 2) / (4.0 * (l - 1.0) ** 2 - 1.0))
+                p_lm = a_lm * (cos_theta * p_lm_1 - b_lm * p_lm_2)
+            if l > m:
+                p_lm_2 = p_lm_1
+                p_lm_1 = p_lm
+
+            if m == 0:
+                Y[:, l ** 2 + l] = p_lm
+            else:
+                Y[:, l ** 2 + l + m] = np.sqrt(2.0) * p_lm * np.cos(m * phi)
+                Y[:, l ** 2 + l - m] = np.sqrt(2.0) * p_lm * np.sin(m * phi)
+
+    return Y
+
+
+class MultipoleBField(object):
+    """
+    This class evaluates the field of a set of coils with interior and exterior spherical harmonic expansions about the
+    centre of the coils, falling back to the exact field near the windings. The truncation error of an expansion of
+    degree L decays as (r / r_min) ** (L + 1) inside the windings, and (r_max / r) ** (L + 1) outside them, where r_min and
+    r_max are the closest and furthest winding points from the centre. The expansions are first used where this ratio
+    is below the tolerance. As the ratio ignores the size of the higher order coefficients, the error is then measured
+    on the bounding spheres of each expansion, and the spheres are moved away from the windings until it is within
+    tolerance.
+    """
+    radius_step = 0.9
+    max_radius_steps = 50
+
+    def __init__(self, field, max_degree=16, tolerance=1e-4, centre=None, domain_size=None):
+        """
+        Set up the multipole expansions of the field
+
+        :param field: CurrentLoop, or CombinedField of CurrentLoops
+        :param max_degree: maximum degree of the spherical harmonic expansions
+        :param tolerance: error of the expansions relative to the peak field on their bounding spheres
+        :param centre: centre of the expansions, defaults to the mean of the winding points
+        :param domain_size: The domain size assumed to be square with each dimension between (-domain_size, domain_size)
+        """
+        assert isinstance(max_degree, int) and max_degree >= 0
+        assert isinstance(tolerance, float) and 0.0 < tolerance < 1.0
+        assert domain_size is None or isinstance(domain_size, float)
+
+        self.field = field
+        self.max_degree = max_degree
+        self.tolerance = tolerance
+        self.domain_size = domain_size
+
+        # Get extent of the windings about the centre
+        components = field.component_fields if hasattr(field, "component_fields") else [field]
+        winding_points = np.concatenate([comp.radial_locations for comp in components])
+        self.centre = np.mean(winding_points, axis=0) if centre is None else centre
+        winding_radii = np.sqrt(np.sum((winding_points - self.centre) ** 2, axis=1))
+        self.r_min = np.min(winding_radii)
+        self.r_max = np.max(winding_radii)
+
+        # Set up quadrature on a sphere, with enough points to avoid aliasing from higher degrees
+        num_theta = 2 * (max_degree + 1)
+        num_phi = 4 * (max_degree + 1)
+        cos_theta, theta_weights = np.polynomial.legendre.leggauss(num_theta)
+        phi = np.arange(num_phi) * 2.0 * np.pi / num_phi
+        cos_theta, phi = np.meshgrid(cos_theta, phi, indexing="ij")
+        weights = np.outer(theta_weights, np.ones(num_phi) * 2.0 * np.pi / num_phi).flatten()
+        self.__quadrature_harmonics = real_spherical_harmonics(max_degree, cos_theta.flatten(), phi.flatten())
+        self.__quadrature_weights = weights
+        self.__quadrature_directions = self.__get_directions(cos_theta.flatten(), phi.flatten())
+
+        # Calculate expansion coefficients, moving the bounding spheres away from the windings until the measured
+        # error is within tolerance
+        convergence_ratio = tolerance ** (1.0 / (max_degree + 1))
+        self.interior_radius = self.r_min * convergence_ratio
+        self.exterior_radius = self.r_max / convergence_ratio
+        for i in range(MultipoleBField.max_radius_steps):
+            self.interior_coefficients = self.__get_coefficients(self.interior_radius)
+            self.interior_error = self.__measure_error(self.interior_radius, True)
+            if self.interior_error <= tolerance:
+                break
+            self.interior_radius *= MultipoleBField.radius_step
+        for i in range(MultipoleBField.max_radius_steps):
+            self.exterior_coefficients = self.__get_coefficients(self.exterior_radius)
+            self.exterior_error = self.__measure_error(self.exterior_radius, False)
+            if self.exterior_error <= tolerance:
+                break
+            self.exterior_radius /= MultipoleBField.radius_step
+        if self.interior_error > tolerance or self.exterior_error > tolerance:
+            warnings.warn("Multipole expansions did not converge to tolerance {}, with interior error {} and exterior "
+                          "error {}".format(tolerance, self.interior_error, self.exterior_error), RuntimeWarning)
+
+    @staticmethod
+    def __get_directions(cos_theta, phi):
+        sin_theta = np.sqrt(np.maximum(1.0 - cos_theta ** 2, 0.0))
+        return np.stack((sin_theta * np.cos(phi), sin_theta * np.sin(phi), cos_theta), axis=1)
+
+    def __get_coefficients(self, radius):
+        """
+        Project the field on a sphere of radius onto the spherical harmonics
+        """
+        b_sphere = self.field.b_field(self.centre + radius * self.__quadrature_directions)
+
+        return np.dot(self.__quadrature_harmonics.T * self.__quadrature_weights, b_sphere)
+
+    def __measure_error(self, radius, interior):
+        """
+        Get the maximum error of the expansion on a sphere of radius, relative to the peak field on the sphere. The
+        error is evaluated on a Fibonacci lattice, which does not coincide with the quadrature points
+        """
+        num_points = 4 * (self.max_degree + 1) ** 2
+        cos_theta = 1.0 - (2.0 * np.arange(num_points) + 1.0) / num_points
+        phi = np.pi * (3.0 - np.sqrt(5.0)) * np.arange(num_points)
+        points = self.centre + radius * self.__get_directions(cos_theta, phi)
+
+        b_exact = self.field.b_field(points)
+        b_expansion = self.__expand(points - self.centre, radius, interior)
+        peak_field = np.max(np.sqrt(np.sum(b_exact ** 2, axis=1)))
+
+        return np.max(np.sqrt(np.sum((b_expansion - b_exact) ** 2, axis=1))) / peak_field
+
+    def __expand(self, offsets, radius, interior):
+        """
+        Evaluate the interior or exterior expansion at offsets from the centre
+        """
+        r = np.sqrt(np.sum(offsets ** 2, axis=1))
+        cos_theta = np.where(r > 0.0, offsets[:, 2] / np.where(r > 0.0, r, 1.0), 1.0)
+        phi = np.arctan2(offsets[:, 1], offsets[:, 0])
+        harmonics = real_spherical_harmonics(self.max_degree, cos_theta, phi)
+
+        # Scale each degree by its radial dependence
+        degrees = np.floor(np.sqrt(np.arange((self.max_degree + 1) ** 2))).astype(int)
+        if interior:
+            harmonics *= (r / radius)[:, np.newaxis] ** degrees[np.newaxis, :]
+            coefficients = self.interior_coefficients
+        else:
+            harmonics *= (radius / r)[:, np.newaxis] ** (degrees[np.newaxis, :] + 1)
+            coefficients = self.exterior_coefficients
+
+        return np.dot(harmonics, coefficients)
+
+    def b_field(self, field_point):
+        """
+        Calculate the field, using the expansions away from the windings
+
+        :param field_point: point at which the field is evaluated, or an Nx3 array of points
+        :return: B field with the same shape as field_point
+        """
+        if self.domain_size is not None:
+            if np.any(field_point < -self.domain_size) or np.any(field_point > self.domain_size):
+                raise ValueError("Field point is outside simulations domain")
+
+        points = field_point.reshape((-1, 3))
+        offsets = points - self.centre
+        r = np.sqrt(np.sum(offsets ** 2, axis=1))
+        is_interior = r <= self.interior_radius
+        is_exterior = r >= self.exterior_radius
+        is_near = np.logical_not(np.logical_or(is_interior, is_exterior))
+
+        b_field = np.zeros(points.shape)
+        if np.any(is_interior):
+            b_field[is_interior] = self.__expand(offsets[is_interior], self.interior_radius, True)
+        if np.any(is_exterior):
+            b_field[is_exterior] = self.__expand(offsets[is_exterior], self.exterior_radius, False)
+        if np.any(is_near):
+            b_field[is_near] = self.field.b_field(points[is_near])
+
+        return b_field.reshape(field_point.shape)
+
+
+if __name__ == '__main__':
+    pass
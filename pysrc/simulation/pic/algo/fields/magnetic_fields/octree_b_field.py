@@ -0,0 +1,286 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains an adaptive octree mesh for frozen B fields. Cells are refined wherever trilinear interpolation of an
+analytic field, such as a CombinedField of CurrentLoops, differs from the field itself by more than a tolerance. In a
+polywell this concentrates the mesh at the cusps and coils, rather than in the nearly field free centre.
+"""
+
+import numpy as np
+
+
+class OctreeBField(object):
+    """
+    This class stores an adaptive octree mesh of the B field, and trilinearly interpolates the field within the leaf
+    cells. Child cells are ordered by octant, 4 * i_x + 2 * i_y + i_z, where i is 1 for the upper half of the cell in
+    each dimension. The corners of each cell are stored in the same order, as indices into an array of field values
+    that is shared between neighbouring cells.
+    """
+    max_allowed_depth = 20
+
+    # Offsets of the 8 corners of a cell in units of the cell width, and the 27 sample points used to estimate the
+    # interpolation error in units of half the cell width, from the lower corner
+    corner_offsets = np.asarray([[i, j, k] for i in range(2) for j in range(2) for k in range(2)])
+    sample_offsets = np.asarray([[i, j, k] for i in range(3) for j in range(3) for k in range(3)])
+
+    def __init__(self, dom_size, max_depth, cell_lower, cell_size, children, corner_index, point_fields,
+                 num_field_evaluations=0):
+        """
+        Initialise the octree from its node arrays. Meshes are normally created with generate or load.
+
+        :param dom_size: The domain is assumed to be a cube between (-dom_size, dom_size) in each dimension
+        :param max_depth: maximum depth of the octree
+        :param cell_lower: (num_nodes, 3) integer lower corner of each node, in units of the finest cell width
+        :param cell_size: (num_nodes,) integer width of each node, in units of the finest cell width
+        :param children: (num_nodes, 8) index of the child nodes of each node, -1 for leaves
+        :param corner_index: (num_nodes, 8) index of the corners of each node in point_fields
+        :param point_fields: (num_points, 3) B field at the corners of the nodes
+        :param num_field_evaluations: number of evaluations of the analytic field used to generate the mesh
+        """
+        assert isinstance(dom_size, float)
+        assert isinstance(max_depth, int) and 0 <= max_depth <= OctreeBField.max_allowed_depth
+        assert cell_lower.shape[0] == cell_size.shape[0] == children.shape[0] == corner_index.shape[0]
+        assert children.shape[1] == corner_index.shape[1] == 8
+
+        self.dom_size = dom_size
+        self.max_depth = max_depth
+        self.cell_lower = cell_lower
+        self.cell_size = cell_size
+        self.children = children
+        self.corner_index = corner_index
+        self.point_fields = point_fields
+        self.num_field_evaluations = num_field_evaluations
+
+        self.finest_width = 2.0 * dom_size / 2 ** max_depth
+
+    @property
+    def num_nodes(self):
+        return self.children.shape[0]
+
+    @property
+    def num_leaves(self):
+        return int(np.sum(self.children[:, 0] < 0))
+
+    @property
+    def cell_width(self):
+        return self.cell_size * self.finest_width
+
+    @property
+    def cell_origin(self):
+        return self.cell_lower * self.finest_width - self.dom_size
+
+    @classmethod
+    def generate(cls, field, dom_size, tolerance, max_depth=8, min_depth=2, floor_fraction=1e-2):
+        """
+        Generate an octree mesh of a field, refining cells until the trilinear interpolation error is within tolerance
+
+        :param field: field with a b_field function that evaluates an Nx3 array of points
+        :param dom_size: The domain is assumed to be a cube between (-dom_size, dom_size) in each dimension
+        :param tolerance: tolerance on the interpolation error, relative to the local field strength
+        :param max_depth: maximum depth of refinement
+        :param min_depth: depth to which the mesh is refined uniformly
+        :param floor_fraction: fraction of the peak field below which the error is measured relative to the peak
+                               field, so that field nulls are not refined indefinitely
+        :return:
+        """
+        assert isinstance(dom_size, float)
+        assert isinstance(tolerance, float) and tolerance > 0.0
+        assert isinstance(max_depth, int) and 0 <= max_depth <= OctreeBField.max_allowed_depth
+        assert isinstance(min_depth, int) and 0 <= min_depth <= max_depth
+
+        finest_cells = 2 ** max_depth
+        finest_width = 2.0 * dom_size / finest_cells
+        evaluator = _CachedFieldEvaluator(field, finest_width, dom_size, finest_cells)
+
+        # Trilinear weights of the 8 corners at each sample point
+        local_coordinates = OctreeBField.sample_offsets / 2.0
+        interpolation_weights = np.ones((27, 8))
+        for corner, offset in enumerate(OctreeBField.corner_offsets):
+            for dim in range(3):
+                interpolation_weights[:, corner] *= local_coordinates[:, dim] if offset[dim] else 1.0 - local_coordinates[:, dim]
+
+        lower_list = []
+        size_list = []
+        parent_list = []
+        corner_list = []
+        active_lower = np.zeros((1, 3), dtype=np.int64)
+        active_parent = np.asarray([-1])
+        field_floor = None
+        node_count = 0
+        for depth in range(max_depth + 1):
+            size = finest_cells // 2 ** depth
+
+            # Sample the field at the corners of each active node
+            corner_points = active_lower[:, np.newaxis, :] + OctreeBField.corner_offsets[np.newaxis, :, :] * size
+            corner_keys = evaluator.get_keys(corner_points.reshape((-1, 3)))
+            corner_fields = evaluator.evaluate(corner_keys).reshape((-1, 8, 3))
+
+            # Estimate the interpolation error of each node, nodes at the maximum depth cannot be refined
+            if depth < min_depth:
+                refine = np.ones(active_lower.shape[0], dtype=bool)
+            elif depth == max_depth:
+                refine = np.zeros(active_lower.shape[0], dtype=bool)
+            else:
+                sample_points = active_lower[:, np.newaxis, :] + OctreeBField.sample_offsets[np.newaxis, :, :] * (size // 2)
+                sample_fields = evaluator.evaluate(evaluator.get_keys(sample_points.reshape((-1, 3))))
+                sample_fields = sample_fields.reshape((-1, 27, 3))
+
+                if field_floor is None:
+                    field_floor = floor_fraction * np.max(evaluator.finite_field_magnitudes())
+                interpolated_fields = np.einsum('pc,ncd->npd', interpolation_weights, corner_fields)
+                error = np.sqrt(np.sum((interpolated_fields - sample_fields) ** 2, axis=2))
+                error /= np.maximum(np.sqrt(np.sum(sample_fields ** 2, axis=2)), field_floor)
+                error = np.max(error, axis=1)
+
+                # Refine cells with non-finite errors, as they are adjacent to the coils
+                refine = np.logical_not(error <= tolerance)
+
+            lower_list.append(active_lower)
+            size_list.append(np.ones(active_lower.shape[0], dtype=np.int64) * size)
+            parent_list.append(active_parent)
+            corner_list.append(corner_keys.reshape((-1, 8)))
+
+            # Generate children of refined nodes
+            node_idx = node_count + np.arange(active_lower.shape[0])
+            node_count += active_lower.shape[0]
+            refined_lower = active_lower[refine]
+            if refined_lower.shape[0] == 0:
+                break
+            child_offsets = OctreeBField.corner_offsets * (size // 2)
+            active_lower = (refined_lower[:, np.newaxis, :] + child_offsets[np.newaxis, :, :]).reshape((-1, 3))
+            active_parent = np.repeat(node_idx[refine], 8)
+
+        # Assemble node arrays, children are generated in octant order for each parent
+        cell_lower = np.concatenate(lower_list)
+        cell_size = np.concatenate(size_list)
+        parents = np.concatenate(parent_list)
+        children = -np.ones((cell_lower.shape[0], 8), dtype=np.int32)
+        child_idx = np.arange(1, cell_lower.shape[0])
+        children[parents[1:], np.arange(child_idx.shape[0]) % 8] = child_idx
+
+        # Only store the field at node corners, discarding the samples used for error estimates
+        point_keys, corner_index = np.unique(np.concatenate(corner_list), return_inverse=True)
+        point_fields = evaluator.evaluate(point_keys)
+
+        return cls(dom_size, max_depth, cell_lower.astype(np.int32), cell_size.astype(np.int32), children,
+                   corner_index.reshape((-1, 8)).astype(np.int32), point_fields,
+                   num_field_evaluations=evaluator.num_evaluations)
+
+    def locate(self, field_point):
+        """
+        Find the leaf node containing each point
+
+        :param field_point: Nx3 array of points
+        :return: (N,) array of leaf node indices
+        """
+        nodes = np.zeros(field_point.shape[0], dtype=np.int64)
+        for depth in range(self.max_depth):
+            node_children = self.children[nodes]
+            is_branch = node_children[:, 0] >= 0
+            if not np.any(is_branch):
+                break
+
+            branch_nodes = nodes[is_branch]
+            branch_centre = (self.cell_lower[branch_nodes] + 0.5 * self.cell_size[branch_nodes, np.newaxis]) * self.finest_width - self.dom_size
+            above_centre = field_point[is_branch] >= branch_centre
+            octant = 4 * above_centre[:, 0] + 2 * above_centre[:, 1] + above_centre[:, 2]
+            nodes[is_branch] = node_children[is_branch, octant]
+
+        return nodes
+
+    def b_field(self, field_point):
+        """
+        Return the field at location
+
+        :param field_point: Nx3 array of points at which the field is evaluated
+        :return: Nx3 array of field values
+        """
+        if np.any(field_point < -self.dom_size) or np.any(field_point > self.dom_size):
+            raise ValueError("Field point is outside simulations domain")
+
+        nodes = self.locate(field_point)
+        cell_width = self.cell_size[nodes] * self.finest_width
+        cell_origin = self.cell_lower[nodes] * self.finest_width - self.dom_size
+        local_coordinates = (field_point - cell_origin) / cell_width[:, np.newaxis]
+        local_coordinates = np.clip(local_coordinates, 0.0, 1.0)
+
+        B = np.zeros(field_point.shape)
+        for corner, offset in enumerate(OctreeBField.corner_offsets):
+            weight = np.ones(field_point.shape[0])
+            for dim in range(3):
+                weight *= local_coordinates[:, dim] if offset[dim] else 1.0 - local_coordinates[:, dim]
+            B += weight[:, np.newaxis] * self.point_fields[self.corner_index[nodes, corner], :]
+
+        return B
+
+    def save(self, file_name):
+        """
+        Save the octree mesh to a compressed numpy archive
+        """
+        np.savez_compressed(file_name, dom_size=self.dom_size, max_depth=self.max_depth, cell_lower=self.cell_lower,
+                            cell_size=self.cell_size, children=self.children, corner_index=self.corner_index,
+                            point_fields=self.point_fields, num_field_evaluations=self.num_field_evaluations)
+
+    @classmethod
+    def load(cls, file_name):
+        """
+        Load an octree mesh saved with save
+        """
+        data = np.load(file_name)
+        return cls(float(data["dom_size"]), int(data["max_depth"]), data["cell_lower"], data["cell_size"],
+                   data["children"], data["corner_index"], data["point_fields"],
+                   num_field_evaluations=int(data["num_field_evaluations"]))
+
+
+class _CachedFieldEvaluator(object):
+    """
+    Evaluates a field at points on the integer lattice of the finest octree level. Each lattice point is only evaluated
+    once, as the sample points of a cell are the corners of its children.
+    """
+    def __init__(self, field, finest_width, dom_size, finest_cells):
+        self.field = field
+        self.finest_width = finest_width
+        self.dom_size = dom_size
+        self.lattice_pts = finest_cells + 1
+        self.keys = np.zeros((0,), dtype=np.int64)
+        self.values = np.zeros((0, 3))
+
+    @property
+    def num_evaluations(self):
+        return self.keys.shape[0]
+
+    def finite_field_magnitudes(self):
+        magnitudes = np.sqrt(np.sum(self.values ** 2, axis=1))
+        return magnitudes[np.isfinite(magnitudes)]
+
+    def get_keys(self, lattice_points):
+        return (lattice_points[:, 0] * self.lattice_pts + lattice_points[:, 1]) * self.lattice_pts + lattice_points[:, 2]
+
+    def evaluate(self, keys):
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+
+        # Evaluate field at points that have not been sampled before
+        positions = np.searchsorted(self.keys, unique_keys)
+        found = positions < self.keys.shape[0]
+        found[found] = self.keys[positions[found]] == unique_keys[found]
+        new_keys = unique_keys[np.logical_not(found)]
+        if new_keys.shape[0] > 0:
+            new_points = np.zeros((new_keys.shape[0], 3))
+            new_points[:, 0] = new_keys // self.lattice_pts ** 2
+            new_points[:, 1] = (new_keys // self.lattice_pts) % self.lattice_pts
+            new_points[:, 2] = new_keys % self.lattice_pts
+            new_points = new_points * self.finest_width - self.dom_size
+            with np.errstate(divide='ignore', invalid='ignore'):
+                new_values = self.field.b_field(new_points)
+
+            all_keys = np.concatenate((self.keys, new_keys))
+            order = np.argsort(all_keys)
+            self.keys = all_keys[order]
+            self.values = np.concatenate((self.values, new_values))[order]
+
+        return self.values[np.searchsorted(self.keys, unique_keys)][inverse.reshape(-1)]
+
+
+if __name__ == '__main__':
+    pass
@@ -125,7 +125,7 @@ def arbitrary_axis_rotation_3d(point, a, rotation_angle):
     assert isinstance(a, np.ndarray) and a.shape[0] == 3 and len(a.shape) == 1, \
             "Axis of rotation should be 3D"
 
-    a /= magnitude(a)
+    a = a / magnitude(a)
     c = np.cos(rotation_angle)
     s = np.sin(rotation_angle)
 
@@ -140,3 +140,83 @@ def arbitrary_axis_rotation_3d(point, a, rotation_angle):
 
     return rotated_vector
 
+
+def batch_magnitude(vectors, out=None):
+    """
+    Get the magnitudes of an array of vectors along the last axis. Unlike the single vector functions above, the batch
+    functions do not check their arguments, and the results can be written into an existing array with out. out must
+    not be the same array as any of the inputs.
+
+    :param vectors: array of vectors with shape (..., 3)
+    :param out: optional array with shape (...) for the result
+    :return: array of magnitudes with shape (...)
+    """
+    return np.sqrt(np.einsum('...i,...i->...', vectors, vectors), out=out)
+
+
+def batch_normalise(vectors, out=None):
+    """
+    Normalise an array of vectors along the last axis
+    """
+    return np.divide(vectors, batch_magnitude(vectors)[..., np.newaxis], out=out)
+
+
+def batch_dot(vectors_1, vectors_2, out=None):
+    """
+    Perform the dot product vectors_1.vectors_2 along the last axis
+    """
+    return np.einsum('...i,...i->...', vectors_1, vectors_2, out=out)
+
+
+def batch_cross(vectors_1, vectors_2, out=None):
+    """
+    Perform the cross product vectors_1 X vectors_2 along the last axis
+    """
+    if out is None:
+        out = np.empty(np.broadcast(vectors_1, vectors_2).shape)
+    out[..., 0] = vectors_1[..., 1] * vectors_2[..., 2] - vectors_1[..., 2] * vectors_2[..., 1]
+    out[..., 1] = vectors_1[..., 2] * vectors_2[..., 0] - vectors_1[..., 0] * vectors_2[..., 2]
+    out[..., 2] = vectors_1[..., 0] * vectors_2[..., 1] - vectors_1[..., 1] * vectors_2[..., 0]
+
+    return out
+
+
+def batch_vector_projection(vectors_1, vectors_2, out=None):
+    """
+    Project vectors_1 onto the directions of vectors_2 along the last axis
+    """
+    v_2_norm = batch_normalise(vectors_2)
+    return np.multiply(batch_dot(vectors_1, v_2_norm)[..., np.newaxis], v_2_norm, out=out)
+
+
+def batch_rotate_3d(vectors, rotation_angles, out=None):
+    """
+    Rotate an array of vectors along 3 angles about the principal axes
+
+    :param vectors: array of vectors with shape (..., 3)
+    :param rotation_angles: rotation angles about the x, y and z axes, with shape (..., 3)
+    """
+    c_x, c_y, c_z = np.moveaxis(np.cos(rotation_angles), -1, 0)
+    s_x, s_y, s_z = np.moveaxis(np.sin(rotation_angles), -1, 0)
+
+    R = np.stack([np.stack([c_y * c_z, c_z * s_x * s_y - c_x * s_z, c_x * c_z * s_y + s_x * s_z], axis=-1),
+                  np.stack([c_y * s_z, c_x * c_z + s_x * s_y * s_z, -c_z * s_x + c_x * s_y * s_z], axis=-1),
+                  np.stack([-s_y, c_y * s_x, c_x * c_y], axis=-1)], axis=-2)
+
+    return np.einsum('...ij,...j->...i', R, vectors, out=out)
+
+
+def batch_arbitrary_axis_rotation_3d(points, a, rotation_angle, out=None):
+    """
+    Rotate an array of points about arbitrary axes, using Rodrigues' rotation formula
+
+    :param points: array of points with shape (..., 3)
+    :param a: axes of rotation with shape (..., 3), these do not need to be normalised
+    :param rotation_angle: rotation angles with shape (...), or a single float
+    """
+    a = batch_normalise(a)
+    c = np.cos(rotation_angle)[..., np.newaxis]
+    s = np.sin(rotation_angle)[..., np.newaxis]
+    rotated = points * c + batch_cross(a, points) * s
+
+    return np.add(rotated, a * (batch_dot(a, points)[..., np.newaxis] * (1 - c)), out=out)
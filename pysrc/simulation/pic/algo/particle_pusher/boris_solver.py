@@ -56,20 +56,13 @@ def boris_solver_internal(E, B, X, V, Q, M, dt):
 
     # Calculate v prime
     t = Q * B / M * 0.5 * dt
-    v_prime = np.zeros(v_minus.shape)
-    for i, v in enumerate(v_prime[:, 0]):
-        v_prime[i, :] = v_minus[i, :] + cross(v_minus[i, :], t[i, :])
+    v_prime = v_minus + batch_cross(v_minus, t)
 
     # Calculate s
-    s = np.zeros(t.shape)
-    for i, _ in enumerate(t[:, 0]):
-        s[i, :] = 2 * t[i, :]
-        s[i, :] /= 1 + magnitude(t[i, :]) ** 2
+    s = 2 * t / (1 + batch_dot(t, t))[:, np.newaxis]
 
     # Calculate v_plus
-    v_plus = np.zeros(v_minus.shape)
-    for i, v in enumerate(v_prime[:, 0]):
-        v_plus[i, :] = v_minus[i, :] + cross(v_prime[i, :], s[i, :])
+    v_plus = v_minus + batch_cross(v_prime, s)
 
     # Calculate new velocity
     V_plus = v_plus + E_field_offset
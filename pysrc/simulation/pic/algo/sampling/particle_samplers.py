@@ -0,0 +1,131 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains samplers for the initial positions and velocities of particle ensembles. Each sampler draws all
+particles in a single vectorised call, using an explicit numpy Generator so that ensembles can be reproduced
+independently of the global random state.
+"""
+
+import numpy as np
+
+from plasma_physics.pysrc.simulation.pic.algo.geometry.vector_ops import batch_normalise
+
+
+def isotropic_directions(rng, num_particles):
+    """
+    Sample unit vectors uniformly distributed over the sphere
+
+    :param rng: numpy Generator
+    :param num_particles: number of vectors to sample
+    :return: Nx3 array of unit vectors
+    """
+    assert isinstance(rng, np.random.Generator)
+    z_unit = rng.uniform(-1.0, 1.0, num_particles)
+    xy_plane = np.sqrt(1 - z_unit ** 2)
+    phi = rng.uniform(0.0, 2 * np.pi, num_particles)
+
+    return np.stack((xy_plane * np.cos(phi), xy_plane * np.sin(phi), z_unit), axis=1)
+
+
+def shell_positions(rng, num_particles, inner_radius, outer_radius, centre=None, uniform_in_volume=True):
+    """
+    Sample positions within a spherical shell
+
+    :param rng: numpy Generator
+    :param num_particles: number of positions to sample
+    :param inner_radius: inner radius of the shell
+    :param outer_radius: outer radius of the shell
+    :param centre: centre of the shell, defaults to the origin
+    :param uniform_in_volume: if True, positions are uniform in volume, otherwise the radius is uniform between the
+                              inner and outer radius, as in the original single particle campaigns
+    :return: Nx3 array of positions
+    """
+    assert isinstance(rng, np.random.Generator)
+    assert isinstance(inner_radius, float) and inner_radius >= 0.0
+    assert isinstance(outer_radius, float) and outer_radius >= inner_radius
+    centre = np.zeros(3) if centre is None else centre
+
+    directions = isotropic_directions(rng, num_particles)
+    if uniform_in_volume:
+        radii = np.cbrt(rng.uniform(inner_radius ** 3, outer_radius ** 3, num_particles))
+    else:
+        radii = rng.uniform(inner_radius, outer_radius, num_particles)
+
+    return centre + radii[:, np.newaxis] * directions
+
+
+def ball_positions(rng, num_particles, radius, centre=None):
+    """
+    Sample positions uniformly within a sphere
+    """
+    return shell_positions(rng, num_particles, 0.0, radius, centre=centre)
+
+
+def mono_energetic_velocities(rng, num_particles, speed):
+    """
+    Sample isotropic velocities with a single speed
+
+    :param rng: numpy Generator
+    :param num_particles: number of velocities to sample
+    :param speed: speed of the particles
+    :return: Nx3 array of velocities
+    """
+    assert isinstance(rng, np.random.Generator)
+    assert isinstance(speed, float)
+    return speed * isotropic_directions(rng, num_particles)
+
+
+def maxwellian_velocities(rng, num_particles, thermal_velocity, drift_velocity=None):
+    """
+    Sample velocities from a drifting Maxwellian distribution
+
+    :param rng: numpy Generator
+    :param num_particles: number of velocities to sample
+    :param thermal_velocity: standard deviation of each velocity component, sqrt(kT / m)
+    :param drift_velocity: mean velocity, defaults to zero
+    :return: Nx3 array of velocities
+    """
+    assert isinstance(rng, np.random.Generator)
+    assert isinstance(thermal_velocity, float)
+    drift_velocity = np.zeros(3) if drift_velocity is None else drift_velocity
+
+    return drift_velocity + rng.normal(0.0, thermal_velocity, (num_particles, 3))
+
+
+def loss_cone_velocities(rng, num_particles, speed, loss_cone_angle, axis):
+    """
+    Sample velocities with a single speed, distributed isotropically outside a loss cone. Particles with pitch angles
+    to the axis within loss_cone_angle of either direction along the axis are excluded.
+
+    :param rng: numpy Generator
+    :param num_particles: number of velocities to sample
+    :param speed: speed of the particles
+    :param loss_cone_angle: half angle of the loss cone in radians
+    :param axis: axis of the loss cone
+    :return: Nx3 array of velocities
+    """
+    assert isinstance(rng, np.random.Generator)
+    assert isinstance(speed, float)
+    assert isinstance(loss_cone_angle, float) and 0.0 <= loss_cone_angle <= 0.5 * np.pi
+    assert isinstance(axis, np.ndarray) and axis.shape == (3,)
+
+    # Sample pitch angles outside the cone, and gyro phases, about the z axis
+    max_cos_pitch = np.cos(loss_cone_angle)
+    cos_pitch = rng.uniform(-max_cos_pitch, max_cos_pitch, num_particles)
+    sin_pitch = np.sqrt(1 - cos_pitch ** 2)
+    phi = rng.uniform(0.0, 2 * np.pi, num_particles)
+
+    # Transform to a basis aligned with the axis
+    e_3 = batch_normalise(axis)
+    e_1 = np.cross(e_3, np.asarray([1.0, 0.0, 0.0]) if abs(e_3[0]) < 0.9 else np.asarray([0.0, 1.0, 0.0]))
+    e_1 = batch_normalise(e_1)
+    e_2 = np.cross(e_3, e_1)
+    directions = (sin_pitch * np.cos(phi))[:, np.newaxis] * e_1 + (sin_pitch * np.sin(phi))[:, np.newaxis] * e_2 + \
+        cos_pitch[:, np.newaxis] * e_3
+
+    return speed * directions
+
+
+if __name__ == '__main__':
+    pass
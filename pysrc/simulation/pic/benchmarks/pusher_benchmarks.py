@@ -0,0 +1,357 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains work-precision benchmarks of the particle pushers and magnetic field backends. Each pusher is run on
+canonical problems over a range of time steps, and the particle steps per second, energy drift and phase error of each
+run are tabulated, so that time step choices can be justified and performance regressions caught when kernels change.
+"""
+
+import time
+import numpy as np
+
+from plasma_physics.pysrc.simulation.pic.algo.fields.magnetic_fields.generic_b_fields import InterpolatedBField, \
+    get_polywell_field
+from plasma_physics.pysrc.simulation.pic.algo.fields.magnetic_fields.multipole_b_field import MultipoleBField
+from plasma_physics.pysrc.simulation.pic.algo.fields.magnetic_fields.octree_b_field import OctreeBField
+from plasma_physics.pysrc.simulation.pic.algo.particle_pusher.boris_solver import boris_solver_internal
+from plasma_physics.pysrc.simulation.pic.algo.sampling.particle_samplers import shell_positions, \
+    mono_energetic_velocities
+from plasma_physics.pysrc.simulation.pic.data.particles.charged_particle import PICParticle
+from plasma_physics.pysrc.simulation.pic.simulations.analytic_single_particle_motion import solve_crossed_fields
+from plasma_physics.pysrc.utils.physical_constants import PhysicalConstants
+
+
+# Pushers taking arrays of fields, with the same signature as boris_solver_internal
+PUSHERS = {
+    "boris": boris_solver_internal
+}
+
+FIELD_BACKENDS = ["biot_savart", "interpolated_linear", "interpolated_cubic", "multipole", "octree"]
+
+
+class PusherProblem(object):
+    """
+    A benchmark problem for an ensemble of particles in static fields. The final positions of the particles are
+    compared with a reference solution, either analytic or from the run with the smallest time step. Errors are given
+    relative to a length scale of each particle, so that for gyrating particles normalised by their Larmor radius the
+    error is approximately the error in gyrophase in radians.
+    """
+    def __init__(self, name, X, V, Q, M, e_field, b_field, final_time, length_scale, potential=None,
+                 domain_size=None, reference=None):
+        """
+        :param name: name of the problem
+        :param X: Nx3 array of initial positions
+        :param V: Nx3 array of initial velocities
+        :param Q: (N, 1) array of charges
+        :param M: (N, 1) array of masses
+        :param e_field: function returning the E field at an Nx3 array of points
+        :param b_field: function returning the B field at an Nx3 array of points
+        :param final_time: time at which the positions are compared
+        :param length_scale: length used to normalise errors in position, or an (N,) array of lengths for each particle
+        :param potential: function returning the electric potential at an Nx3 array of points, used in the energy
+        :param domain_size: half width of the domain. Particles leaving the domain are stopped at their last position
+        :param reference: function returning the exact final positions, or None to use the smallest time step
+        """
+        assert isinstance(X, np.ndarray) and X.shape[1] == 3
+        assert X.shape == V.shape and Q.shape == M.shape == (X.shape[0], 1)
+        assert isinstance(final_time, float) and final_time > 0.0
+        assert np.all(np.asarray(length_scale) > 0.0)
+        assert domain_size is None or isinstance(domain_size, float)
+
+        self.name = name
+        self.X = X
+        self.V = V
+        self.Q = Q
+        self.M = M
+        self.e_field = e_field
+        self.b_field = b_field
+        self.final_time = final_time
+        self.length_scale = length_scale
+        self.potential = potential
+        self.domain_size = domain_size
+        self.reference = reference
+
+    def get_energy(self, X, V):
+        """
+        :param X: Nx3 array of positions
+        :param V: Nx3 array of velocities
+        :return: total energy of the particles
+        """
+        energy = np.sum(0.5 * self.M[:, 0] * np.sum(V ** 2, axis=1))
+        if self.potential is not None:
+            energy += np.sum(self.Q[:, 0] * self.potential(X))
+
+        return energy
+
+
+def run_pusher(problem, dt, pusher="boris"):
+    """
+    Run a problem with a fixed time step. The initial velocities are pushed back half a step, so that the velocities
+    are staggered from the positions as in a leapfrog scheme
+
+    :param problem: PusherProblem
+    :param dt: time step, which is reduced slightly to give a whole number of steps to the final time
+    :param pusher: name of the pusher
+    :return: final positions, dictionary of the number of particle steps, wall clock time and relative energy drift
+    """
+    assert isinstance(problem, PusherProblem)
+    assert pusher in PUSHERS
+    push = PUSHERS[pusher]
+
+    num_steps = int(np.ceil(problem.final_time / dt - 1e-9))
+    dt = problem.final_time / num_steps
+    X = problem.X.copy()
+    V = problem.V.copy()
+    active = np.ones(X.shape[0], dtype=bool)
+    initial_energy = problem.get_energy(X, V)
+    particle_steps = 0
+
+    start = time.time()
+    V = push(problem.e_field(X), problem.b_field(X), X, V, problem.Q, problem.M, -0.5 * dt)[1]
+    for i in range(num_steps):
+        if np.all(active):
+            E = problem.e_field(X)
+            B = problem.b_field(X)
+            X, V = push(E, B, X, V, problem.Q, problem.M, dt)
+            particle_steps += X.shape[0]
+        else:
+            E = problem.e_field(X[active])
+            B = problem.b_field(X[active])
+            X[active], V[active] = push(E, B, X[active], V[active], problem.Q[active], problem.M[active], dt)
+            particle_steps += np.sum(active)
+
+        if problem.domain_size is not None:
+            active[np.any(np.abs(X) >= problem.domain_size, axis=1)] = False
+            if not np.any(active):
+                break
+    wall_time = time.time() - start
+
+    # Velocities are pushed forward half a step to be synchronised with the positions
+    if np.any(active):
+        V[active] = push(problem.e_field(X[active]), problem.b_field(X[active]), X[active], V[active],
+                         problem.Q[active], problem.M[active], 0.5 * dt)[1]
+    final_energy = problem.get_energy(X, V)
+    energy_drift = abs(final_energy - initial_energy) / abs(initial_energy)
+
+    return X, {
+        "dt": dt,
+        "particle_steps": particle_steps,
+        "wall_time": wall_time,
+        "steps_per_second": particle_steps / wall_time if wall_time > 0.0 else np.inf,
+        "energy_drift": energy_drift,
+        "escaped_fraction": 1.0 - np.sum(active) / float(active.shape[0])
+    }
+
+
+def work_precision(problem, dts, pushers=None):
+    """
+    Run a problem over a range of time steps with each pusher
+
+    :param problem: PusherProblem
+    :param dts: list of time steps
+    :param pushers: list of pusher names, defaults to all pushers
+    :return: list of dictionaries of results for each pusher and time step
+    """
+    pushers = list(PUSHERS.keys()) if pushers is None else pushers
+    dts = sorted(dts, reverse=True)
+
+    results = []
+    for pusher in pushers:
+        runs = [run_pusher(problem, dt, pusher) for dt in dts]
+        reference = problem.reference() if problem.reference is not None else runs[-1][0]
+        for X, result in runs:
+            error = np.sqrt(np.sum((X - reference) ** 2, axis=1)) / problem.length_scale
+            result["phase_error"] = np.max(error)
+            result["pusher"] = pusher
+            result["problem"] = problem.name
+            results.append(result)
+
+    # The error of the reference run is unknown without an analytic solution
+    if problem.reference is None:
+        for result in results:
+            if result["dt"] == min(r["dt"] for r in results if r["pusher"] == result["pusher"]):
+                result["phase_error"] = np.nan
+
+    return results
+
+
+def format_table(results):
+    """
+    :param results: list of dictionaries of results from work_precision
+    :return: string of a work-precision table
+    """
+    header = "{:<30}{:<10}{:>12}{:>16}{:>14}{:>14}{:>10}".format(
+        "problem", "pusher", "dt", "steps/s", "energy drift", "phase error", "escaped")
+    lines = [header, "-" * len(header)]
+    for result in results:
+        lines.append("{:<30}{:<10}{:>12.3e}{:>16.4e}{:>14.3e}{:>14.3e}{:>10.3f}".format(
+            result["problem"], result["pusher"], result["dt"], result["steps_per_second"], result["energy_drift"],
+            result["phase_error"], result["escaped_fraction"]))
+
+    return "\n".join(lines)
+
+
+def _uniform_field_problem(name, E, B, num_particles, num_gyrations, rng):
+    """
+    Problem of unit charge and mass particles in uniform fields, with an analytic reference solution
+    """
+    X = rng.uniform(-1.0, 1.0, size=(num_particles, 3))
+    V = rng.uniform(-1.0, 1.0, size=(num_particles, 3))
+    Q = np.ones((num_particles, 1))
+    M = np.ones((num_particles, 1))
+    final_time = 2.0 * np.pi * num_gyrations / np.sqrt(np.sum(B ** 2))
+
+    # Larmor radius of each particle in the drift frame
+    v_drift = np.cross(E, B) / np.sum(B ** 2)
+    b_unit = B / np.sqrt(np.sum(B ** 2))
+    V_drift_frame = V - v_drift
+    v_perpendicular = V_drift_frame - np.outer(np.sum(V_drift_frame * b_unit, axis=1), b_unit)
+    larmor_radius = np.sqrt(np.sum(v_perpendicular ** 2, axis=1)) / np.sqrt(np.sum(B ** 2))
+
+    def e_field(x):
+        return np.ones(x.shape) * E
+
+    def b_field(x):
+        return np.ones(x.shape) * B
+
+    def potential(x):
+        return -np.sum(x * E, axis=1)
+
+    def reference():
+        positions = np.zeros(X.shape)
+        for i in range(num_particles):
+            particle = PICParticle(1.0, 1.0, X[i], V[i])
+            positions[i] = solve_crossed_fields(particle, E, B, final_time, num_pts=2)[1][-1]
+        return positions
+
+    return PusherProblem(name, X, V, Q, M, e_field, b_field, final_time, larmor_radius,
+                         potential=potential, reference=reference)
+
+
+def gyration_problem(num_particles=100, num_gyrations=10, rng=None):
+    """
+    Gyration of particles in a uniform B field, in normalised units with a unit gyrofrequency
+
+    :param num_particles: number of particles
+    :param num_gyrations: number of gyration periods simulated
+    :param rng: numpy Generator used to sample the particles
+    :return: PusherProblem
+    """
+    rng = np.random.default_rng(1) if rng is None else rng
+    return _uniform_field_problem("gyration", np.zeros(3), np.asarray([0.0, 0.0, 1.0]), num_particles,
+                                  num_gyrations, rng)
+
+
+def crossed_fields_problem(num_particles=100, num_gyrations=10, rng=None):
+    """
+    E x B drift of particles in uniform perpendicular fields, in normalised units with a unit gyrofrequency
+
+    :param num_particles: number of particles
+    :param num_gyrations: number of gyration periods simulated
+    :param rng: numpy Generator used to sample the particles
+    :return: PusherProblem
+    """
+    rng = np.random.default_rng(1) if rng is None else rng
+    return _uniform_field_problem("e_cross_b", np.asarray([0.2, 0.0, 0.0]), np.asarray([0.0, 0.0, 1.0]),
+                                  num_particles, num_gyrations, rng)
+
+
+def get_polywell_backend(backend, loop_pts=50, loop_offset=1.25, domain_pts=65, tolerance=1e-4, max_depth=6):
+    """
+    Get the field of a unit radius polywell with unit current from one of the field backends
+
+    :param backend: name of the field backend
+    :param loop_pts: number of points in the Biot Savart integral of each coil
+    :param loop_offset: spacing of the coils as a ratio of the radius
+    :param domain_pts: number of points in each dimension of the interpolated meshes
+    :param tolerance: tolerance of the multipole expansion and octree mesh
+    :param max_depth: maximum depth of the octree mesh
+    :return: field with a b_field function
+    """
+    assert backend in FIELD_BACKENDS
+
+    field = get_polywell_field(1.0, 1.0, loop_offset, loop_pts)
+    domain_size = 1.1 * loop_offset
+
+    if backend == "biot_savart":
+        return field
+    elif backend in ["interpolated_linear", "interpolated_cubic"]:
+        points = np.linspace(-domain_size, domain_size, domain_pts)
+        mesh = np.stack(np.meshgrid(points, points, points, indexing="ij"), axis=-1).reshape((-1, 3))
+        b_points = field.b_field(mesh).reshape((domain_pts, domain_pts, domain_pts, 3))
+        return InterpolatedBField.from_array(b_points, domain_size, interpolation=backend.split("_")[1])
+    elif backend == "multipole":
+        return MultipoleBField(field, tolerance=tolerance)
+    else:
+        return OctreeBField.generate(field, domain_size, tolerance, max_depth=max_depth)
+
+
+def polywell_escape_problem(backend="biot_savart", num_particles=20, energy=100.0, I=1e4, radius=0.1,
+                            num_base_steps=1000, rng=None, **backend_args):
+    """
+    Escape of electrons from the centre of a polywell, which has no analytic solution. Electrons are stopped when they
+    leave the domain, and the time steps are given in units of the Gummersall time step of 1e-9 * radius
+
+    :param backend: name of the field backend
+    :param num_particles: number of electrons
+    :param energy: energy of the electrons in eV
+    :param I: current in the coils
+    :param radius: radius of the coils
+    :param num_base_steps: number of Gummersall time steps simulated
+    :param rng: numpy Generator used to sample the particles
+    :param backend_args: arguments passed to get_polywell_backend
+    :return: PusherProblem
+    """
+    rng = np.random.default_rng(1) if rng is None else rng
+    field = get_polywell_backend(backend, **backend_args)
+    loop_offset = backend_args.get("loop_offset", 1.25)
+
+    speed = np.sqrt(2.0 * energy * PhysicalConstants.electron_charge / PhysicalConstants.electron_mass)
+    X = shell_positions(rng, num_particles, 0.0, 3.0 * radius / 16.0, uniform_in_volume=False)
+    V = mono_energetic_velocities(rng, num_particles, float(speed))
+    Q = -np.ones((num_particles, 1)) * PhysicalConstants.electron_charge
+    M = np.ones((num_particles, 1)) * PhysicalConstants.electron_mass
+
+    def e_field(x):
+        return np.zeros(x.shape)
+
+    def b_field(x):
+        return field.b_field(x / radius) * I / radius
+
+    return PusherProblem("polywell_{}".format(backend), X, V, Q, M, e_field, b_field,
+                         float(num_base_steps * 1e-9 * radius), float(radius), domain_size=loop_offset * radius)
+
+
+def run_benchmarks(gyration_dt_factors=None, polywell_dt_factors=None, backends=None, num_particles=20):
+    """
+    Print work-precision tables of the uniform field and polywell problems. The polywell problems of all backends are
+    compared with the Biot Savart field at the smallest time step
+
+    :param gyration_dt_factors: time steps of the uniform field problems relative to the gyration period
+    :param polywell_dt_factors: time steps of the polywell problems relative to the Gummersall time step
+    :param backends: list of field backends used in the polywell problem, defaults to all backends
+    :param num_particles: number of particles in each problem
+    """
+    gyration_dt_factors = [0.2, 0.1, 0.05, 0.025] if gyration_dt_factors is None else gyration_dt_factors
+    polywell_dt_factors = [2.0, 1.0, 0.5, 0.25] if polywell_dt_factors is None else polywell_dt_factors
+    backends = FIELD_BACKENDS if backends is None else backends
+
+    for problem in [gyration_problem(num_particles), crossed_fields_problem(num_particles)]:
+        dts = [2.0 * np.pi * dt_factor for dt_factor in gyration_dt_factors]
+        print(format_table(work_precision(problem, dts)))
+        print("")
+
+    radius = 0.1
+    dts = [1e-9 * radius * dt_factor for dt_factor in polywell_dt_factors]
+    reference_problem = polywell_escape_problem("biot_savart", num_particles=num_particles, radius=radius)
+    reference_positions = run_pusher(reference_problem, min(dts))[0]
+    for backend in backends:
+        problem = polywell_escape_problem(backend, num_particles=num_particles, radius=radius)
+        problem.reference = lambda: reference_positions
+        print(format_table(work_precision(problem, dts)))
+        print("")
+
+
+if __name__ == '__main__':
+    run_benchmarks()
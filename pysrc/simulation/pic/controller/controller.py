@@ -3,4 +3,204 @@ Author: Rohan Ramasamy
 Date: 28/10/2017
 
 This file contains the controller for running simulations using the simplified particle in cell solver
-"""
\ No newline at end of file
+"""
+
+import numpy as np
+
+from plasma_physics.pysrc.simulation.pic.algo.particle_pusher.boris_solver import boris_solver_internal
+from plasma_physics.pysrc.simulation.pic.controller.particle_source import ParticleSource
+from plasma_physics.pysrc.simulation.pic.diagnostics.events import EventDetector
+from plasma_physics.pysrc.simulation.pic.diagnostics.instrumentation import Instrumentation
+
+
+class EnsembleController(object):
+    """
+    This class pushes an ensemble of particles through frozen fields with the boris solver, using a global time step
+    for each step. Event detectors are evaluated for all particles after each step, and particles with terminal events
+    are retired from the simulation. The full history of the ensemble is only stored if requested.
+
+    If a source is given, the ensemble is stored in a fixed number of slots, and new particles are injected into the
+    slots of retired particles. Each particle is given an id in the order it enters the simulation, which is the index
+    used in event records.
+    """
+    def __init__(self, e_field, b_field, events=None, store_history=False, history_interval=1, source=None,
+                 accumulators=None, instrumentation=None):
+        """
+        :param e_field: function to evaluate the E field at an Nx3 array of positions
+        :param b_field: function to evaluate the B field at an Nx3 array of positions
+        :param events: list of EventDetectors
+        :param store_history: if True, the positions and velocities of all particles are stored
+        :param history_interval: number of steps between stored states
+        :param source: ParticleSource injecting particles during the simulation
+        :param accumulators: list of accumulators, with an accumulate(t, dt, X, V) function that is called with the
+                             active particles after each step
+        :param instrumentation: Instrumentation timing the stages of each step
+        """
+        assert events is None or isinstance(events, list)
+        assert source is None or isinstance(source, ParticleSource)
+        assert accumulators is None or isinstance(accumulators, list)
+        assert instrumentation is None or isinstance(instrumentation, Instrumentation)
+        assert isinstance(store_history, bool)
+        assert isinstance(history_interval, int) and history_interval > 0
+
+        self.e_field = e_field
+        self.b_field = b_field
+        self.events = list() if events is None else events
+        for event in self.events:
+            assert isinstance(event, EventDetector)
+        self.store_history = store_history
+        self.history_interval = history_interval
+        self.source = source
+        self.accumulators = list() if accumulators is None else accumulators
+        self.instrumentation = Instrumentation(enabled=False) if instrumentation is None else instrumentation
+
+        self.num_steps = 0
+        self.particle_ids = np.zeros(0, dtype=int)
+        self.retired_time = np.zeros(0)
+        self.__history_times = []
+        self.__history_positions = []
+        self.__history_velocities = []
+
+    @property
+    def history(self):
+        """
+        Get the stored history of the ensemble. Retired particles remain at their last position.
+
+        :return: dictionary of times, and positions and velocities with shape (num states, num slots, 3)
+        """
+        assert self.store_history, "History is only stored if store_history is set"
+        return {"time": np.asarray(self.__history_times), "position": np.asarray(self.__history_positions),
+                "velocity": np.asarray(self.__history_velocities)}
+
+    def get_events(self):
+        """
+        :return: dictionary of the records of each event detector, by name
+        """
+        return dict([(event.name, event.get_records()) for event in self.events])
+
+    def __store_state(self, t, X, V):
+        if self.store_history and self.num_steps % self.history_interval == 0:
+            self.__history_times.append(t)
+            self.__history_positions.append(X.copy())
+            self.__history_velocities.append(V.copy())
+
+    def run(self, X, V, Q, M, dt, final_time, max_steps=int(1e7)):
+        """
+        Run the simulation until the final time, the maximum number of steps, or all particles are retired
+
+        :param X: Nx3 array of initial positions
+        :param V: Nx3 array of initial velocities
+        :param Q: charges of the particles, with shape (N,) or (N, 1)
+        :param M: masses of the particles, with shape (N,) or (N, 1)
+        :param dt: either a float time step, or a function dt(t, X, V, Q, M, E, B) returning a float time step for
+                   the particles that are still active
+        :param final_time: time at which the simulation ends
+        :param max_steps: maximum number of steps
+        :return: final time, positions, velocities, and a boolean array of the slots that are still active
+        """
+        assert isinstance(X, np.ndarray) and X.shape[1] == 3
+        assert isinstance(V, np.ndarray) and V.shape == X.shape
+        assert Q.shape[0] == M.shape[0] == X.shape[0]
+        assert isinstance(dt, float) or callable(dt)
+        assert isinstance(final_time, float)
+
+        # Allocate slots for the particles
+        num_particles = X.shape[0]
+        num_slots = num_particles if self.source is None else max(num_particles, self.source.max_particles)
+        X = np.concatenate((X, np.zeros((num_slots - num_particles, 3))))
+        V = np.concatenate((V, np.zeros((num_slots - num_particles, 3))))
+        Q = np.concatenate((Q.flatten(), np.zeros(num_slots - num_particles))).reshape((-1, 1))
+        M = np.concatenate((M.flatten(), np.ones(num_slots - num_particles))).reshape((-1, 1))
+        active = np.arange(num_slots) < num_particles
+        self.particle_ids = np.where(active, np.arange(num_slots), -1)
+        self.retired_time = np.ones(num_particles) * np.nan
+        for event in self.events:
+            event.reset(num_particles)
+        if self.source is not None:
+            self.source.reset()
+        for accumulator in self.accumulators:
+            accumulator.reset()
+
+        t = 0.0
+        self.num_steps = 0
+        self.__history_times = []
+        self.__history_positions = []
+        self.__history_velocities = []
+        self.__store_state(t, X, V)
+        timer = self.instrumentation
+        while t < final_time and self.num_steps < max_steps and (np.any(active) or self.source is not None):
+            # Skip forward to the next injection if the ensemble is empty
+            if not np.any(active):
+                t += self.source.skip_to_next_injection()
+                if t >= final_time:
+                    t = final_time
+                    break
+                self.__inject(np.where(np.logical_not(active))[0], 0.0, X, V, Q, M, active)
+
+            timer.start_step()
+            indices = np.where(active)[0]
+            ids = self.particle_ids[indices]
+            X_old = X[indices]
+            V_old = V[indices]
+
+            # Get fields and time step
+            E = self.e_field(X_old)
+            B = self.b_field(X_old)
+            timer.lap("fields")
+            step_dt = dt(t, X_old, V_old, Q[indices], M[indices], E, B) if callable(dt) else dt
+            step_dt = float(min(step_dt, final_time - t))
+            timer.lap("time_step")
+
+            # Move particles
+            X_new, V_new = boris_solver_internal(E, B, X_old, V_old, Q[indices], M[indices], step_dt)
+            X[indices] = X_new
+            V[indices] = V_new
+            t_old = t
+            t += step_dt
+            self.num_steps += 1
+            timer.lap("push")
+
+            # Detect events, and retire particles with terminal events
+            for event in self.events:
+                occurred = event.detect(ids, t_old, t, X_old, X_new, V_old, V_new)
+                if event.terminal and np.any(occurred):
+                    retired = indices[np.logical_and(occurred, active[indices])]
+                    active[retired] = False
+                    self.retired_time[self.particle_ids[retired]] = t
+            timer.lap("events")
+
+            for accumulator in self.accumulators:
+                accumulator.accumulate(t, step_dt, X[active], V[active])
+            timer.lap("accumulators")
+
+            # Particles injected during the step enter the simulation at the end of the step
+            if self.source is not None:
+                self.__inject(np.where(np.logical_not(active))[0], step_dt, X, V, Q, M, active)
+                timer.lap("injection")
+
+            self.__store_state(t, X, V)
+            timer.lap("history")
+            timer.end_step(indices.shape[0])
+
+        return t, X, V, active
+
+    def __inject(self, free_slots, dt, X, V, Q, M, active):
+        """
+        Sample the particles injected by the source over a time step into free slots
+        """
+        num_injections = self.source.get_num_injections(dt, free_slots.shape[0])
+        if num_injections == 0:
+            return
+        slots = free_slots[:num_injections]
+        X[slots], V[slots], Q[slots, 0], M[slots, 0] = self.source.sample(num_injections)
+        active[slots] = True
+
+        first_id = self.retired_time.shape[0]
+        self.particle_ids[slots] = np.arange(first_id, first_id + num_injections)
+        self.retired_time = np.concatenate((self.retired_time, np.ones(num_injections) * np.nan))
+        for event in self.events:
+            event.extend(num_injections)
+
+
+if __name__ == '__main__':
+    pass
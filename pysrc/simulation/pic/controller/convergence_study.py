@@ -0,0 +1,269 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains a runner for convergence studies of simulation parameters, such as mesh resolution, loop_pts and the
+time step. Each parameter is refined in turn from a base configuration, and the error of each level is estimated
+against the finest level or a Richardson extrapolation, so that the cheapest setting meeting a tolerance can be chosen.
+"""
+
+import time
+import multiprocessing as mp
+import numpy as np
+
+
+def _run_level(params):
+    """
+    Run a single refinement level, returning its output and wall clock time
+    """
+    run_function, config = params
+    start = time.time()
+    result = np.asarray(run_function(config), dtype=float)
+    return result, time.time() - start
+
+
+class ConvergenceStudy(object):
+    """
+    Convergence study of a simulation over refinement levels of one or more parameters. The simulation is run by a
+    function of a configuration dictionary, returning an array of output quantities that can be compared between
+    levels, e.g. particle positions at fixed output times or the field at fixed sample points.
+
+    Each parameter is refined separately, with the other parameters kept at their values in the base configuration.
+    Levels are ordered from coarsest to finest. If the values of a parameter decrease with refinement, as for a time
+    step, they are used as the step size of the level. If they increase, as for a number of points, the step size is
+    their inverse. Step sizes can also be given explicitly, e.g. for the number of points of a mesh including its ends.
+    """
+    norm_types = ["l2", "max"]
+    reference_types = ["finest", "richardson"]
+
+    def __init__(self, run_function, base_config, refinements, norm="l2", cost_function=None, step_sizes=None):
+        """
+        :param run_function: function taking a configuration dictionary and returning an array of outputs. This must
+                             be defined at module level for levels to be run in parallel
+        :param base_config: dictionary of the base configuration
+        :param refinements: dictionary of parameter names, and lists of their values from coarsest to finest
+        :param norm: norm used to calculate relative errors, either "l2" or "max"
+        :param cost_function: function returning the cost of a configuration. The measured wall clock time of each
+                              level is used by default
+        :param step_sizes: dictionary of parameter names, and lists of the step sizes of each level
+        """
+        assert callable(run_function)
+        assert isinstance(base_config, dict)
+        assert isinstance(refinements, dict)
+        assert norm in self.norm_types
+        assert cost_function is None or callable(cost_function)
+        for name, values in refinements.items():
+            assert len(values) >= 2, "At least two levels are needed for {}".format(name)
+            differences = np.diff(np.asarray(values, dtype=float))
+            assert np.all(differences > 0.0) or np.all(differences < 0.0), \
+                "Levels of {} must be monotonic".format(name)
+        step_sizes = dict() if step_sizes is None else step_sizes
+        for name, values in step_sizes.items():
+            assert name in refinements and len(values) == len(refinements[name])
+
+        self.run_function = run_function
+        self.base_config = base_config
+        self.refinements = refinements
+        self.norm = norm
+        self.cost_function = cost_function
+        self.step_sizes = step_sizes
+        self.results = dict()
+        self.costs = dict()
+
+    def get_config(self, name, value):
+        """
+        :param name: name of the refined parameter
+        :param value: value of the refined parameter
+        :return: base configuration with the refined parameter set to value
+        """
+        config = dict(self.base_config)
+        config[name] = value
+        return config
+
+    def get_step_sizes(self, name):
+        """
+        :param name: name of the refined parameter
+        :return: array of step sizes of each level
+        """
+        if name in self.step_sizes:
+            return np.asarray(self.step_sizes[name], dtype=float)
+
+        values = np.asarray(self.refinements[name], dtype=float)
+        return values if values[-1] < values[0] else 1.0 / values
+
+    def run(self, num_processes=1):
+        """
+        Run all refinement levels, in parallel if more than one process is used
+
+        :param num_processes: number of processes
+        """
+        assert isinstance(num_processes, int) and num_processes > 0
+
+        names = list(self.refinements.keys())
+        args = []
+        for name in names:
+            for value in self.refinements[name]:
+                args.append((self.run_function, self.get_config(name, value)))
+
+        if num_processes == 1:
+            outputs = [_run_level(arg) for arg in args]
+        else:
+            pool = mp.Pool(processes=num_processes)
+            outputs = pool.map(_run_level, args)
+            pool.close()
+            pool.join()
+
+        idx = 0
+        for name in names:
+            num_levels = len(self.refinements[name])
+            level_outputs = outputs[idx:idx + num_levels]
+            idx += num_levels
+
+            self.results[name] = [output[0] for output in level_outputs]
+            if self.cost_function is None:
+                self.costs[name] = np.asarray([output[1] for output in level_outputs])
+            else:
+                self.costs[name] = np.asarray([self.cost_function(self.get_config(name, value))
+                                               for value in self.refinements[name]])
+
+    def __get_norm(self, values):
+        if self.norm == "l2":
+            return np.sqrt(np.sum(values ** 2))
+        return np.max(np.abs(values))
+
+    def get_observed_order(self, name):
+        """
+        Estimate the order of convergence from the three finest levels. The ratios of step sizes between levels do
+        not need to be constant
+
+        :param name: name of the refined parameter
+        :return: observed order of convergence
+        """
+        assert name in self.results, "Study has not been run"
+        assert len(self.results[name]) >= 3, "At least three levels are needed to estimate the order"
+
+        coarse, medium, fine = self.results[name][-3:]
+        h = self.get_step_sizes(name)[-3:]
+        r_coarse = h[0] / h[1]
+        r_fine = h[1] / h[2]
+        coarse_difference = self.__get_norm(medium - coarse)
+        fine_difference = self.__get_norm(fine - medium)
+        if fine_difference == 0.0 or coarse_difference == 0.0:
+            return np.inf
+
+        # Fixed point iteration for the order, which is exact after one step for constant refinement ratios
+        order = np.log(coarse_difference / fine_difference) / np.log(r_fine)
+        for i in range(50):
+            if order <= 0.0:
+                break
+            new_order = (np.log(coarse_difference / fine_difference) +
+                         np.log((r_fine ** order - 1.0) / (r_coarse ** order - 1.0))) / np.log(r_fine)
+            converged = abs(new_order - order) < 1e-10
+            order = new_order
+            if converged:
+                break
+
+        return order
+
+    def get_reference(self, name, reference="finest", order=None):
+        """
+        :param name: name of the refined parameter
+        :param reference: reference solution, either the "finest" level or a "richardson" extrapolation from the two
+                          finest levels
+        :param order: order of convergence used in the Richardson extrapolation. The observed order is used by default
+        :return: array of reference outputs
+        """
+        assert name in self.results, "Study has not been run"
+        assert reference in self.reference_types
+
+        fine = self.results[name][-1]
+        if reference == "finest":
+            return fine
+
+        medium = self.results[name][-2]
+        if order is None:
+            order = self.get_observed_order(name)
+        assert order > 0.0, "Richardson extrapolation needs a positive order of convergence"
+        if np.isinf(order):
+            return fine
+
+        h = self.get_step_sizes(name)
+        ratio = h[-2] / h[-1]
+        return fine + (fine - medium) / (ratio ** order - 1.0)
+
+    def get_errors(self, name, reference="finest", order=None):
+        """
+        Get the relative error of each level. When the finest level is the reference, its error is unknown and set
+        to nan
+
+        :param name: name of the refined parameter
+        :param reference: reference solution, either "finest" or "richardson"
+        :param order: order of convergence used in the Richardson extrapolation
+        :return: array of relative errors of each level
+        """
+        reference_output = self.get_reference(name, reference, order)
+        reference_norm = self.__get_norm(reference_output)
+        scale = reference_norm if reference_norm > 0.0 else 1.0
+
+        errors = np.asarray([self.__get_norm(result - reference_output) / scale for result in self.results[name]])
+        if reference == "finest":
+            errors[-1] = np.nan
+
+        return errors
+
+    def get_cheapest_setting(self, name, tolerance, reference="finest", order=None):
+        """
+        Get the value of a parameter with the lowest cost that meets the tolerance
+
+        :param name: name of the refined parameter
+        :param tolerance: relative error tolerance
+        :param reference: reference solution, either "finest" or "richardson"
+        :param order: order of convergence used in the Richardson extrapolation
+        :return: value of the parameter, or None if no level meets the tolerance
+        """
+        assert isinstance(tolerance, float) and tolerance > 0.0
+
+        errors = self.get_errors(name, reference, order)
+        meets_tolerance = errors <= tolerance
+        if not np.any(meets_tolerance):
+            return None
+
+        costs = np.where(meets_tolerance, self.costs[name], np.inf)
+        return self.refinements[name][int(np.argmin(costs))]
+
+    def get_cheapest_config(self, tolerance, reference="finest"):
+        """
+        Get the base configuration with each parameter at the cheapest value meeting the tolerance. Parameters with no
+        level meeting the tolerance are set to their finest level
+
+        :param tolerance: relative error tolerance
+        :param reference: reference solution, either "finest" or "richardson"
+        :return: configuration dictionary
+        """
+        config = dict(self.base_config)
+        for name in self.refinements:
+            value = self.get_cheapest_setting(name, tolerance, reference)
+            config[name] = self.refinements[name][-1] if value is None else value
+
+        return config
+
+    def report(self, tolerance, reference="finest"):
+        """
+        Print a summary of the errors and costs of each level, and the cheapest setting of each parameter
+
+        :param tolerance: relative error tolerance
+        :param reference: reference solution, either "finest" or "richardson"
+        """
+        for name in self.refinements:
+            print("Convergence of {}:".format(name))
+            if len(self.refinements[name]) >= 3:
+                print("    Observed order: {}".format(self.get_observed_order(name)))
+            errors = self.get_errors(name, reference)
+            for value, error, cost in zip(self.refinements[name], errors, self.costs[name]):
+                print("    {}: error {}, cost {}".format(value, error, cost))
+            print("    Cheapest setting within {}: {}".format(
+                tolerance, self.get_cheapest_setting(name, tolerance, reference)))
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,107 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains a particle source for injecting particles into an ensemble simulation at a constant rate, so that
+steady state distributions can be obtained from a single long simulation.
+"""
+
+import numpy as np
+
+from plasma_physics.pysrc.simulation.pic.algo.sampling.particle_samplers import shell_positions, \
+    mono_energetic_velocities
+from plasma_physics.pysrc.utils.physical_constants import PhysicalConstants
+
+
+class ParticleSource(object):
+    """
+    Source of a single species of particle. Particles are injected uniformly within a spherical shell, with an isotropic
+    velocity distribution at a fixed energy. The number of particles injected in each step is the injection rate
+    multiplied by the time step, with the fractional remainder carried over to the next step.
+    """
+    def __init__(self, rate, energy, mass, charge, inner_radius, outer_radius, max_particles, centre=None, rng=None):
+        """
+        :param rate: number of particles injected per second
+        :param energy: kinetic energy of the injected particles in eV
+        :param mass: mass of the particles
+        :param charge: charge of the particles
+        :param inner_radius: inner radius of the injection shell
+        :param outer_radius: outer radius of the injection shell
+        :param max_particles: maximum number of particles in the simulation. Particles are not injected when there
+                              are no free slots
+        :param centre: centre of the injection shell, defaults to the origin
+        :param rng: numpy Generator used to sample particles, defaults to a Generator with a random seed
+        """
+        assert isinstance(rate, float) and rate >= 0.0
+        assert isinstance(energy, float) and energy >= 0.0
+        assert isinstance(mass, float)
+        assert isinstance(charge, float)
+        assert isinstance(inner_radius, float) and inner_radius >= 0.0
+        assert isinstance(outer_radius, float) and outer_radius >= inner_radius
+        assert isinstance(max_particles, int) and max_particles > 0
+
+        self.rate = rate
+        self.energy = energy
+        self.mass = mass
+        self.charge = charge
+        self.inner_radius = inner_radius
+        self.outer_radius = outer_radius
+        self.max_particles = max_particles
+        self.centre = np.zeros(3) if centre is None else centre
+        self.speed = np.sqrt(2.0 * energy * PhysicalConstants.electron_charge / mass)
+        self.rng = np.random.default_rng() if rng is None else rng
+
+        self.reset()
+
+    def reset(self):
+        """
+        Clear the particles carried over from previous steps
+        """
+        self.__remainder = 0.0
+        self.num_injected = 0
+
+    def get_num_injections(self, dt, num_free):
+        """
+        Get the number of particles to inject during a time step
+
+        :param dt: time step
+        :param num_free: number of free slots in the simulation
+        :return: number of particles to inject
+        """
+        self.__remainder += self.rate * dt
+        num_injections = int(self.__remainder)
+        self.__remainder -= num_injections
+
+        return min(num_injections, num_free)
+
+    def skip_to_next_injection(self):
+        """
+        Get the time until the next particle is injected, after which get_num_injections returns at least one particle
+
+        :return: time until the next injection
+        """
+        if self.rate == 0.0:
+            return np.inf
+
+        wait = (1.0 - self.__remainder) / self.rate
+        self.__remainder = 1.0
+        return wait
+
+    def sample(self, num_particles):
+        """
+        Sample the positions and velocities of new particles
+
+        :param num_particles: number of particles to sample
+        :return: positions, velocities, charges and masses of the particles
+        """
+        X = shell_positions(self.rng, num_particles, self.inner_radius, self.outer_radius, centre=self.centre)
+        V = mono_energetic_velocities(self.rng, num_particles, float(self.speed))
+        Q = np.ones(num_particles) * self.charge
+        M = np.ones(num_particles) * self.mass
+        self.num_injected += num_particles
+
+        return X, V, Q, M
+
+
+if __name__ == '__main__':
+    pass
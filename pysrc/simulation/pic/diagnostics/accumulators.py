@@ -0,0 +1,82 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains accumulators of time averaged particle distributions, which are updated after each step of a
+simulation.
+"""
+
+import numpy as np
+
+
+class DistributionAccumulator(object):
+    """
+    Accumulates histograms of the radial positions of particles, and of their radial, latitudinal and longitudinal
+    velocities in each radial bin. Each step is weighted by its time step, so that the distributions are averages over
+    time of the number of particles in each bin.
+    """
+    def __init__(self, radial_bins, velocity_bins, centre=None, start_time=0.0):
+        """
+        :param radial_bins: edges of the radial bins
+        :param velocity_bins: edges of the velocity bins
+        :param centre: centre of the radial coordinate system, defaults to the origin
+        :param start_time: time after which steps are accumulated, so that the initial transient can be excluded
+        """
+        assert isinstance(radial_bins, np.ndarray) and len(radial_bins.shape) == 1
+        assert isinstance(velocity_bins, np.ndarray) and len(velocity_bins.shape) == 1
+        assert isinstance(start_time, float)
+
+        self.radial_bins = radial_bins
+        self.velocity_bins = velocity_bins
+        self.centre = np.zeros(3) if centre is None else centre
+        self.start_time = start_time
+        self.reset()
+
+    def reset(self):
+        """
+        Clear the accumulated distributions
+        """
+        self.total_time = 0.0
+        self.__position_count = np.zeros(self.radial_bins.shape[0] - 1)
+        self.__velocity_count = np.zeros((3, self.radial_bins.shape[0] - 1, self.velocity_bins.shape[0] - 1))
+
+    def accumulate(self, t, dt, X, V):
+        """
+        Add the particles at the end of a step to the distributions
+
+        :param t: time at the end of the step
+        :param dt: time step
+        :param X: Nx3 array of positions
+        :param V: Nx3 array of velocities
+        """
+        if t <= self.start_time:
+            return
+        dt = min(dt, t - self.start_time)
+        self.total_time += dt
+
+        offset = X - self.centre
+        radial_position = np.sqrt(np.sum(offset ** 2, axis=1))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r_unit = offset / radial_position[:, np.newaxis]
+            latitude_unit = np.stack((offset[:, 1], -offset[:, 0], np.zeros(offset.shape[0])), axis=1)
+            latitude_unit /= np.sqrt(np.sum(latitude_unit ** 2, axis=1))[:, np.newaxis]
+        longitude_unit = np.cross(r_unit, latitude_unit)
+
+        weights = np.ones(X.shape[0]) * dt
+        self.__position_count += np.histogram(radial_position, bins=self.radial_bins, weights=weights)[0]
+        for i, unit in enumerate([r_unit, latitude_unit, longitude_unit]):
+            velocity = np.sum(V * unit, axis=1)
+            self.__velocity_count[i] += np.histogram2d(radial_position, velocity, weights=weights,
+                                                       bins=[self.radial_bins, self.velocity_bins])[0]
+
+    def get_distributions(self):
+        """
+        :return: time averaged number of particles in each radial bin, and in each radial and velocity bin for the
+                 radial, latitudinal and longitudinal velocities
+        """
+        assert self.total_time > 0.0, "No steps have been accumulated"
+        return self.__position_count / self.total_time, self.__velocity_count / self.total_time
+
+
+if __name__ == '__main__':
+    pass
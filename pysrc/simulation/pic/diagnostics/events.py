@@ -0,0 +1,199 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains event detectors that are evaluated for all particles after each step of a simulation. Only the
+state of the particles at each event is recorded, so that full trajectories do not need to be stored. The time,
+position and velocity at an event are linearly interpolated between the start and end of the step in which it occurs.
+"""
+
+import numpy as np
+
+
+class EventDetector(object):
+    """
+    Base class for event detectors. Subclasses implement get_crossings, which returns the particles that have an event
+    during a step, and the fraction of the step at which it occurs. Terminal events retire the particle from the
+    simulation.
+    """
+    def __init__(self, name, terminal=False, first_only=False):
+        """
+        :param name: name of the event in the output records
+        :param terminal: if True, particles are retired from the simulation when the event occurs
+        :param first_only: if True, only the first event of each particle is recorded
+        """
+        assert isinstance(name, str)
+        assert isinstance(terminal, bool)
+        assert isinstance(first_only, bool)
+
+        self.name = name
+        self.terminal = terminal
+        self.first_only = first_only
+        self.reset(0)
+
+    def reset(self, num_particles):
+        """
+        Clear any recorded events before a new simulation
+        """
+        self.has_occurred = np.zeros(num_particles, dtype=bool)
+        self.__indices = []
+        self.__times = []
+        self.__positions = []
+        self.__velocities = []
+
+    def extend(self, num_particles):
+        """
+        Extend the detector to particles added to the simulation
+        """
+        self.has_occurred = np.concatenate((self.has_occurred, np.zeros(num_particles, dtype=bool)))
+
+    def get_crossings(self, X_old, X_new):
+        """
+        Get the particles that have an event between X_old and X_new
+
+        :return: boolean array of particles with events, and the fraction of the step at which each event occurs
+        """
+        raise NotImplementedError
+
+    def detect(self, indices, t_old, t_new, X_old, X_new, V_old, V_new):
+        """
+        Record any events during a step
+
+        :param indices: indices of the particles in the simulation
+        :param t_old: time at the start of the step
+        :param t_new: time at the end of the step
+        :param X_old: positions at the start of the step
+        :param X_new: positions at the end of the step
+        :param V_old: velocities at the start of the step
+        :param V_new: velocities at the end of the step
+        :return: boolean array of the particles with events
+        """
+        crossed, fraction = self.get_crossings(X_old, X_new)
+        if self.first_only:
+            crossed = np.logical_and(crossed, np.logical_not(self.has_occurred[indices]))
+        if not np.any(crossed):
+            return crossed
+
+        fraction = fraction[crossed][:, np.newaxis]
+        self.__indices.append(indices[crossed])
+        self.__times.append(t_old + (t_new - t_old) * fraction[:, 0])
+        self.__positions.append(X_old[crossed] + fraction * (X_new[crossed] - X_old[crossed]))
+        self.__velocities.append(V_old[crossed] + fraction * (V_new[crossed] - V_old[crossed]))
+        self.has_occurred[indices[crossed]] = True
+
+        return crossed
+
+    def get_records(self):
+        """
+        Get the recorded events, ordered by the time at which they occurred
+
+        :return: dictionary of particle indices, times, positions and velocities
+        """
+        if len(self.__indices) == 0:
+            return {"index": np.zeros(0, dtype=int), "time": np.zeros(0),
+                    "position": np.zeros((0, 3)), "velocity": np.zeros((0, 3))}
+
+        times = np.concatenate(self.__times)
+        order = np.argsort(times, kind="stable")
+        return {"index": np.concatenate(self.__indices)[order], "time": times[order],
+                "position": np.concatenate(self.__positions)[order],
+                "velocity": np.concatenate(self.__velocities)[order]}
+
+
+class PlaneCrossing(EventDetector):
+    """
+    Records crossings of a plane, for Poincare sections
+    """
+    def __init__(self, point, normal, direction=0, name="plane_crossing", terminal=False, first_only=False):
+        """
+        :param point: a point on the plane
+        :param normal: normal to the plane
+        :param direction: 1 to only record crossings along the normal, -1 against it, and 0 for both
+        """
+        assert isinstance(point, np.ndarray) and point.shape == (3,)
+        assert isinstance(normal, np.ndarray) and normal.shape == (3,)
+        assert direction in [-1, 0, 1]
+        super(PlaneCrossing, self).__init__(name, terminal, first_only)
+
+        self.point = point
+        self.normal = normal / np.sqrt(np.sum(normal ** 2))
+        self.direction = direction
+
+    def get_crossings(self, X_old, X_new):
+        distance_old = np.dot(X_old - self.point, self.normal)
+        distance_new = np.dot(X_new - self.point, self.normal)
+
+        forward = np.logical_and(distance_old < 0.0, distance_new >= 0.0)
+        backward = np.logical_and(distance_old >= 0.0, distance_new < 0.0)
+        if self.direction == 1:
+            crossed = forward
+        elif self.direction == -1:
+            crossed = backward
+        else:
+            crossed = np.logical_or(forward, backward)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fraction = distance_old / (distance_old - distance_new)
+
+        return crossed, fraction
+
+
+class RadiusThreshold(EventDetector):
+    """
+    Records passages through a sphere. The crossing is interpolated linearly in radius.
+    """
+    def __init__(self, radius, centre=None, outward=True, name="radius_threshold", terminal=False, first_only=True):
+        """
+        :param radius: radius of the sphere
+        :param centre: centre of the sphere, defaults to the origin
+        :param outward: if True, record outward passages, otherwise inward passages
+        """
+        assert isinstance(radius, float)
+        assert isinstance(outward, bool)
+        super(RadiusThreshold, self).__init__(name, terminal, first_only)
+
+        self.radius = radius
+        self.centre = np.zeros(3) if centre is None else centre
+        self.outward = outward
+
+    def get_crossings(self, X_old, X_new):
+        r_old = np.sqrt(np.sum((X_old - self.centre) ** 2, axis=1))
+        r_new = np.sqrt(np.sum((X_new - self.centre) ** 2, axis=1))
+
+        if self.outward:
+            crossed = np.logical_and(r_old < self.radius, r_new >= self.radius)
+        else:
+            crossed = np.logical_and(r_old >= self.radius, r_new < self.radius)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fraction = (self.radius - r_old) / (r_new - r_old)
+
+        return crossed, fraction
+
+
+class WallHit(EventDetector):
+    """
+    Records particles leaving a cubic domain between (-domain_size, domain_size) in each dimension. The event is at the
+    first point at which the step crosses a wall.
+    """
+    def __init__(self, domain_size, name="wall_hit", terminal=True):
+        assert isinstance(domain_size, float)
+        super(WallHit, self).__init__(name, terminal, True)
+
+        self.domain_size = domain_size
+
+    def get_crossings(self, X_old, X_new):
+        outside = np.abs(X_new) > self.domain_size
+        crossed = np.any(outside, axis=1)
+
+        # Get fraction of the step at which each wall is crossed
+        with np.errstate(divide='ignore', invalid='ignore'):
+            wall_fraction = (np.sign(X_new) * self.domain_size - X_old) / (X_new - X_old)
+        wall_fraction[np.logical_not(outside)] = np.inf
+        fraction = np.clip(np.min(wall_fraction, axis=1), 0.0, 1.0)
+
+        return crossed, fraction
+
+
+if __name__ == '__main__':
+    pass
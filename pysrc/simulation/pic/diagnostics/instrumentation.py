@@ -0,0 +1,143 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains lightweight instrumentation of the stages of simulation loops, so that the time spent on field
+evaluation, pushing, event detection and output in production runs can be measured.
+"""
+
+import json
+import time
+
+
+def _no_op(*args, **kwargs):
+    pass
+
+
+class Instrumentation(object):
+    """
+    Cumulative timers and call counters for the stages of a simulation loop. Each step is started with start_step,
+    after which each call to lap attributes the time since the previous lap to a stage. The step is ended with
+    end_step, which counts the particles pushed for the particles per second gauge.
+
+    When disabled, the timing functions are replaced with an empty function, so that instrumented loops have no overhead
+    beyond the function calls.
+    """
+    def __init__(self, enabled=True, json_file=None, json_interval=10.0):
+        """
+        :param enabled: if False, nothing is recorded
+        :param json_file: file to which a JSON line summarising the run so far is appended periodically
+        :param json_interval: wall clock time in seconds between JSON lines
+        """
+        assert isinstance(enabled, bool)
+        assert json_file is None or isinstance(json_file, str)
+        assert isinstance(json_interval, float) and json_interval > 0.0
+
+        self.enabled = enabled
+        self.json_file = json_file
+        self.json_interval = json_interval
+        self.reset()
+
+        if not enabled:
+            self.start_step = _no_op
+            self.lap = _no_op
+            self.end_step = _no_op
+
+    def reset(self):
+        """
+        Clear all timers and counters
+        """
+        self.stage_times = dict()
+        self.stage_calls = dict()
+        self.num_steps = 0
+        self.particle_steps = 0
+        self.step_time = 0.0
+        self.__creation_time = time.perf_counter()
+        self.__last_lap = self.__creation_time
+        self.__step_start = self.__creation_time
+        self.__last_write = self.__creation_time
+
+    def start_step(self):
+        """
+        Start timing a step
+        """
+        self.__step_start = time.perf_counter()
+        self.__last_lap = self.__step_start
+
+    def lap(self, stage):
+        """
+        Attribute the time since the start of the step or the previous lap to a stage
+
+        :param stage: name of the stage
+        """
+        now = time.perf_counter()
+        self.stage_times[stage] = self.stage_times.get(stage, 0.0) + now - self.__last_lap
+        self.stage_calls[stage] = self.stage_calls.get(stage, 0) + 1
+        self.__last_lap = now
+
+    def end_step(self, num_particles):
+        """
+        End timing a step
+
+        :param num_particles: number of particles pushed in the step
+        """
+        now = time.perf_counter()
+        self.step_time += now - self.__step_start
+        self.num_steps += 1
+        self.particle_steps += num_particles
+        self.__last_lap = now
+
+        if self.json_file is not None and now - self.__last_write >= self.json_interval:
+            self.write_json()
+            self.__last_write = now
+
+    @property
+    def particles_per_second(self):
+        """
+        :return: number of particle steps per second of time spent in steps
+        """
+        return self.particle_steps / self.step_time if self.step_time > 0.0 else 0.0
+
+    def get_summary(self):
+        """
+        :return: dictionary of the cumulative time and number of calls of each stage, and the step counters
+        """
+        return {
+            "wall_time": time.perf_counter() - self.__creation_time,
+            "step_time": self.step_time,
+            "num_steps": self.num_steps,
+            "particle_steps": self.particle_steps,
+            "particles_per_second": self.particles_per_second,
+            "stage_times": dict(self.stage_times),
+            "stage_calls": dict(self.stage_calls)
+        }
+
+    def write_json(self):
+        """
+        Append the summary of the run so far to the JSON lines file
+        """
+        assert self.json_file is not None
+        with open(self.json_file, "a") as f:
+            f.write(json.dumps(self.get_summary()) + "\n")
+
+    def report(self):
+        """
+        Print the summary of the run, with the fraction of the instrumented time spent in each stage
+        """
+        if not self.enabled:
+            return
+
+        print("{} steps of {} particles in {:.3f}s, {:.4e} particles per second".format(
+            self.num_steps, self.particle_steps, self.step_time, self.particles_per_second))
+        total_time = sum(self.stage_times.values())
+        for stage in sorted(self.stage_times, key=self.stage_times.get, reverse=True):
+            fraction = self.stage_times[stage] / total_time if total_time > 0.0 else 0.0
+            print("    {:<20}{:>10.4f}s{:>8.1%}{:>12} calls".format(
+                stage, self.stage_times[stage], fraction, self.stage_calls[stage]))
+
+        if self.json_file is not None:
+            self.write_json()
+
+
+if __name__ == '__main__':
+    pass
@@ -33,8 +33,49 @@ def write_vti_file(output_array, main_name):
     writer.Write()
 
 
+def write_vtp_polylines(polylines, main_name, line_data=None):
+    """
+    Write a vtp file of polylines, such as traced field lines
+
+    polylines: list of Mx3 arrays of points along each line
+    line_data: optional dictionary of arrays with a value for each line, such as the line length
+    """
+    output_file_name = "{}.vtp".format(main_name)
+
+    points = vtk.vtkPoints()
+    lines = vtk.vtkCellArray()
+    for polyline in polylines:
+        assert len(polyline.shape) == 2 and polyline.shape[1] == 3
+
+        line = vtk.vtkPolyLine()
+        line.GetPointIds().SetNumberOfIds(polyline.shape[0])
+        for i, point in enumerate(polyline):
+            point_id = points.InsertNextPoint(point[0], point[1], point[2])
+            line.GetPointIds().SetId(i, point_id)
+        lines.InsertNextCell(line)
+
+    polyData = vtk.vtkPolyData()
+    polyData.SetPoints(points)
+    polyData.SetLines(lines)
+
+    if line_data is not None:
+        for name, values in line_data.items():
+            assert len(values) == len(polylines)
+
+            data_array = vtk.vtkDoubleArray()
+            data_array.SetName(name)
+            for value in values:
+                data_array.InsertNextValue(value)
+            polyData.GetCellData().AddArray(data_array)
+
+    writer = vtk.vtkXMLPolyDataWriter()
+    writer.SetFileName(output_file_name)
+    writer.SetInputData(polyData)
+    writer.Write()
+
+
 if __name__ == '__main__':
-    output = np.random.random((10, 11, 12))
+    output = np.random.default_rng(1).random((10, 11, 12))
     file_name = "test_output"
 
     write_vti_file(output, file_name)
@@ -10,11 +10,15 @@ import os
 from matplotlib import pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D 
 
+from plasma_physics.pysrc.simulation.pic.algo.fields.electric_fields.spherical_e_field import SphericalEField
 from plasma_physics.pysrc.simulation.pic.algo.fields.magnetic_fields.generic_b_fields import *
 from plasma_physics.pysrc.simulation.pic.algo.geometry.vector_ops import *
 from plasma_physics.pysrc.simulation.pic.algo.particle_pusher.boris_solver import *
+from plasma_physics.pysrc.simulation.pic.algo.sampling.particle_samplers import isotropic_directions, \
+    maxwellian_velocities
 from plasma_physics.pysrc.simulation.pic.data.particles.charged_particle import PICParticle
-from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.abe_collison_model import AbeCoulombCollisionModel
+from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.cell_collisions import CellCollisions, \
+    RadialCellGrid
 
 from plasma_physics.pysrc.theory.coulomb_collisions.coulomb_collision import ChargedParticle, CoulombCollision
 from plasma_physics.pysrc.theory.coulomb_collisions.relaxation_processes import RelaxationProcess
@@ -22,11 +26,12 @@ from plasma_physics.pysrc.theory.coulomb_collisions.relaxation_processes import
 from plasma_physics.pysrc.utils.physical_constants  import PhysicalConstants
 
 
-def run_1d_electrostatic_well(radius, num_particles=int(1e4)):
+def run_1d_electrostatic_well(radius, num_particles=int(1e4), self_consistent=False):
     """
     Function to run simulation - for this simulation, in a spherically symmetric potential well
 
     radius: size of potential well
+    self_consistent: if True, the space charge of the ions is added to the fixed electron cloud field
     """
     # Define particles
     number_density = 1e12
@@ -37,19 +42,20 @@ def run_1d_electrostatic_well(radius, num_particles=int(1e4)):
 
     # Define fields
     electron_charge_density = 1e20 * PhysicalConstants.electron_charge
+    if self_consistent:
+        space_charge_field = SphericalEField(background_enclosed_charge=SphericalEField.uniform_background(
+            -electron_charge_density, float(radius)))
+
     def e_field(x):
-        E_field = np.zeros(x.shape)
-        for i in range(x.shape[0]):
-            r = magnitude(x[i])
-            if r <= radius:
-                e_field = electron_charge_density * r / (3.0 * PhysicalConstants.epsilon_0) 
-            else:
-                e_field = electron_charge_density * radius ** 3 / (3.0 * PhysicalConstants.epsilon_0 * r ** 2)
-
-            e_field *= -normalise(x[i])
-            E_field[i, :] = e_field
-        
-        return E_field
+        if self_consistent:
+            space_charge_field.update(x, np.ones(x.shape[0]) * pic_particle.charge)
+            return space_charge_field.e_field(x)
+
+        r = batch_magnitude(x)
+        e_field = np.where(r <= radius, electron_charge_density * r / (3.0 * PhysicalConstants.epsilon_0),
+                           electron_charge_density * radius ** 3 / (3.0 * PhysicalConstants.epsilon_0 * r ** 2))
+
+        return -e_field[:, np.newaxis] * batch_normalise(x)
 
     # Define time step and final time
     total_V = radius ** 3 * electron_charge_density
@@ -77,18 +83,16 @@ def run_1d_electrostatic_well(radius, num_particles=int(1e4)):
     print("Kinetic Loss Time: {}".format(1.0 / v_K))
     print("Simulation Time Step: {}".format(dt))
     assert dt < 0.01 * 1.0 / v_K
-    collision_model = AbeCoulombCollisionModel(num_particles, collision_particle, weight, coulomb_logarithm=coulomb_logarithm)
+    # Ions only collide with ions in the same radial shell
+    shell_edges = np.linspace(0.0, 1.1 * radius, 12)
+    collision_model = CellCollisions(RadialCellGrid(shell_edges), [collision_particle], [weight], model="Abe",
+                                     coulomb_logarithm=coulomb_logarithm, rng=2)
+    species = np.zeros(num_particles, dtype=int)
 
     # Set up initial conditions
-    np.random.seed(1)
-    X = np.zeros((num_particles, 3))
-    for i in range(num_particles):
-        x_theta = np.random.uniform(0.0, 2 * np.pi)
-        y_theta = np.random.uniform(0.0, 2 * np.pi)
-        z_theta = np.random.uniform(0.0, 2 * np.pi)
-
-        X[i, :] = rotate_3d(np.asarray([1.0, 0.0, 0.0]), np.asarray([x_theta, y_theta, z_theta]))
-    V = np.random.normal(0.0, thermal_velocity, size=X.shape)
+    rng = np.random.default_rng(1)
+    X = isotropic_directions(rng, num_particles)
+    V = maxwellian_velocities(rng, num_particles, thermal_velocity)
     V = np.zeros(X.shape)
     
     # Run simulation
@@ -109,7 +113,7 @@ def run_1d_electrostatic_well(radius, num_particles=int(1e4)):
         v = V + E * pic_particle.charge / pic_particle.mass * dt
 
         # Update velocity due to collisions
-        new_v = collision_model.single_time_step(v, dt)
+        new_v = collision_model.single_time_step(x, v, species, dt)
 
         positions[i, :, :] = x
         velocities[i, :, :] = new_v
@@ -10,7 +10,8 @@ import numpy as np
 from matplotlib import pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 
-from plasma_physics.pysrc.simulation.pic.algo.geometry.vector_ops import dot, magnitude, vector_projection, cross, arbitrary_axis_rotation_3d
+from plasma_physics.pysrc.simulation.pic.algo.geometry.vector_ops import dot, magnitude, vector_projection, cross, \
+    batch_arbitrary_axis_rotation_3d
 from plasma_physics.pysrc.simulation.pic.data.particles.charged_particle import PICParticle
 
 
@@ -30,16 +31,14 @@ def solve_B_field(particle, B, final_time, num_pts=1000):
     relative_position = particle.position[0] - centre_of_rotation
 
     def parallel_motion(t):
-        return v_parallel * t
+        return v_parallel * t[:, np.newaxis]
 
     def perpendicular_motion(t):
         angle = -omega * t
-        return arbitrary_axis_rotation_3d(relative_position, B, angle)
+        return batch_arbitrary_axis_rotation_3d(relative_position, B, angle)
 
     times = np.linspace(0.0, final_time, num_pts)
-    positions = np.zeros((num_pts, 3))
-    for i, t in enumerate(times):
-        positions[i, :] = centre_of_rotation + parallel_motion(t) + perpendicular_motion(t)
+    positions = centre_of_rotation + parallel_motion(times) + perpendicular_motion(times)
 
     return times, positions
 
@@ -52,12 +51,10 @@ def solve_E_field(particle, E, final_time, num_pts=1000):
     F = E * particle.charge
 
     def E_field_motion(t):
-        return 0.5 * F / particle.mass * t ** 2
+        return 0.5 * F / particle.mass * t[:, np.newaxis] ** 2
 
     times = np.linspace(0.0, final_time, num_pts)
-    positions = np.zeros((num_pts, 3))
-    for i, t in enumerate(times):
-        positions[i, :] = particle.position + particle.velocity * t + E_field_motion(t)
+    positions = particle.position + particle.velocity * times[:, np.newaxis] + E_field_motion(times)
 
     return times, positions
 
@@ -81,19 +78,35 @@ def solve_aligned_fields(particle, E, B, final_time, num_pts=1000):
     F_ele = E * particle.charge
 
     def E_field_motion(t):
-        return 0.5 * F_ele / particle.mass * t ** 2
+        return 0.5 * F_ele / particle.mass * t[:, np.newaxis] ** 2
 
     def parallel_motion(t):
-        return v_parallel * t + E_field_motion(t)
+        return v_parallel * t[:, np.newaxis] + E_field_motion(t)
 
     def perpendicular_motion(t):
         angle = -omega * t
-        return arbitrary_axis_rotation_3d(relative_position, B, angle)
+        return batch_arbitrary_axis_rotation_3d(relative_position, B, angle)
 
     times = np.linspace(0.0, final_time, num_pts)
-    positions = np.zeros((num_pts, 3))
-    for i, t in enumerate(times):
-        positions[i, :] = centre_of_rotation + parallel_motion(t) + perpendicular_motion(t)
+    positions = centre_of_rotation + parallel_motion(times) + perpendicular_motion(times)
+
+    return times, positions
+
+
+def solve_crossed_fields(particle, E, B, final_time, num_pts=1000):
+    """
+    Solve for the motion in uniform E and B fields in arbitrary directions. In the frame moving with the E x B drift,
+    only the component of E parallel to B remains, so the motion is that of aligned fields plus the drift
+    """
+    assert isinstance(B, np.ndarray) and B.shape[0] == 3 and len(B.shape) == 1, "B must be a 3D vector"
+    assert isinstance(E, np.ndarray) and E.shape[0] == 3 and len(E.shape) == 1, "E must be a 3D vector"
+    v_drift = cross(E, B) / dot(B, B)
+    E_parallel = vector_projection(E, B)
+
+    drift_frame_particle = PICParticle(particle.mass, particle.charge, particle.position[0],
+                                       particle.velocity[0] - v_drift)
+    times, positions = solve_aligned_fields(drift_frame_particle, E_parallel, B, final_time, num_pts=num_pts)
+    positions += v_drift * times[:, np.newaxis]
 
     return times, positions
 
@@ -10,8 +10,11 @@ from matplotlib import pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 
 from plasma_physics.pysrc.simulation.pic.algo.fields.electric_fields.generic_e_fields import PointField
-from plasma_physics.pysrc.simulation.pic.algo.particle_pusher.boris_solver import boris_solver
+from plasma_physics.pysrc.simulation.pic.algo.fields.electric_fields.tree_code import BarnesHutField
+from plasma_physics.pysrc.simulation.pic.algo.particle_pusher.boris_solver import boris_solver, boris_solver_internal
+from plasma_physics.pysrc.simulation.pic.algo.sampling.particle_samplers import ball_positions
 from plasma_physics.pysrc.simulation.pic.data.particles.charged_particle import PICParticle
+from plasma_physics.pysrc.utils.physical_constants import PhysicalConstants
 
 
 def E_field_example():
@@ -64,6 +67,47 @@ def E_field_example():
     plt.show()
 
 
+def coulomb_explosion_example(num_particles=10000, opening_angle=0.5):
+    """
+    Example of the Coulomb explosion of a cold uniform sphere of protons, using the mutual fields of the particles from
+    a Barnes-Hut tree. The outermost shell is accelerated by the total charge of the sphere, so its radius can be
+    compared with the analytic solution for a point charge.
+
+    :param num_particles: number of macro particles
+    :param opening_angle: opening angle of the tree code
+    """
+    radius = 0.1
+    total_charge = 1e-12
+    charge_to_mass = 1.6e-19 / 1.6e-27
+    X = ball_positions(np.random.default_rng(1), num_particles, radius)
+    V = np.zeros(X.shape)
+    Q = np.ones((num_particles, 1)) * total_charge / num_particles
+    M = Q / charge_to_mass
+    field = BarnesHutField(opening_angle=opening_angle)
+
+    k = charge_to_mass * total_charge / (4.0 * np.pi * PhysicalConstants.epsilon_0 * radius ** 3)
+    times = np.linspace(0.0, 5.0 / np.sqrt(k), 200)
+    outer_radius = np.zeros(times.shape)
+    outer_radius[0] = np.max(np.sqrt(np.sum(X ** 2, axis=1)))
+    for i in range(1, times.shape[0]):
+        field.update(X, Q[:, 0])
+        X, V = boris_solver_internal(field.e_field(X), np.zeros(X.shape), X, V, Q, M, times[i] - times[i - 1])
+        outer_radius[i] = np.max(np.sqrt(np.sum(X ** 2, axis=1)))
+
+    # Time taken for the outer shell to reach each radius, from conservation of energy
+    x = np.linspace(1.0, np.max(outer_radius) / radius, 200)
+    analytic_times = (np.sqrt(x * (x - 1.0)) + np.log(np.sqrt(x) + np.sqrt(x - 1.0))) / np.sqrt(2.0 * k)
+
+    plt.figure()
+    plt.plot(times * np.sqrt(k), outer_radius / radius, label="Barnes-Hut")
+    plt.plot(analytic_times * np.sqrt(k), x, linestyle="--", label="Analytic")
+    plt.xlabel("Normalised time")
+    plt.ylabel("Outer radius / initial radius")
+    plt.legend()
+    plt.title("Coulomb explosion of a uniform sphere")
+    plt.show()
+
+
 if __name__ == '__main__':
     E_field_example()
 
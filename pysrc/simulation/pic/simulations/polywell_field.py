@@ -92,11 +92,12 @@ def B_field_example_single(particle, vel):
 
 
 if __name__ == '__main__':
+    seed = 12
+    rng = np.random.default_rng(seed)
     for i in range(10):
         # Define fields and charge particle
-        seed = 12
         max_vel = 1e6
-        vel = np.random.uniform(low=-1.0, high=1.0, size=(3, )) * max_vel
+        vel = rng.uniform(low=-1.0, high=1.0, size=(3, )) * max_vel
 
         # particle = ChargedParticle(6.64e-27, 3.2e-19, np.asarray([0.0, 0.0, 0.0]), vel)
         # particle = ChargedParticle(3.32e-27, 1.6e-19, np.asarray([0.0, 0.0, 0.0]), vel)
@@ -94,10 +94,10 @@ def B_field_example_multi(particle_type, vel):
 
 
 def run_param_scan():
-    np.random.seed(seed)
+    rng = np.random.default_rng(seed)
 
     max_vel = 1e6
-    vel = np.random.uniform(low=-1.0, high=1.0, size=(3, num_sims)) * max_vel
+    vel = rng.uniform(low=-1.0, high=1.0, size=(3, num_sims)) * max_vel
 
     pool = mp.Pool(processes=2)
     results = [pool.apply(B_field_example_multi, args=(particle_type, vel[:, i], )) for i in range(num_sims)]
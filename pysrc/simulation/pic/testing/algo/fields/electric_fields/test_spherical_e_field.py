@@ -0,0 +1,70 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+Tests for the self consistent spherical electric field solver
+"""
+
+import unittest
+import numpy as np
+
+from plasma_physics.pysrc.simulation.pic.algo.fields.electric_fields.spherical_e_field import SphericalEField
+from plasma_physics.pysrc.utils.physical_constants import PhysicalConstants
+
+
+class SphericalEFieldTest(unittest.TestCase):
+    def test_direct_summation(self):
+        """
+        Function to check the field at points outside all particles matches direct summation over spherical shells.
+        Each particle is replaced by a uniformly charged shell of the same radius, which is the charge distribution
+        the solver assumes.
+        """
+        rng = np.random.default_rng(1)
+        X = rng.normal(size=(1000, 3))
+        Q = rng.uniform(-1.0, 2.0, 1000)
+        field = SphericalEField()
+        field.update(X, Q)
+
+        points = rng.normal(size=(100, 3))
+        E = field.e_field(points)
+        r_points = np.sqrt(np.sum(points ** 2, axis=1))
+        r_particles = np.sqrt(np.sum(X ** 2, axis=1))
+        for point, r, e in zip(points, r_points, E):
+            enclosed = np.sum(Q[r_particles < r])
+            expected = enclosed / (4.0 * np.pi * PhysicalConstants.epsilon_0 * r ** 3) * point
+            self.assertTrue(np.allclose(e, expected))
+
+    def test_self_force_excluded(self):
+        X = np.asarray([[1.0, 0.0, 0.0], [0.0, 2.0, 0.0], [0.0, 0.0, -3.0]])
+        field = SphericalEField(centre=np.zeros(3))
+        field.update(X, np.ones(3))
+        E = field.e_field(X)
+        k = 1.0 / (4.0 * np.pi * PhysicalConstants.epsilon_0)
+
+        self.assertTrue(np.allclose(E[0], 0.0))
+        self.assertTrue(np.allclose(E[1], [0.0, k / 4.0, 0.0]))
+        self.assertTrue(np.allclose(E[2], [0.0, 0.0, -2.0 * k / 9.0]))
+        self.assertTrue(np.allclose(field.e_field(np.zeros((1, 3))), 0.0))
+
+    def test_uniform_background(self):
+        """
+        Function to check a uniform background matches the field of a uniformly charged sphere
+        """
+        rho = 1e-9
+        radius = 2.0
+        centre = np.asarray([1.0, 0.0, -1.0])
+        field = SphericalEField(centre=centre, background_enclosed_charge=SphericalEField.uniform_background(rho, radius))
+        field.update(np.zeros((0, 3)), np.zeros(0))
+
+        rng = np.random.default_rng(1)
+        offsets = rng.uniform(-5.0, 5.0, (100, 3))
+        E = field.e_field(centre + offsets)
+        r = np.sqrt(np.sum(offsets ** 2, axis=1))
+        total_charge = rho * 4.0 / 3.0 * np.pi * radius ** 3
+        e_radial = np.where(r < radius, rho * r / (3.0 * PhysicalConstants.epsilon_0),
+                            total_charge / (4.0 * np.pi * PhysicalConstants.epsilon_0 * r ** 2))
+        self.assertTrue(np.allclose(E, e_radial[:, np.newaxis] * offsets / r[:, np.newaxis]))
+
+
+if __name__ == '__main__':
+    unittest.main()
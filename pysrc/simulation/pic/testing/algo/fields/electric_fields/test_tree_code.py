@@ -0,0 +1,102 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+Tests for the Barnes-Hut tree code
+"""
+
+import unittest
+import numpy as np
+
+from plasma_physics.pysrc.simulation.pic.algo.fields.electric_fields.tree_code import BarnesHutField, \
+    direct_sum_e_field
+from plasma_physics.pysrc.simulation.pic.algo.particle_pusher.boris_solver import boris_solver_internal
+from plasma_physics.pysrc.utils.physical_constants import PhysicalConstants
+
+
+class BarnesHutFieldTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(1)
+        cls.X = rng.normal(size=(2000, 3))
+        cls.Q = rng.uniform(-1.0, 2.0, 2000)
+        cls.E_direct = direct_sum_e_field(cls.X, cls.Q, cls.X)
+
+    def test_direct_sum(self):
+        X = np.asarray([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 2.0, 0.0]])
+        E = direct_sum_e_field(X, np.asarray([1.0, 2.0, -1.0]), X)
+        k = 1.0 / (4.0 * np.pi * PhysicalConstants.epsilon_0)
+
+        self.assertTrue(np.allclose(E[0], k * np.asarray([-2.0, 0.25, 0.0])))
+        separation = np.asarray([1.0, -2.0, 0.0])
+        expected = k * (np.asarray([1.0, 0.0, 0.0]) - separation / np.sqrt(5.0) ** 3)
+        self.assertTrue(np.allclose(E[1], expected))
+
+    def test_zero_opening_angle(self):
+        field = BarnesHutField(opening_angle=0.0)
+        field.update(self.X, self.Q)
+        self.assertTrue(np.allclose(field.e_field(self.X), self.E_direct, rtol=1e-10, atol=0.0))
+
+    def test_opening_angle_accuracy(self):
+        """
+        Function to check the error of the tree code decreases with the opening angle
+        """
+        errors = []
+        for opening_angle in [0.8, 0.5, 0.3]:
+            field = BarnesHutField(opening_angle=opening_angle)
+            field.update(self.X, self.Q)
+            E = field.e_field(self.X)
+            errors.append(np.max(np.sqrt(np.sum((E - self.E_direct) ** 2, axis=1))) /
+                          np.max(np.sqrt(np.sum(self.E_direct ** 2, axis=1))))
+
+        self.assertLess(errors[0], 1e-2)
+        self.assertLess(errors[1], 1e-3)
+        self.assertTrue(errors[0] > errors[1] > errors[2])
+
+    def test_direct_mode(self):
+        field = BarnesHutField(direct=True)
+        field.update(self.X, self.Q)
+        self.assertTrue(np.allclose(field.e_field(self.X[:100]), self.E_direct[:100]))
+
+    def test_field_points(self):
+        """
+        Function to check the field at points away from the particles, including outside the tree
+        """
+        rng = np.random.default_rng(2)
+        points = rng.normal(scale=3.0, size=(500, 3))
+        field = BarnesHutField(opening_angle=0.3, softening=1e-3)
+        field.update(self.X, self.Q)
+        E_direct = direct_sum_e_field(self.X, self.Q, points, softening=1e-3)
+        E = field.e_field(points)
+        error = np.sqrt(np.sum((E - E_direct) ** 2, axis=1)) / np.sqrt(np.sum(E_direct ** 2, axis=1))
+
+        self.assertLess(np.median(error), 1e-3)
+
+    def test_coincident_particles(self):
+        X = np.concatenate((np.zeros((40, 3)), np.ones((1, 3))))
+        Q = np.ones(41)
+        field = BarnesHutField(leaf_size=4)
+        field.update(X, Q)
+        E = field.e_field(X)
+
+        self.assertTrue(np.allclose(E, direct_sum_e_field(X, Q, X)))
+        self.assertTrue(np.allclose(E[-1], 40.0 / (4.0 * np.pi * PhysicalConstants.epsilon_0 * np.sqrt(3.0) ** 3)))
+
+    def test_pusher_step(self):
+        """
+        Function to check the field can be passed to the boris solver, and that two equal charges move apart
+        """
+        X = np.asarray([[-1.0, 0.0, 0.0], [1.0, 0.0, 0.0]])
+        V = np.zeros(X.shape)
+        Q = np.ones((2, 1)) * 1e-10
+        M = np.ones((2, 1))
+        field = BarnesHutField()
+        field.update(X, Q[:, 0])
+        X_new, V_new = boris_solver_internal(field.e_field(X), np.zeros(X.shape), X, V, Q, M, 1.0)
+
+        self.assertLess(V_new[0, 0], 0.0)
+        self.assertTrue(np.allclose(V_new[0], -V_new[1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains testing for the field line tracer
+"""
+
+import unittest
+import numpy as np
+from scipy.special import ellipk, ellipe
+
+from plasma_physics.pysrc.simulation.pic.algo.fields.magnetic_fields.generic_b_fields import CurrentLoop
+from plasma_physics.pysrc.simulation.pic.algo.fields.magnetic_fields.field_line_tracer import FieldLineTracer
+
+
+class UniformField(object):
+    def b_field(self, field_point):
+        return np.tile(np.asarray([0.0, 0.0, 2.0]), (field_point.shape[0], 1))
+
+
+class FieldLineTracerTest(unittest.TestCase):
+    def test_uniform_field(self):
+        """
+        Function to check field lines in a uniform field are straight lines to the domain boundary
+        """
+        np.random.seed(1)
+        seeds = np.random.uniform(-0.9, 0.9, (100, 3))
+        tracer = FieldLineTracer(UniformField(), 1.0)
+
+        for direction in [1.0, -1.0]:
+            polylines, reasons, lengths = tracer.trace(seeds, direction)
+
+            self.assertTrue(np.all(reasons == "domain"))
+            self.assertTrue(np.allclose(lengths, 1.0 - direction * seeds[:, 2]))
+            for seed, polyline in zip(seeds, polylines):
+                self.assertTrue(np.allclose(polyline[0], seed))
+                self.assertTrue(np.allclose(polyline[-1], np.asarray([seed[0], seed[1], direction])))
+                self.assertTrue(np.all(direction * np.diff(polyline[:, 2]) > 0.0))
+
+    def test_loop_flux_surfaces(self):
+        """
+        Function to check field lines of a current loop stay on surfaces of constant poloidal flux, and that lines
+        closing around the windings within the domain are stopped at the maximum length
+        """
+        radius = 0.5
+        loop = CurrentLoop(1e4, radius, np.zeros(3), np.asarray([0.0, 0.0, 1.0]), 64, quadrature="gauss_legendre")
+        tracer = FieldLineTracer(loop, 1.0, coils=[loop], winding_radius=0.05, tolerance=1e-8, max_length=5.0)
+        seeds = np.stack((np.linspace(0.1, 0.4, 10), np.zeros(10), np.zeros(10)), axis=1)
+        polylines, reasons, lengths = tracer.trace(seeds)
+
+        def flux_function(points):
+            rho = np.sqrt(points[:, 0] ** 2 + points[:, 1] ** 2)
+            z = points[:, 2]
+            m = 4 * radius * rho / ((radius + rho) ** 2 + z ** 2)
+            A_phi = np.sqrt(radius / rho) / (np.pi * np.sqrt(m)) * ((1 - m / 2) * ellipk(m) - ellipe(m))
+            return rho * A_phi
+
+        for polyline in polylines:
+            flux = flux_function(polyline)
+            self.assertLess(np.max(np.abs(flux - flux[0])), 1e-5 * np.abs(flux[0]))
+
+        self.assertTrue(np.all(reasons[:-2] == "domain"))
+        self.assertTrue(np.all(reasons[-2:] == "max_length"))
+        self.assertTrue(np.allclose(lengths[-2:], 5.0))
+
+    def test_coil_surface(self):
+        """
+        Function to check lines stop at the coil surface
+        """
+        loop = CurrentLoop(1e4, 0.5, np.zeros(3), np.asarray([0.0, 0.0, 1.0]), 64, quadrature="gauss_legendre")
+        tracer = FieldLineTracer(loop, 1.0, coils=[loop], winding_radius=0.1, tolerance=1e-6)
+        seeds = np.asarray([[0.0, 0.65, 0.0], [0.5, 0.0, 0.05]])
+        polylines, reasons, lengths = tracer.trace(seeds)
+
+        self.assertTrue(np.all(reasons == "coil"))
+        self.assertGreater(lengths[0], 0.0)
+        self.assertEqual(lengths[1], 0.0)
+        end_points = np.asarray([polyline[-1] for polyline in polylines])
+        self.assertTrue(np.all(tracer.coil_distance(end_points) < 0.1))
+        self.assertGreater(tracer.coil_distance(end_points[:1])[0], 0.1 - np.sqrt(1e-6))
+
+    def test_max_length(self):
+        tracer = FieldLineTracer(UniformField(), 1.0, max_length=0.25)
+        polylines, reasons, lengths = tracer.trace(np.zeros((3, 3)))
+
+        self.assertTrue(np.all(reasons == "max_length"))
+        self.assertTrue(np.allclose(lengths, 0.25))
+        self.assertTrue(np.allclose(polylines[0][-1], np.asarray([0.0, 0.0, 0.25])))
+
+    def test_connection_lengths(self):
+        tracer = FieldLineTracer(UniformField(), 1.0)
+        seeds = np.asarray([[0.0, 0.0, 0.0], [0.5, -0.5, 0.5]])
+        connection_lengths, forward_reasons, backward_reasons = tracer.connection_lengths(seeds)
+
+        self.assertTrue(np.allclose(connection_lengths, 2.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,6 +8,7 @@ This file contains testing for analytic B field generators
 import os
 import unittest
 import numpy as np
+from scipy.special import ellipk, ellipe
 
 from plasma_physics.pysrc.simulation.pic.algo.fields.magnetic_fields.generic_b_fields import CurrentLoop, InterpolatedBField
 from plasma_physics.pysrc.simulation.pic.algo.geometry.vector_ops import magnitude
@@ -35,6 +36,88 @@ class CurrentLoopTest(unittest.TestCase):
 
                 self.assertAlmostEqual(analytic_z_field, B, 5)
 
+    @staticmethod
+    def elliptic_field(I, radius, points):
+        """
+        Exact field of a loop centred on the origin with normal along z, from complete elliptic integrals
+        """
+        rho = np.sqrt(points[:, 0] ** 2 + points[:, 1] ** 2)
+        z = points[:, 2]
+        m = 4 * radius * rho / ((radius + rho) ** 2 + z ** 2)
+        K = ellipk(m)
+        E = ellipe(m)
+        c = CurrentLoop.mu_0 * I / (2 * np.pi) / np.sqrt((radius + rho) ** 2 + z ** 2)
+        B_z = c * (K + (radius ** 2 - rho ** 2 - z ** 2) / ((radius - rho) ** 2 + z ** 2) * E)
+        B_rho = c * z / rho * (-K + (radius ** 2 + rho ** 2 + z ** 2) / ((radius - rho) ** 2 + z ** 2) * E)
+
+        return np.stack((B_rho * points[:, 0] / rho, B_rho * points[:, 1] / rho, B_z), axis=1)
+
+    def test_off_axis_field(self):
+        """
+        Function to test the B field away from the axis against the analytic solution. Each segment contributes
+        dl x r / |r| ** 3, so a segment's contribution falls with the sine of the angle between the segment and the
+        vector to the point
+        """
+        I = 1e4
+        radius = 0.15
+        rng = np.random.default_rng(1)
+        rho = rng.uniform(0.0, 0.8 * radius, 200)
+        phi = rng.uniform(0.0, 2 * np.pi, 200)
+        z = rng.uniform(-2.0 * radius, 2.0 * radius, 200)
+        points = np.stack((rho * np.cos(phi), rho * np.sin(phi), z), axis=1)
+        analytic_field = self.elliptic_field(I, radius, points)
+
+        for offset in [0.0, 0.3]:
+            # As in test_b_field, the loop is at minus its centre
+            centre = np.asarray([0.0, 0.0, offset])
+            loop = CurrentLoop(I, radius, centre, np.asarray([0.0, 0.0, 1.0]), 200)
+            b = loop.b_field(points - centre)
+
+            error = np.sqrt(np.sum((b - analytic_field) ** 2, axis=1))
+            self.assertTrue(np.all(error < 1e-10 * np.sqrt(np.sum(analytic_field ** 2, axis=1))))
+
+    def test_quadrature_near_wire(self):
+        """
+        Function to check adaptive quadrature is accurate close to the windings with few points, and that the
+        reported error bounds the actual error
+        """
+        I = 1e4
+        radius = 0.15
+        np.random.seed(1)
+        loop_angle = np.random.uniform(0.0, 2 * np.pi, 100)
+        wire_distance = np.random.uniform(1e-3, 5e-2, 100)
+        wire_angle = np.random.uniform(0.0, 2 * np.pi, 100)
+        rho = radius + wire_distance * np.cos(wire_angle)
+        points = np.stack((rho * np.cos(loop_angle), rho * np.sin(loop_angle), wire_distance * np.sin(wire_angle)), axis=1)
+        analytic_field = self.elliptic_field(I, radius, points)
+        analytic_magnitude = np.sqrt(np.sum(analytic_field ** 2, axis=1))
+
+        for quadrature in CurrentLoop.quadrature_types:
+            loop = CurrentLoop(I, radius, np.zeros(3), np.asarray([0.0, 0.0, 1.0]), 16, quadrature=quadrature,
+                               tolerance=1e-8)
+            b, error = loop.b_field_with_error(points)
+            actual_error = np.sqrt(np.sum((b - analytic_field) ** 2, axis=1))
+
+            if quadrature == "adaptive":
+                self.assertTrue(np.all(actual_error < 1e-8 * analytic_magnitude))
+                self.assertTrue(np.all(actual_error <= error))
+            else:
+                self.assertGreater(np.max(actual_error / analytic_magnitude), 1e-2)
+
+    def test_gauss_legendre_off_axis(self):
+        """
+        Function to check the Gauss Legendre rule converges to the analytic field away from the windings
+        """
+        I = 1e4
+        radius = 0.15
+        loop = CurrentLoop(I, radius, np.zeros(3), np.asarray([0.0, 0.0, 1.0]), 64, quadrature="gauss_legendre")
+        points = np.asarray([[0.05, 0.02, 0.1], [0.3, -0.1, -0.05], [0.0, 0.5, 0.5]])
+        analytic_field = self.elliptic_field(I, radius, points)
+
+        b, error = loop.b_field_with_error(points)
+        self.assertTrue(np.allclose(b, analytic_field, rtol=1e-8, atol=1e-12))
+        self.assertEqual(error.shape, (3,))
+
     def test_interpolated_b_field(self):
         """
         Function to test interpolated B field behaviour is as expected
@@ -60,6 +143,75 @@ class CurrentLoopTest(unittest.TestCase):
             self.assertAlmostEqual(B / analytic_z_field, 1.0, 2)
 
 
+class InterpolatedBFieldTest(unittest.TestCase):
+    @staticmethod
+    def analytic_field(points):
+        """
+        Smooth, divergence free field used to test the interpolation schemes
+        """
+        B = np.zeros(points.shape)
+        B[:, 0] = np.sin(points[:, 1]) * np.cos(points[:, 2])
+        B[:, 1] = np.cos(points[:, 0] * points[:, 2])
+        B[:, 2] = np.exp(-points[:, 0] ** 2 - points[:, 1] ** 2)
+        return B
+
+    def get_mesh_values(self, dom_size, dom_pts):
+        x = np.linspace(-dom_size, dom_size, dom_pts)
+        X, Y, Z = np.meshgrid(x, x, x, indexing='ij')
+        points = np.stack((X.flatten(), Y.flatten(), Z.flatten()), axis=1)
+        return self.analytic_field(points).reshape((dom_pts, dom_pts, dom_pts, 3))
+
+    def test_mesh_points(self):
+        """
+        Function to test that both interpolation schemes recover the field at the mesh points
+        :return:
+        """
+        dom_size = 1.0
+        dom_pts = 11
+        b_points = self.get_mesh_values(dom_size, dom_pts)
+        for interpolation in InterpolatedBField.interpolation_types:
+            interp_field = InterpolatedBField.from_array(b_points, dom_size, interpolation=interpolation)
+
+            x = np.linspace(-dom_size, dom_size, dom_pts)
+            points = np.asarray([[x[1], x[4], x[7]], [x[0], x[10], x[5]], [x[3], x[3], x[3]]])
+            B = interp_field.b_field(points)
+            self.assertEqual(B.shape, points.shape)
+            for i in range(points.shape[0]):
+                for j in range(3):
+                    self.assertAlmostEqual(B[i, j], self.analytic_field(points)[i, j], 10)
+
+    def test_cubic_interpolation_accuracy(self):
+        """
+        Function to test that cubic interpolation on a coarse mesh is more accurate than linear interpolation
+        :return:
+        """
+        dom_size = 1.0
+        dom_pts = 15
+        b_points = self.get_mesh_values(dom_size, dom_pts)
+        linear_field = InterpolatedBField.from_array(b_points, dom_size, interpolation="linear")
+        cubic_field = InterpolatedBField.from_array(b_points, dom_size, interpolation="cubic")
+
+        np.random.seed(1)
+        points = np.random.uniform(-0.8 * dom_size, 0.8 * dom_size, size=(1000, 3))
+        B = self.analytic_field(points)
+        linear_error = np.max(np.abs(linear_field.b_field(points) - B))
+        cubic_error = np.max(np.abs(cubic_field.b_field(points) - B))
+
+        self.assertLess(cubic_error, 1e-3)
+        self.assertLess(cubic_error, 0.1 * linear_error)
+
+    def test_out_of_domain(self):
+        """
+        Function to test that points outside of the mesh raise a ValueError
+        :return:
+        """
+        dom_size = 1.0
+        b_points = self.get_mesh_values(dom_size, 5)
+        for interpolation in InterpolatedBField.interpolation_types:
+            interp_field = InterpolatedBField.from_array(b_points, dom_size, interpolation=interpolation)
+            self.assertRaises(ValueError, interp_field.b_field, np.asarray([[0.0, 1.1, 0.0]]))
+
+
 if __name__ == '__main__':
     unittest.main()
 
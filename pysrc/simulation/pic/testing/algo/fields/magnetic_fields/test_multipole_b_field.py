@@ -0,0 +1,110 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains testing for the multipole expansion of coil fields
+"""
+
+import unittest
+import warnings
+import numpy as np
+
+from plasma_physics.pysrc.simulation.pic.algo.fields.magnetic_fields.generic_b_fields import CurrentLoop, CombinedField
+from plasma_physics.pysrc.simulation.pic.algo.fields.magnetic_fields.multipole_b_field import MultipoleBField, real_spherical_harmonics
+
+
+class RealSphericalHarmonicsTest(unittest.TestCase):
+    def test_orthonormality(self):
+        """
+        Function to check the harmonics are orthonormal over the sphere
+        """
+        max_degree = 6
+        cos_theta, theta_weights = np.polynomial.legendre.leggauss(20)
+        phi = np.arange(40) * 2.0 * np.pi / 40
+        cos_theta, phi = np.meshgrid(cos_theta, phi, indexing="ij")
+        weights = np.outer(theta_weights, np.ones(40) * 2.0 * np.pi / 40).flatten()
+
+        Y = real_spherical_harmonics(max_degree, cos_theta.flatten(), phi.flatten())
+        inner_products = np.dot(Y.T * weights, Y)
+
+        self.assertTrue(np.allclose(inner_products, np.eye((max_degree + 1) ** 2), atol=1e-12))
+
+
+class MultipoleBFieldTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        I = 1e4
+        radius = 0.1
+        loop_offset = 1.25
+        loop_pts = 50
+        comp_loops = list()
+        comp_loops.append(CurrentLoop(I, radius, np.asarray([-loop_offset * radius, 0.0, 0.0]), np.asarray([1.0, 0.0, 0.0]), loop_pts))
+        comp_loops.append(CurrentLoop(I, radius, np.asarray([loop_offset * radius, 0.0, 0.0]), np.asarray([-1.0, 0.0, 0.0]), loop_pts))
+        comp_loops.append(CurrentLoop(I, radius, np.asarray([0.0, -loop_offset * radius, 0.0]), np.asarray([0.0, 1.0, 0.0]), loop_pts))
+        comp_loops.append(CurrentLoop(I, radius, np.asarray([0.0, loop_offset * radius, 0.0]), np.asarray([0.0, -1.0, 0.0]), loop_pts))
+        comp_loops.append(CurrentLoop(I, radius, np.asarray([0.0, 0.0, -loop_offset * radius]), np.asarray([0.0, 0.0, 1.0]), loop_pts))
+        comp_loops.append(CurrentLoop(I, radius, np.asarray([0.0, 0.0, loop_offset * radius]), np.asarray([0.0, 0.0, -1.0]), loop_pts))
+        cls.combined_field = CombinedField(comp_loops)
+        cls.tolerance = 1e-4
+        cls.multipole_field = MultipoleBField(cls.combined_field, max_degree=12, tolerance=cls.tolerance)
+
+    def get_errors(self, radius):
+        np.random.seed(1)
+        directions = np.random.normal(size=(500, 3))
+        directions /= np.sqrt(np.sum(directions ** 2, axis=1))[:, np.newaxis]
+        points = radius[:, np.newaxis] * directions
+
+        b_exact = self.combined_field.b_field(points)
+        b_multipole = self.multipole_field.b_field(points)
+
+        return np.sqrt(np.sum((b_multipole - b_exact) ** 2, axis=1)), b_exact
+
+    def test_radii(self):
+        self.assertLess(self.multipole_field.interior_radius, self.multipole_field.r_min)
+        self.assertGreater(self.multipole_field.exterior_radius, self.multipole_field.r_max)
+        self.assertLessEqual(self.multipole_field.interior_error, self.tolerance)
+        self.assertLessEqual(self.multipole_field.exterior_error, self.tolerance)
+
+    def test_unconverged_warning(self):
+        """
+        Function to check a warning is raised if the expansions are not within tolerance after the last radius step
+        """
+        class SingleStepField(MultipoleBField):
+            max_radius_steps = 1
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            field = SingleStepField(self.combined_field, max_degree=4, tolerance=self.tolerance)
+
+        self.assertGreater(field.exterior_error, self.tolerance)
+        self.assertTrue(any(issubclass(w.category, RuntimeWarning) for w in caught))
+
+    def test_interior_expansion(self):
+        radius = np.linspace(0.0, self.multipole_field.interior_radius, 500)
+        error, b_exact = self.get_errors(radius)
+
+        self.assertLess(np.max(error), 2 * self.tolerance * np.max(np.sqrt(np.sum(b_exact ** 2, axis=1))))
+
+    def test_exterior_expansion(self):
+        radius = np.linspace(self.multipole_field.exterior_radius, 3.0 * self.multipole_field.exterior_radius, 500)
+        error, b_exact = self.get_errors(radius)
+
+        self.assertLess(np.max(error), 2 * self.tolerance * np.max(np.sqrt(np.sum(b_exact ** 2, axis=1))))
+
+    def test_near_windings(self):
+        """
+        Function to check the exact field is used between the expansions
+        """
+        radius = np.linspace(self.multipole_field.interior_radius, self.multipole_field.exterior_radius, 502)[1:-1]
+        error, b_exact = self.get_errors(radius)
+
+        self.assertTrue(np.all(error == 0.0))
+
+    def test_point_shape(self):
+        point = np.asarray([0.01, 0.02, 0.03])
+        self.assertEqual(self.multipole_field.b_field(point).shape, (3,))
+        self.assertTrue(np.allclose(self.multipole_field.b_field(point), self.combined_field.b_field(point), rtol=1e-3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains testing for the adaptive octree B field mesh
+"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from plasma_physics.pysrc.simulation.pic.algo.fields.magnetic_fields.generic_b_fields import CurrentLoop
+from plasma_physics.pysrc.simulation.pic.algo.fields.magnetic_fields.octree_b_field import OctreeBField
+
+
+class OctreeBFieldTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.dom_size = 1.0
+        cls.loop = CurrentLoop(1e4, 0.5, np.asarray([0.0, 0.0, 0.0]), np.asarray([0.0, 0.0, 1.0]), 50)
+        cls.tolerance = 3e-2
+        cls.octree = OctreeBField.generate(cls.loop, cls.dom_size, cls.tolerance, max_depth=6, min_depth=2)
+
+    def test_structure(self):
+        """
+        Function to check every point maps to a leaf that contains it, and that the mesh is refined non-uniformly
+        """
+        np.random.seed(1)
+        points = np.random.uniform(-self.dom_size, self.dom_size, (1000, 3))
+        nodes = self.octree.locate(points)
+
+        self.assertTrue(np.all(self.octree.children[nodes, 0] < 0))
+        self.assertTrue(np.all(points >= self.octree.cell_origin[nodes]))
+        self.assertTrue(np.all(points <= self.octree.cell_origin[nodes] + self.octree.cell_width[nodes, np.newaxis]))
+
+        leaf_sizes = self.octree.cell_size[self.octree.children[:, 0] < 0]
+        self.assertGreater(np.max(leaf_sizes), np.min(leaf_sizes))
+        self.assertLess(self.octree.num_field_evaluations, (2 ** self.octree.max_depth + 1) ** 3)
+
+    def test_mesh_points(self):
+        """
+        Function to check the field is exact at the corners of leaf cells
+        """
+        leaves = np.where(self.octree.children[:, 0] < 0)[0][:50]
+        corners = self.octree.cell_origin[leaves] + self.octree.cell_width[leaves, np.newaxis] * 0.999999
+        exact = self.loop.b_field(corners)
+        interpolated = self.octree.b_field(corners)
+
+        self.assertTrue(np.allclose(exact, interpolated, rtol=1e-3, atol=1e-3 * np.max(np.abs(exact))))
+
+    def test_accuracy_away_from_coil(self):
+        """
+        Function to check interpolation error is close to the tolerance away from the coil windings
+        """
+        np.random.seed(2)
+        points = np.random.uniform(-self.dom_size, self.dom_size, (2000, 3))
+        coil_distance = np.sqrt((np.sqrt(points[:, 0] ** 2 + points[:, 1] ** 2) - 0.5) ** 2 + points[:, 2] ** 2)
+        points = points[coil_distance > 0.2]
+
+        exact = self.loop.b_field(points)
+        interpolated = self.octree.b_field(points)
+        error = np.sqrt(np.sum((exact - interpolated) ** 2, axis=1)) / np.sqrt(np.sum(exact ** 2, axis=1))
+
+        self.assertLess(np.median(error), self.tolerance)
+        self.assertLess(np.max(error), 10 * self.tolerance)
+
+    def test_save_and_load(self):
+        """
+        Function to check a saved mesh is loaded identically
+        """
+        file_name = os.path.join(tempfile.mkdtemp(), "octree.npz")
+        self.octree.save(file_name)
+        loaded = OctreeBField.load(file_name)
+
+        points = np.asarray([[0.1, 0.2, 0.3], [-0.7, 0.4, 0.0]])
+        self.assertTrue(np.all(loaded.b_field(points) == self.octree.b_field(points)))
+        self.assertEqual(loaded.num_leaves, self.octree.num_leaves)
+
+    def test_out_of_domain(self):
+        self.assertRaises(ValueError, self.octree.b_field, np.asarray([[0.0, 0.0, 1.5]]))
+
+
+if __name__ == '__main__':
+    unittest.main()
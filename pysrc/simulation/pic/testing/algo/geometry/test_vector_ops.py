@@ -234,6 +234,82 @@ class VectorOpsTest(unittest.TestCase):
         self.assertAlmostEqual(1.0, rotated_point[1])
         self.assertAlmostEqual(0.0, rotated_point[2])
 
+    def test_rotate_arbitrary_axis_does_not_modify_axis(self):
+        vector = np.array([0.0, 2.0, 0.0])
+        arbitrary_axis_rotation_3d(np.array([1.0, 0.0, 0.0]), vector, np.pi / 2)
+        self.assertTrue(np.all(vector == np.array([0.0, 2.0, 0.0])))
+
+    def test_batch_operations(self):
+        """
+        Function to check the batch operations agree with the single vector operations
+        """
+        np.random.seed(1)
+        vectors_1 = np.random.uniform(-1.0, 1.0, (4, 5, 3))
+        vectors_2 = np.random.uniform(-1.0, 1.0, (4, 5, 3))
+        angles = np.random.uniform(0.0, 2 * np.pi, (4, 5, 3))
+
+        magnitudes = batch_magnitude(vectors_1)
+        normalised = batch_normalise(vectors_1)
+        dots = batch_dot(vectors_1, vectors_2)
+        crosses = batch_cross(vectors_1, vectors_2)
+        projections = batch_vector_projection(vectors_1, vectors_2)
+        rotations = batch_rotate_3d(vectors_1, angles)
+        axis_rotations = batch_arbitrary_axis_rotation_3d(vectors_1, vectors_2, angles[..., 0])
+        for i in range(4):
+            for j in range(5):
+                v_1 = vectors_1[i, j]
+                v_2 = vectors_2[i, j]
+                self.assertAlmostEqual(magnitudes[i, j], magnitude(v_1))
+                self.assertTrue(np.allclose(normalised[i, j], normalise(v_1)))
+                self.assertAlmostEqual(dots[i, j], dot(v_1, v_2))
+                self.assertTrue(np.allclose(crosses[i, j], cross(v_1, v_2)))
+                self.assertTrue(np.allclose(projections[i, j], vector_projection(v_1, v_2)))
+                self.assertTrue(np.allclose(rotations[i, j], rotate_3d(v_1, angles[i, j])))
+                self.assertTrue(np.allclose(axis_rotations[i, j],
+                                            arbitrary_axis_rotation_3d(v_1, v_2, float(angles[i, j, 0]))))
+
+    def test_batch_broadcasting(self):
+        np.random.seed(1)
+        points = np.random.uniform(-1.0, 1.0, (10, 3))
+        axis = np.array([0.0, 0.0, 2.0])
+        angles = np.linspace(0.0, np.pi, 10)
+
+        rotated = batch_arbitrary_axis_rotation_3d(points, axis, angles)
+        self.assertTrue(np.all(axis == np.array([0.0, 0.0, 2.0])))
+        self.assertTrue(np.allclose(rotated[:, 2], points[:, 2]))
+        self.assertTrue(np.allclose(batch_magnitude(rotated), batch_magnitude(points)))
+
+        rotated = batch_arbitrary_axis_rotation_3d(np.array([1.0, 0.0, 0.0]), axis, angles)
+        self.assertTrue(np.allclose(rotated[:, 0], np.cos(angles)))
+        self.assertTrue(np.allclose(rotated[:, 1], np.sin(angles)))
+
+        crosses = batch_cross(points, axis)
+        self.assertTrue(np.allclose(batch_dot(crosses, points), 0.0))
+
+    def test_batch_output_arrays(self):
+        np.random.seed(1)
+        vectors_1 = np.random.uniform(-1.0, 1.0, (10, 3))
+        vectors_2 = np.random.uniform(-1.0, 1.0, (10, 3))
+
+        out = np.zeros(10)
+        result = batch_magnitude(vectors_1, out=out)
+        self.assertIs(result, out)
+        self.assertTrue(np.allclose(out, np.sqrt(np.sum(vectors_1 ** 2, axis=1))))
+
+        out = np.zeros(10)
+        result = batch_dot(vectors_1, vectors_2, out=out)
+        self.assertIs(result, out)
+        self.assertTrue(np.allclose(out, np.sum(vectors_1 * vectors_2, axis=1)))
+
+        out = np.zeros((10, 3))
+        for func, args in [(batch_normalise, (vectors_1,)), (batch_cross, (vectors_1, vectors_2)),
+                           (batch_vector_projection, (vectors_1, vectors_2)),
+                           (batch_rotate_3d, (vectors_1, vectors_2)),
+                           (batch_arbitrary_axis_rotation_3d, (vectors_1, vectors_2, 0.5))]:
+            result = func(*args, out=out)
+            self.assertIs(result, out)
+            self.assertTrue(np.allclose(out, func(*args)))
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
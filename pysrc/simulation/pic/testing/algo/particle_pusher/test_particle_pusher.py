@@ -10,7 +10,8 @@ import unittest
 import numpy as np
 
 from plasma_physics.pysrc.simulation.pic.algo.particle_pusher.boris_solver import boris_solver
-from plasma_physics.pysrc.simulation.pic.simulations.analytic_single_particle_motion import solve_B_field, solve_E_field, solve_aligned_fields
+from plasma_physics.pysrc.simulation.pic.simulations.analytic_single_particle_motion import solve_B_field, solve_E_field, solve_aligned_fields, \
+    solve_crossed_fields
 from plasma_physics.pysrc.simulation.pic.data.particles.charged_particle import PICParticle
 
 
@@ -211,6 +212,43 @@ class BorisSolverTest(unittest.TestCase):
                 self.assertLess(np.absolute(np.average(y - analytic_positions[:, 1])), 0.01, msg="{}, {}, {}".format(X_0, V_0, E, B))
                 self.assertLess(np.absolute(np.average(z - analytic_positions[:, 2])), 0.01, msg="{}, {}, {}".format(X_0, V_0, E, B))
 
+    def test_crossed_fields(self):
+        """
+        This test considers a particle drifting in uniform electric and magnetic fields in arbitrary directions
+        :return:
+        """
+        rng = np.random.default_rng(1)
+        num_tests = 20
+        for idx in range(num_tests):
+            e_field = rng.uniform(low=-1.0, high=1.0, size=3)
+            b_field = rng.uniform(low=-2.0, high=2.0, size=3)
+            X_0 = rng.uniform(low=-1.0, high=1.0, size=3)
+            V_0 = rng.uniform(low=-1.0, high=1.0, size=3)
+
+            X = X_0.reshape((1, 3))
+            V = V_0.reshape((1, 3))
+            Q = np.asarray([[1.0]])
+            M = np.asarray([[1.0]])
+
+            final_time = 4.0
+            num_pts = 1000
+            times = np.linspace(0.0, final_time, num_pts)
+            positions = np.zeros((times.shape[0], 3))
+            positions[0] = X_0
+            for i in range(1, num_pts):
+                dt = times[i] - times[i - 1]
+                X, V = boris_solver(lambda x: np.ones(x.shape) * e_field, lambda x: np.ones(x.shape) * b_field,
+                                    X, V, Q, M, dt)
+                positions[i] = X[0]
+
+            particle = PICParticle(1.0, Q[0, 0], X_0, V_0)
+            analytic_times, analytic_positions = solve_crossed_fields(particle, e_field, b_field, final_time,
+                                                                      num_pts=num_pts)
+
+            error = np.sqrt(np.sum((positions - analytic_positions) ** 2, axis=1))
+            self.assertLess(np.max(error), 0.05, msg="{}, {}, {}, {}".format(X_0, V_0, e_field, b_field))
+
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -0,0 +1,84 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains testing for the particle ensemble samplers
+"""
+
+import unittest
+import numpy as np
+
+from plasma_physics.pysrc.simulation.pic.algo.sampling.particle_samplers import isotropic_directions, \
+    shell_positions, ball_positions, mono_energetic_velocities, maxwellian_velocities, loss_cone_velocities
+
+
+class ParticleSamplersTest(unittest.TestCase):
+    num_particles = 100000
+
+    def test_isotropic_directions(self):
+        directions = isotropic_directions(np.random.default_rng(1), self.num_particles)
+
+        self.assertEqual(directions.shape, (self.num_particles, 3))
+        self.assertTrue(np.allclose(np.sum(directions ** 2, axis=1), 1.0))
+        self.assertTrue(np.all(np.abs(np.mean(directions, axis=0)) < 0.01))
+        self.assertTrue(np.allclose(np.cov(directions.T), np.eye(3) / 3.0, atol=0.01))
+
+    def test_reproducibility(self):
+        directions_1 = isotropic_directions(np.random.default_rng(5), 10)
+        directions_2 = isotropic_directions(np.random.default_rng(5), 10)
+        self.assertTrue(np.all(directions_1 == directions_2))
+
+    def test_generator_is_required(self):
+        # Seeds are turned into Generators by the caller, so that the streams of a simulation are explicit
+        self.assertRaises(AssertionError, shell_positions, 1, 10, 0.5, 1.0)
+        self.assertRaises(AssertionError, ball_positions, 1, 10, 1.0)
+        self.assertRaises(AssertionError, mono_energetic_velocities, 1, 10, 1.0)
+        self.assertRaises(AssertionError, maxwellian_velocities, 1, 10, 1.0)
+        self.assertRaises(AssertionError, loss_cone_velocities, 1, 10, 1.0, 0.3, np.asarray([0.0, 0.0, 1.0]))
+
+    def test_shell_positions(self):
+        rng = np.random.default_rng(1)
+        centre = np.asarray([1.0, 2.0, 3.0])
+        positions = shell_positions(rng, self.num_particles, 0.5, 1.0, centre=centre)
+        radii = np.sqrt(np.sum((positions - centre) ** 2, axis=1))
+        self.assertTrue(np.all(radii >= 0.5) and np.all(radii <= 1.0))
+        median_radius = np.cbrt(0.5 * (0.5 ** 3 + 1.0))
+        self.assertAlmostEqual(np.mean(radii < median_radius), 0.5, delta=0.01)
+
+        positions = shell_positions(rng, self.num_particles, 0.5, 1.0, uniform_in_volume=False)
+        radii = np.sqrt(np.sum(positions ** 2, axis=1))
+        self.assertAlmostEqual(np.mean(radii < 0.75), 0.5, delta=0.01)
+
+        positions = ball_positions(rng, self.num_particles, 2.0)
+        radii = np.sqrt(np.sum(positions ** 2, axis=1))
+        self.assertTrue(np.all(radii <= 2.0))
+        self.assertAlmostEqual(np.mean(radii < 1.0), 0.125, delta=0.01)
+
+    def test_velocities(self):
+        rng = np.random.default_rng(1)
+        velocities = mono_energetic_velocities(rng, self.num_particles, 3.0)
+        self.assertTrue(np.allclose(np.sqrt(np.sum(velocities ** 2, axis=1)), 3.0))
+
+        drift = np.asarray([1.0, 0.0, -1.0])
+        velocities = maxwellian_velocities(rng, self.num_particles, 2.0, drift_velocity=drift)
+        self.assertTrue(np.allclose(np.mean(velocities, axis=0), drift, atol=0.05))
+        self.assertTrue(np.allclose(np.std(velocities, axis=0), 2.0, rtol=0.01))
+
+    def test_loss_cone(self):
+        rng = np.random.default_rng(1)
+        axis = np.asarray([1.0, 1.0, 0.0])
+        loss_cone_angle = 0.3
+        velocities = loss_cone_velocities(rng, self.num_particles, 2.0, loss_cone_angle, axis)
+
+        self.assertTrue(np.allclose(np.sqrt(np.sum(velocities ** 2, axis=1)), 2.0))
+        cos_pitch = np.dot(velocities, axis / np.sqrt(2.0)) / 2.0
+        self.assertLessEqual(np.max(np.abs(cos_pitch)), np.cos(loss_cone_angle))
+        self.assertAlmostEqual(np.max(np.abs(cos_pitch)), np.cos(loss_cone_angle), delta=1e-3)
+
+        # Outside the cone the distribution is isotropic, so cos_pitch is uniform
+        self.assertAlmostEqual(np.mean(np.abs(cos_pitch) < 0.5 * np.cos(loss_cone_angle)), 0.5, delta=0.01)
+        self.assertTrue(np.allclose(np.mean(velocities, axis=0), 0.0, atol=0.02))
+
+
+if __name__ == '__main__':
+    unittest.main()
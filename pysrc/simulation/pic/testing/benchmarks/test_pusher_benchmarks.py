@@ -0,0 +1,52 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains testing for the pusher work-precision benchmarks
+"""
+
+import unittest
+import numpy as np
+
+from plasma_physics.pysrc.simulation.pic.benchmarks.pusher_benchmarks import gyration_problem, \
+    crossed_fields_problem, polywell_escape_problem, work_precision, format_table
+
+
+class PusherBenchmarkTest(unittest.TestCase):
+    def test_gyration(self):
+        problem = gyration_problem(num_particles=10)
+        results = work_precision(problem, [2.0 * np.pi * 0.05, 2.0 * np.pi * 0.025])
+
+        # Boris conserves energy in a magnetic field, with a second order error in gyrophase
+        for result in results:
+            self.assertLess(result["energy_drift"], 1e-12)
+            self.assertEqual(result["particle_steps"], 10 * int(round(problem.final_time / result["dt"])))
+        self.assertAlmostEqual(results[0]["phase_error"] / results[1]["phase_error"], 4.0, delta=0.2)
+        self.assertLess(results[1]["phase_error"], 0.15)
+
+    def test_crossed_fields(self):
+        problem = crossed_fields_problem(num_particles=10)
+        results = work_precision(problem, [2.0 * np.pi * 0.05, 2.0 * np.pi * 0.025])
+
+        self.assertAlmostEqual(results[0]["phase_error"] / results[1]["phase_error"], 4.0, delta=0.2)
+        self.assertLess(results[1]["energy_drift"], results[0]["energy_drift"])
+        self.assertLess(results[1]["energy_drift"], 1e-4)
+
+    def test_polywell_escape(self):
+        dts = [2e-10, 1e-10, 5e-11]
+        reference_results = work_precision(polywell_escape_problem(num_particles=4, num_base_steps=100), dts)
+        self.assertTrue(np.isnan(reference_results[-1]["phase_error"]))
+        self.assertLess(reference_results[1]["phase_error"], reference_results[0]["phase_error"])
+
+        problem = polywell_escape_problem("interpolated_linear", num_particles=4, num_base_steps=100, domain_pts=17)
+        results = work_precision(problem, dts)
+        for result in results:
+            self.assertLess(result["energy_drift"], 1e-12)
+            self.assertEqual(result["problem"], "polywell_interpolated_linear")
+
+        table = format_table(reference_results + results)
+        self.assertEqual(len(table.split("\n")), 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
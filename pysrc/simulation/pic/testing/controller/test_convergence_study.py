@@ -0,0 +1,94 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains testing for the convergence study runner
+"""
+
+import unittest
+import numpy as np
+
+from plasma_physics.pysrc.simulation.pic.controller.convergence_study import ConvergenceStudy
+
+
+def euler_decay(config):
+    """
+    Forward Euler solution of dy/dt = -y at fixed output times, which converges at first order in the time step
+    """
+    dt = config["dt"]
+    num_steps = int(round(config["final_time"] / dt))
+    y = (1.0 - dt) ** np.arange(num_steps + 1)
+    output_steps = np.arange(1, 5) * num_steps // 4
+    return y[output_steps]
+
+
+def trapezoid_integral(config):
+    """
+    Trapezoidal integral of sin(x) over [0, pi], which converges at second order in the number of intervals
+    """
+    x = np.linspace(0.0, np.pi, config["num_intervals"] + 1)
+    return np.asarray([np.trapezoid(np.sin(x), x)])
+
+
+class ConvergenceStudyTest(unittest.TestCase):
+    def test_observed_order(self):
+        study = ConvergenceStudy(euler_decay, {"final_time": 1.0, "dt": 1e-3}, {"dt": [0.05, 0.025, 0.0125, 0.00625]})
+        study.run()
+        self.assertAlmostEqual(study.get_observed_order("dt"), 1.0, places=1)
+
+        # Levels with a non constant refinement ratio
+        study = ConvergenceStudy(trapezoid_integral, {"num_intervals": 10}, {"num_intervals": [10, 20, 60]})
+        study.run()
+        self.assertAlmostEqual(study.get_observed_order("num_intervals"), 2.0, places=1)
+
+        # Explicit step sizes
+        study = ConvergenceStudy(trapezoid_integral, {"num_intervals": 10}, {"num_intervals": [10, 20, 60]},
+                                 step_sizes={"num_intervals": [np.pi / 10, np.pi / 20, np.pi / 60]})
+        study.run()
+        self.assertAlmostEqual(study.get_observed_order("num_intervals"), 2.0, places=1)
+
+    def test_richardson_extrapolation(self):
+        study = ConvergenceStudy(euler_decay, {"final_time": 1.0, "dt": 1e-3}, {"dt": [0.05, 0.025, 0.0125, 0.00625]})
+        study.run()
+
+        exact = np.exp(-np.arange(1, 5) / 4.0)
+        finest_error = np.max(np.abs(study.get_reference("dt", "finest") - exact))
+        richardson_error = np.max(np.abs(study.get_reference("dt", "richardson") - exact))
+        self.assertLess(richardson_error, 0.1 * finest_error)
+
+        # Errors against the extrapolation are close to the true errors
+        errors = study.get_errors("dt", "richardson")
+        true_errors = np.asarray([np.sqrt(np.sum((result - exact) ** 2)) for result in study.results["dt"]])
+        true_errors /= np.sqrt(np.sum(exact ** 2))
+        self.assertTrue(np.allclose(errors, true_errors, rtol=0.05))
+
+    def test_cheapest_setting(self):
+        def cost(config):
+            return config["num_intervals"]
+
+        study = ConvergenceStudy(trapezoid_integral, {"num_intervals": 10}, {"num_intervals": [4, 8, 16, 32, 64]},
+                                 cost_function=cost)
+        study.run()
+
+        # The relative error of the trapezoidal rule is about pi^2 / (12 n^2)
+        self.assertEqual(study.get_cheapest_setting("num_intervals", 1e-2, "richardson"), 16)
+        self.assertEqual(study.get_cheapest_setting("num_intervals", 1e-3, "richardson"), 32)
+        self.assertIsNone(study.get_cheapest_setting("num_intervals", 1e-6, "richardson"))
+        self.assertTrue(np.isnan(study.get_errors("num_intervals", "finest")[-1]))
+        self.assertEqual(study.get_cheapest_config(1e-6)["num_intervals"], 64)
+
+    def test_parallel_run(self):
+        refinements = {"dt": [0.05, 0.025, 0.0125], "final_time": [1.0, 2.0]}
+        serial_study = ConvergenceStudy(euler_decay, {"final_time": 1.0, "dt": 0.01}, refinements)
+        serial_study.run()
+        parallel_study = ConvergenceStudy(euler_decay, {"final_time": 1.0, "dt": 0.01}, refinements)
+        parallel_study.run(num_processes=2)
+
+        for serial_result, parallel_result in zip(serial_study.results["dt"], parallel_study.results["dt"]):
+            self.assertTrue(np.all(serial_result == parallel_result))
+        self.assertEqual(len(parallel_study.results["final_time"]), 2)
+        self.assertAlmostEqual(parallel_study.results["final_time"][1][-1], 0.99 ** 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains testing for the event detectors and ensemble controller
+"""
+
+import unittest
+import numpy as np
+
+from plasma_physics.pysrc.simulation.pic.diagnostics.events import PlaneCrossing, RadiusThreshold, WallHit
+from plasma_physics.pysrc.simulation.pic.controller.controller import EnsembleController
+
+
+def zero_field(X):
+    return np.zeros(X.shape)
+
+
+def uniform_b_field(X):
+    return np.tile(np.asarray([0.0, 0.0, 1.0]), (X.shape[0], 1))
+
+
+class EventsTest(unittest.TestCase):
+    def test_plane_crossing_interpolation(self):
+        detector = PlaneCrossing(np.zeros(3), np.asarray([1.0, 0.0, 0.0]), direction=1)
+        detector.reset(3)
+        X_old = np.asarray([[-1.0, 0.0, 0.0], [-1.0, 0.0, 0.0], [1.0, 0.0, 0.0]])
+        X_new = np.asarray([[3.0, 1.0, 0.0], [-0.5, 0.0, 0.0], [-1.0, 0.0, 0.0]])
+        V = np.ones((3, 3))
+        occurred = detector.detect(np.arange(3), 1.0, 2.0, X_old, X_new, V, V)
+
+        self.assertTrue(np.all(occurred == [True, False, False]))
+        records = detector.get_records()
+        self.assertTrue(np.all(records["index"] == [0]))
+        self.assertTrue(np.allclose(records["time"], 1.25))
+        self.assertTrue(np.allclose(records["position"], [[0.0, 0.25, 0.0]]))
+
+    def test_radius_first_passage(self):
+        detector = RadiusThreshold(1.0)
+        detector.reset(1)
+        V = np.zeros((1, 3))
+        inside = np.asarray([[0.5, 0.0, 0.0]])
+        outside = np.asarray([[1.5, 0.0, 0.0]])
+        detector.detect(np.arange(1), 0.0, 1.0, inside, outside, V, V)
+        detector.detect(np.arange(1), 1.0, 2.0, outside, inside, V, V)
+        detector.detect(np.arange(1), 2.0, 3.0, inside, outside, V, V)
+
+        records = detector.get_records()
+        self.assertEqual(records["time"].shape[0], 1)
+        self.assertTrue(np.allclose(records["time"], 0.5))
+
+    def test_wall_hit_retirement(self):
+        """
+        Function to check particles moving in straight lines are retired at the time they hit the wall
+        """
+        num_particles = 20
+        np.random.seed(1)
+        X = np.random.uniform(-0.5, 0.5, (num_particles, 3))
+        V = np.random.uniform(-1.0, 1.0, (num_particles, 3))
+        Q = np.ones(num_particles)
+        M = np.ones(num_particles)
+        controller = EnsembleController(zero_field, zero_field, events=[WallHit(1.0)])
+        t, X_final, V_final, active = controller.run(X, V, Q, M, 1e-2, 100.0)
+
+        self.assertFalse(np.any(active))
+        records = controller.get_events()["wall_hit"]
+        self.assertEqual(records["index"].shape[0], num_particles)
+        expected_times = np.min((np.sign(V) - X) / V, axis=1)
+        self.assertTrue(np.allclose(records["time"], expected_times[records["index"]]))
+        self.assertTrue(np.allclose(np.max(np.abs(records["position"]), axis=1), 1.0))
+        self.assertTrue(np.all(controller.retired_time >= expected_times))
+        self.assertTrue(np.all(controller.retired_time < expected_times + 1e-2 + 1e-12))
+
+    def test_poincare_section(self):
+        """
+        Function to check crossings of a gyrating particle lie on its orbit at the gyro period
+        """
+        X = np.asarray([[1.0, 0.0, 0.0]])
+        V = np.asarray([[0.0, 1.0, 0.1]])
+        detector = PlaneCrossing(np.zeros(3), np.asarray([0.0, 1.0, 0.0]), direction=1)
+        controller = EnsembleController(zero_field, uniform_b_field, events=[detector])
+        controller.run(X, V, -np.ones(1), np.ones(1), 2 * np.pi / 1000, 10 * np.pi + 0.1)
+
+        records = controller.get_events()["plane_crossing"]
+        self.assertEqual(records["time"].shape[0], 5)
+        self.assertTrue(np.allclose(np.diff(records["time"]), 2 * np.pi, rtol=1e-3))
+        self.assertTrue(np.allclose(records["position"][:, 0], 1.0, atol=1e-3))
+
+    def test_history_is_opt_in(self):
+        X = np.zeros((2, 3))
+        V = np.ones((2, 3))
+        controller = EnsembleController(zero_field, zero_field)
+        controller.run(X, V, np.ones(2), np.ones(2), 0.1, 1.0)
+        self.assertRaises(AssertionError, lambda: controller.history)
+
+        controller = EnsembleController(zero_field, zero_field, store_history=True, history_interval=2)
+        controller.run(X, V, np.ones(2), np.ones(2), 0.1, 1.0)
+        history = controller.history
+        self.assertEqual(history["position"].shape, (6, 2, 3))
+        self.assertTrue(np.allclose(history["position"][-1], 1.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains testing for the instrumentation of simulation loops
+"""
+
+import os
+import json
+import tempfile
+import unittest
+import numpy as np
+
+from plasma_physics.pysrc.simulation.pic.controller.controller import EnsembleController
+from plasma_physics.pysrc.simulation.pic.diagnostics.instrumentation import Instrumentation
+
+
+def zero_field(X):
+    return np.zeros(X.shape)
+
+
+class InstrumentationTest(unittest.TestCase):
+    def test_stage_timers(self):
+        timer = Instrumentation()
+        for i in range(3):
+            timer.start_step()
+            timer.lap("first")
+            timer.lap("second")
+            timer.end_step(10)
+
+        summary = timer.get_summary()
+        self.assertEqual(summary["num_steps"], 3)
+        self.assertEqual(summary["particle_steps"], 30)
+        self.assertEqual(summary["stage_calls"], {"first": 3, "second": 3})
+        self.assertLessEqual(sum(summary["stage_times"].values()), summary["step_time"])
+        self.assertGreater(timer.particles_per_second, 0.0)
+
+    def test_disabled(self):
+        timer = Instrumentation(enabled=False)
+        timer.start_step()
+        timer.lap("first")
+        timer.end_step(10)
+
+        summary = timer.get_summary()
+        self.assertEqual(summary["num_steps"], 0)
+        self.assertEqual(summary["stage_times"], dict())
+
+    def test_controller_instrumentation(self):
+        with tempfile.TemporaryDirectory() as directory:
+            json_file = os.path.join(directory, "timings.jsonl")
+            timer = Instrumentation(json_file=json_file, json_interval=1e-9)
+            controller = EnsembleController(zero_field, zero_field, instrumentation=timer)
+            controller.run(np.zeros((5, 3)), np.ones((5, 3)), np.ones(5), np.ones(5), 0.1, 1.0)
+
+            summary = timer.get_summary()
+            self.assertEqual(summary["num_steps"], controller.num_steps)
+            self.assertEqual(summary["particle_steps"], 5 * controller.num_steps)
+            for stage in ["fields", "time_step", "push", "events", "accumulators", "history"]:
+                self.assertEqual(summary["stage_calls"][stage], controller.num_steps)
+
+            with open(json_file) as f:
+                lines = [json.loads(line) for line in f]
+            self.assertEqual(len(lines), controller.num_steps)
+            self.assertEqual(lines[-1]["num_steps"], controller.num_steps)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains testing for continuous particle injection into the ensemble controller, and time averaged
+distributions
+"""
+
+import unittest
+import numpy as np
+
+from plasma_physics.pysrc.simulation.pic.controller.controller import EnsembleController
+from plasma_physics.pysrc.simulation.pic.controller.particle_source import ParticleSource
+from plasma_physics.pysrc.simulation.pic.diagnostics.accumulators import DistributionAccumulator
+from plasma_physics.pysrc.simulation.pic.diagnostics.events import WallHit
+from plasma_physics.pysrc.utils.physical_constants import PhysicalConstants
+
+
+def zero_field(X):
+    return np.zeros(X.shape)
+
+
+class ParticleSourceTest(unittest.TestCase):
+    def test_sampling(self):
+        source = ParticleSource(1.0, 100.0, PhysicalConstants.electron_mass, -PhysicalConstants.electron_charge,
+                                0.5, 1.0, 10000, centre=np.ones(3), rng=np.random.default_rng(1))
+        X, V, Q, M = source.sample(10000)
+
+        radius = np.sqrt(np.sum((X - 1.0) ** 2, axis=1))
+        self.assertTrue(np.all(radius >= 0.5) and np.all(radius <= 1.0))
+        self.assertAlmostEqual(np.mean(radius < np.cbrt(0.5 * (1.0 + 0.5 ** 3))), 0.5, delta=0.02)
+        speed = np.sqrt(2.0 * 100.0 * PhysicalConstants.electron_charge / PhysicalConstants.electron_mass)
+        self.assertTrue(np.allclose(np.sqrt(np.sum(V ** 2, axis=1)), speed))
+        self.assertTrue(np.all(np.abs(np.mean(V, axis=0)) < 0.03 * speed))
+        self.assertTrue(np.all(Q == -PhysicalConstants.electron_charge))
+
+    def test_injection_count(self):
+        source = ParticleSource(2.5, 1.0, 1.0, 1.0, 0.0, 1.0, 10)
+        num_injections = [source.get_num_injections(1.0, 10) for i in range(4)]
+        self.assertEqual(num_injections, [2, 3, 2, 3])
+        self.assertEqual(source.get_num_injections(10.0, 3), 3)
+
+    def test_steady_state(self):
+        """
+        Function to check particles moving ballistically from the centre reach the expected steady state population,
+        which is the injection rate multiplied by the time to reach the wall
+        """
+        rate = 20.0
+        mass = 2.0 * PhysicalConstants.electron_charge
+        source = ParticleSource(rate, 1.0, mass, 1.0, 0.0, 0.0, 50, rng=np.random.default_rng(1))
+        speed = source.speed
+        self.assertAlmostEqual(speed, 1.0)
+        radial_bins = np.linspace(0.0, np.sqrt(3), 11)
+        accumulator = DistributionAccumulator(radial_bins, np.linspace(-1.1, 1.1, 5), start_time=2.0)
+        wall = WallHit(1.0)
+        controller = EnsembleController(zero_field, zero_field, events=[wall], source=source,
+                                        accumulators=[accumulator])
+        t, X, V, active = controller.run(np.zeros((0, 3)), np.zeros((0, 3)), np.zeros(0), np.zeros(0), 1e-2, 10.0)
+
+        # Slots of escaped particles are reused
+        self.assertTrue(np.abs(source.num_injected - 10.0 * rate) <= 1)
+        self.assertEqual(X.shape[0], 50)
+        records = controller.get_events()["wall_hit"]
+        self.assertEqual(np.unique(records["index"]).shape[0], records["index"].shape[0])
+        self.assertEqual(records["index"].shape[0] + np.sum(active), source.num_injected)
+        self.assertTrue(np.all(np.isnan(controller.retired_time[controller.particle_ids[active]])))
+
+        # Time to the wall is the distance to the face of the cube in the direction of motion
+        directions = records["velocity"] / speed
+        mean_exit_time = np.mean(1.0 / np.max(np.abs(directions), axis=1))
+        position_count, velocity_count = accumulator.get_distributions()
+        self.assertAlmostEqual(accumulator.total_time, 8.0)
+        self.assertAlmostEqual(np.sum(position_count) / (rate * mean_exit_time), 1.0, delta=0.1)
+        self.assertTrue(np.allclose(np.sum(velocity_count, axis=2)[0], position_count))
+
+        # Particles move radially, so only radial velocities are positive
+        self.assertAlmostEqual(np.sum(velocity_count[0, :, 2:]) / np.sum(position_count), 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
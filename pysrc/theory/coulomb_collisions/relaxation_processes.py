@@ -202,10 +202,10 @@ class MaxwellianRelaxationProcess(RelaxationProcess):
         thermal_velocity = np.sqrt(PhysicalConstants.boltzmann_constant * T_background / m_background)
         v_max = 3 * thermal_velocity
 
-        np.random.seed(1)
-        u = np.random.normal(loc=beam_velocity, scale=thermal_velocity, size=(num_samples,))
-        v = np.random.normal(loc=0.0, scale=thermal_velocity, size=(num_samples,))
-        w = np.random.normal(loc=0.0, scale=thermal_velocity, size=(num_samples,))
+        rng = np.random.default_rng(1)
+        u = rng.normal(loc=beam_velocity, scale=thermal_velocity, size=(num_samples,))
+        v = rng.normal(loc=0.0, scale=thermal_velocity, size=(num_samples,))
+        w = rng.normal(loc=0.0, scale=thermal_velocity, size=(num_samples,))
         v_total = u ** 2 + v ** 2 + w ** 2
 
         pdf = 1.0 / np.sqrt(2 * np.pi * thermal_velocity ** 2) ** 3 * np.exp(-v_total / (2 * thermal_velocity ** 2))
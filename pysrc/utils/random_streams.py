@@ -0,0 +1,60 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains functions to create independent random number streams for parallel simulations. Streams are
+spawned from a single root seed with a SeedSequence, so that each batch of a campaign has its own statistically
+independent stream, and results do not depend on the number of workers the batches are spread across.
+"""
+
+import numpy as np
+
+
+def get_generator(rng=None):
+    """
+    Get a numpy Generator from an optional seed or Generator
+
+    :param rng: numpy Generator, integer seed, or None for a Generator with a random seed
+    :return: numpy Generator
+    """
+    if isinstance(rng, np.random.Generator):
+        return rng
+    assert rng is None or isinstance(rng, (int, np.integer, np.random.SeedSequence)), \
+        "rng must be a Generator, seed or None"
+
+    return np.random.default_rng(rng)
+
+
+def get_stream(seed, stream_index):
+    """
+    Get the Generator of a single stream spawned from a root seed. This is the same stream as the one at stream_index
+    returned by spawn_generators, so that each worker can create its own stream from the root seed and its index
+
+    :param seed: root seed of the campaign
+    :param stream_index: index of the stream, or tuple of indices for nested streams
+    :return: numpy Generator
+    """
+    assert isinstance(seed, (int, np.integer))
+    spawn_key = tuple(stream_index) if isinstance(stream_index, (tuple, list)) else (stream_index,)
+    for idx in spawn_key:
+        assert isinstance(idx, (int, np.integer)) and idx >= 0
+
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=spawn_key))
+
+
+def spawn_generators(seed, num_streams):
+    """
+    Spawn independent Generators from a root seed
+
+    :param seed: root seed, or SeedSequence
+    :param num_streams: number of streams
+    :return: list of numpy Generators
+    """
+    assert isinstance(num_streams, int) and num_streams >= 0
+    seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+
+    return [np.random.default_rng(child) for child in seed_sequence.spawn(num_streams)]
+
+
+if __name__ == '__main__':
+    pass
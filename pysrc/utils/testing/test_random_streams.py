@@ -0,0 +1,32 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains tests of the random number streams used by parallel simulations
+"""
+
+import unittest
+import numpy as np
+
+from plasma_physics.pysrc.utils.random_streams import get_generator, get_stream, spawn_generators
+
+
+class RandomStreamsTest(unittest.TestCase):
+    def test_get_stream_matches_spawned_generators(self):
+        generators = spawn_generators(7, 4)
+        for i, generator in enumerate(generators):
+            np.testing.assert_array_equal(generator.uniform(size=10), get_stream(7, i).uniform(size=10))
+
+    def test_streams_are_distinct(self):
+        samples = [get_stream(7, i).uniform(size=10) for i in range(3)]
+        self.assertFalse(np.allclose(samples[0], samples[1]))
+        self.assertFalse(np.allclose(samples[1], samples[2]))
+
+    def test_get_generator(self):
+        rng = np.random.default_rng(3)
+        self.assertIs(get_generator(rng), rng)
+        np.testing.assert_array_equal(get_generator(3).uniform(size=5), np.random.default_rng(3).uniform(size=5))
+
+
+if __name__ == '__main__':
+    unittest.main()
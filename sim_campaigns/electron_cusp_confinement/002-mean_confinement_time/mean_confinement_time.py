@@ -108,7 +108,8 @@ def run_parallel_sims(params):
         b_field = CombinedField(comp_loops, domain_size=dom_size)
 
     seed = 1
-    np.random.seed(seed)
+    # The same stream is used for every configuration, so that configurations are compared with the same particles
+    rng = np.random.default_rng(seed)
 
     # Run simulations
     num_sims = 500
@@ -116,11 +117,11 @@ def run_parallel_sims(params):
     vel = np.sqrt(2.0 * electron_energy_eV * PhysicalConstants.electron_charge / PhysicalConstants.electron_mass)
     for i in range(num_sims):
         # Define particle velocity and 100eV charge particle
-        z_unit = np.random.uniform(-1.0, 1.0)
+        z_unit = rng.uniform(-1.0, 1.0)
         xy_plane = np.sqrt(1 - z_unit ** 2)
-        phi = np.random.uniform(0.0, 2 * np.pi)
+        phi = rng.uniform(0.0, 2 * np.pi)
         velocity = np.asarray([xy_plane * np.cos(phi), xy_plane * np.sin(phi), z_unit]) * vel
-        particle = PICParticle(9.1e-31, 1.6e-19, np.random.uniform(-3.0 * radius / 16.0, 3.0 * radius / 16.0, size=(3, )), velocity)
+        particle = PICParticle(9.1e-31, 1.6e-19, rng.uniform(-3.0 * radius / 16.0, 3.0 * radius / 16.0, size=(3, )), velocity)
 
         t, x, y, z, final_idx = run_sim((b_field, particle, radius, loop_offset * radius, I, dI_dt))
 
@@ -19,6 +19,7 @@ from plasma_physics.pysrc.simulation.pic.algo.particle_pusher.boris_solver impor
 from plasma_physics.pysrc.simulation.pic.data.particles.charged_particle import PICParticle
 from plasma_physics.pysrc.simulation.pic.algo.geometry.vector_ops import *
 from plasma_physics.pysrc.utils.physical_constants import PhysicalConstants
+from plasma_physics.pysrc.utils.random_streams import get_stream
 
 
 def run_sim(params):
@@ -97,8 +98,9 @@ def run_parallel_sims(params):
     file_path = os.path.join("..", "mesh_generation", "data", "radius-{}m".format(radius), "current-{}kA".format(I * to_kA), "domres-{}".format(domain_pts), file_name)
     b_field = InterpolatedBField(file_path, dom_pts_idx=6, dom_size_idx=8)
 
-    seed = batch_num
-    np.random.seed(seed)
+    # Each batch has its own stream of the campaign seed, independent of the worker it runs on
+    campaign_seed = 1
+    rng = get_stream(campaign_seed, batch_num)
 
     # Run simulations
     num_bins = 100
@@ -109,11 +111,11 @@ def run_parallel_sims(params):
     vel = np.sqrt(2.0 * electron_energy * PhysicalConstants.electron_charge / PhysicalConstants.electron_mass)
     for i in range(num_sims):
         # Define particle velocity and 100eV charge particle
-        z_unit = np.random.uniform(-1.0, 1.0)
+        z_unit = rng.uniform(-1.0, 1.0)
         xy_plane = np.sqrt(1 - z_unit ** 2)
-        phi = np.random.uniform(0.0, 2 * np.pi)
+        phi = rng.uniform(0.0, 2 * np.pi)
         velocity = np.asarray([xy_plane * np.cos(phi), xy_plane * np.sin(phi), z_unit]) * vel
-        particle = PICParticle(9.1e-31, 1.6e-19, np.random.uniform(-3.0 * radius / 16.0, 3.0 * radius / 16.0, size=(3, )), velocity)
+        particle = PICParticle(9.1e-31, 1.6e-19, rng.uniform(-3.0 * radius / 16.0, 3.0 * radius / 16.0, size=(3, )), velocity)
 
         t, x, y, z, final_idx = run_sim((b_field, particle, radius, loop_offset * radius, I, dI_dt))
 
@@ -10,8 +10,10 @@ import os
 import numpy as np
 from matplotlib import pyplot as plt
 
-from plasma_physics.pysrc.simulation.pic.algo.fields.magnetic_fields.generic_b_fields import InterpolatedBField
+from plasma_physics.pysrc.simulation.pic.algo.fields.magnetic_fields.generic_b_fields import InterpolatedBField, CurrentLoop
+from plasma_physics.pysrc.simulation.pic.algo.fields.magnetic_fields.field_line_tracer import FieldLineTracer
 from plasma_physics.pysrc.simulation.pic.algo.geometry.vector_ops import magnitude
+from plasma_physics.pysrc.simulation.pic.io.vtk_writers import write_vtp_polylines
 
 
 def load_field(I, radius):
@@ -146,6 +148,48 @@ def compare_field():
     compare_fields(1.25 * radius, num_samples, b_field, radius, I)
 
 
+def trace_field_lines(I, radius, numerical_pts, winding_radius=0.05):
+    """
+    Trace field lines through a plane of seed points to map the connection length of the field lines, and which
+    lines end on the coils or leave through the cusps
+    """
+    b_field = load_field(I, radius)
+    loop_offset = 1.25
+    dom_size = 1.1 * loop_offset * radius
+
+    # Coils are only used for their geometry, so few loop points are needed
+    coils = list()
+    for dim in range(3):
+        for sign in [-1.0, 1.0]:
+            centre = np.zeros(3)
+            centre[dim] = sign * loop_offset * radius
+            normal = np.zeros(3)
+            normal[dim] = -sign
+            coils.append(CurrentLoop(I, radius, centre, normal, 8))
+    tracer = FieldLineTracer(b_field, dom_size, coils=coils, winding_radius=winding_radius * radius)
+
+    X = np.linspace(-loop_offset * radius, loop_offset * radius, numerical_pts)
+    Y = np.linspace(-loop_offset * radius, loop_offset * radius, numerical_pts)
+    X_1, Y_1 = np.meshgrid(X, Y, indexing='ij')
+    seeds = np.stack((X_1.flatten(), Y_1.flatten(), np.zeros(X_1.size)), axis=1)
+    seeds = seeds[tracer.coil_distance(seeds) > tracer.winding_radius]
+
+    forward_lines, forward_reasons, forward_lengths = tracer.trace(seeds, 1.0)
+    backward_lines, backward_reasons, backward_lengths = tracer.trace(seeds, -1.0)
+    connection_lengths = forward_lengths + backward_lengths
+    ends_on_coil = np.logical_or(forward_reasons == "coil", backward_reasons == "coil").astype(float)
+    write_vtp_polylines(forward_lines + backward_lines, "field_lines",
+                        line_data={"connection_length": np.concatenate((connection_lengths, connection_lengths)),
+                                   "ends_on_coil": np.concatenate((ends_on_coil, ends_on_coil))})
+
+    fig, ax = plt.subplots(1)
+    im = ax.scatter(seeds[:, 0], seeds[:, 1], c=connection_lengths / radius, s=4)
+    fig.colorbar(im, ax=ax)
+    ax.set_title("Connection length / radius")
+    plt.savefig("connection_lengths_xy")
+    plt.show()
+
+
 if __name__ == '__main__':
     # visualise_field()
     compare_field()
@@ -10,8 +10,11 @@ import os
 from mpl_toolkits.mplot3d import Axes3D
 
 from plasma_physics.pysrc.simulation.pic.algo.fields.magnetic_fields.generic_b_fields import InterpolatedBField
+from plasma_physics.pysrc.simulation.pic.algo.sampling.particle_samplers import shell_positions, \
+    mono_energetic_velocities
 from plasma_physics.pysrc.simulation.pic.data.particles.charged_particle import PICParticle
 from plasma_physics.pysrc.utils.physical_constants import PhysicalConstants
+from plasma_physics.pysrc.utils.random_streams import get_stream
 from plasma_physics.sim_campaigns.electron_cusp_confinement.run_sim import run_simulation
 
 
@@ -33,27 +36,20 @@ def run_sims():
                              "current-{}kA".format(I * to_kA), "domres-{}".format(domain_pts), file_name)
     b_field = InterpolatedBField(file_path, dom_pts_idx=6, dom_size_idx=8)
 
-    seed = batch_num
-    np.random.seed(seed)
+    # Each batch has its own stream of the campaign seed, independent of the worker it runs on
+    campaign_seed = 1
+    rng = get_stream(campaign_seed, batch_num)
 
     # Run simulations
     vel = np.sqrt(2.0 * electron_energy * PhysicalConstants.electron_charge / PhysicalConstants.electron_mass)
     num_sims = 1
-    for i in range(num_sims):
-        # Define particle velocity
-        z_unit = np.random.uniform(-1.0, 1.0)
-        xy_plane = np.sqrt(1 - z_unit ** 2)
-        phi = np.random.uniform(0.0, 2 * np.pi)
-        velocity = np.asarray([xy_plane * np.cos(phi), xy_plane * np.sin(phi), z_unit]) * vel
-
-        # Generate particle position
-        z_unit = np.random.uniform(-1.0, 1.0)
-        xy_plane = np.sqrt(1 - z_unit ** 2)
-        phi = np.random.uniform(0.0, 2 * np.pi)
-        position = np.asarray([xy_plane * np.cos(phi), xy_plane * np.sin(phi), z_unit]) * np.random.uniform(0.0, 1.0 * radius / 16.0)
 
+    # Define particle velocities and positions
+    velocities = mono_energetic_velocities(rng, num_sims, vel)
+    positions = shell_positions(rng, num_sims, 0.0, 1.0 * radius / 16.0, uniform_in_volume=False)
+    for i in range(num_sims):
         # Generate particle
-        particle = PICParticle(9.1e-31, 1.6e-19, position, velocity)
+        particle = PICParticle(9.1e-31, 1.6e-19, positions[i], velocities[i])
 
         t, x, y, z, v_x, v_y, v_z, final_idx = run_simulation((b_field, particle, radius, loop_offset * radius, I, dI_dt))
 
@@ -14,9 +14,11 @@ import multiprocessing as mp
 
 from plasma_physics.pysrc.simulation.pic.algo.fields.magnetic_fields.generic_b_fields import *
 from plasma_physics.pysrc.simulation.pic.algo.particle_pusher.boris_solver import *
+from plasma_physics.pysrc.simulation.pic.algo.sampling.particle_samplers import mono_energetic_velocities
 from plasma_physics.pysrc.simulation.pic.data.particles.charged_particle import PICParticle
 from plasma_physics.pysrc.simulation.pic.algo.geometry.vector_ops import *
 from plasma_physics.pysrc.utils.physical_constants import PhysicalConstants
+from plasma_physics.pysrc.utils.random_streams import get_stream
 
 
 def run_sim(params):
@@ -121,8 +123,9 @@ def run_parallel_sims(params):
     file_path = os.path.join("..", "mesh_generation", "data", "radius-1.0m", "current-0.001kA", "domres-{}".format(domain_pts), file_name)
     b_field = InterpolatedBField(file_path, dom_pts_idx=6, dom_size_idx=8)
 
-    seed = batch_num
-    np.random.seed(seed)
+    # Each batch has its own stream of the campaign seed, independent of the worker it runs on
+    campaign_seed = 1
+    rng = get_stream(campaign_seed, batch_num)
 
     # Run simulations
     num_radial_bins = 200
@@ -136,14 +139,13 @@ def run_parallel_sims(params):
     velocity_bins = np.linspace(-vel, vel, num_velocity_bins)
     num_sims = 400
     final_positions = []
+
+    # Define particle velocities and positions
+    velocities = mono_energetic_velocities(rng, num_sims, vel)
+    positions = rng.uniform(-3.0 * radius / 16.0, 3.0 * radius / 16.0, size=(num_sims, 3))
     for i in range(num_sims):
-        # Define particle velocity and 100eV charge particle
-        z_unit = np.random.uniform(-1.0, 1.0)
-        xy_plane = np.sqrt(1 - z_unit ** 2)
-        phi = np.random.uniform(0.0, 2 * np.pi)
-        velocity = np.asarray([xy_plane * np.cos(phi), xy_plane * np.sin(phi), z_unit]) * vel
-        particle = PICParticle(9.1e-31, 1.6e-19,
-                               np.random.uniform(-3.0 * radius / 16.0, 3.0 * radius / 16.0, size=(3,)), velocity)
+        # Define 100eV charge particle
+        particle = PICParticle(9.1e-31, 1.6e-19, positions[i], velocities[i])
 
         t, x, y, z, v_x, v_y, v_z, final_idx = run_sim((b_field, particle, radius, loop_offset * radius, I, n))
 
@@ -118,9 +118,9 @@ if __name__ == '__main__':
     max_vel = np.sqrt(2.0 * electron_energy * PhysicalConstants.electron_charge / PhysicalConstants.electron_mass)
     for dt in dt_factors:
         seed = 1
-        np.random.seed(seed)
+        rng = np.random.default_rng(seed)
         # Define charge particle
-        vel = np.random.uniform(low=-1.0, high=1.0, size=(3, )) * max_vel
+        vel = rng.uniform(low=-1.0, high=1.0, size=(3, )) * max_vel
         particle = PICParticle(9.1e-31, 1.6e-19, np.asarray([0.0, 0.0, 0.0]), vel)
 
         t, x, y, z = run_sim(b_field, particle, dt)
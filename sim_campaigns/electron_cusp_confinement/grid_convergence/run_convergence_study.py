@@ -0,0 +1,101 @@
+"""
+Author: Rohan Ramasamy
+Date: 18/10/2026
+
+This file contains a convergence study of electron trajectories in a polywell field, over the mesh resolution of the
+interpolated field, the number of loop_pts used in the Biot Savart integrals, and the time step. It replaces the hand
+edited studies in grid_convergence.py and mesh_convergence.py.
+"""
+
+import numpy as np
+
+from plasma_physics.pysrc.simulation.pic.algo.fields.magnetic_fields.generic_b_fields import InterpolatedBField, \
+    get_polywell_field
+from plasma_physics.pysrc.simulation.pic.algo.particle_pusher.boris_solver import boris_solver_internal
+from plasma_physics.pysrc.simulation.pic.algo.sampling.particle_samplers import shell_positions, \
+    mono_energetic_velocities
+from plasma_physics.pysrc.simulation.pic.controller.convergence_study import ConvergenceStudy
+from plasma_physics.pysrc.utils.physical_constants import PhysicalConstants
+
+
+def run_polywell_trajectories(config):
+    """
+    Run an ensemble of electrons in a polywell field with a fixed time step, returning the positions of the electrons
+    at fixed output times. Electrons leaving the domain are frozen at their last position, so that the outputs of
+    different levels can be compared.
+    """
+    radius = config["radius"]
+    I = config["I"]
+    loop_offset = config["loop_offset"]
+    domain_size = 1.1 * loop_offset
+
+    # Field of a unit radius polywell with unit current, optionally interpolated from a mesh
+    b_field = get_polywell_field(1.0, 1.0, loop_offset, config["loop_pts"])
+    if config["domain_pts"] is not None:
+        points = np.linspace(-domain_size, domain_size, config["domain_pts"])
+        mesh = np.stack(np.meshgrid(points, points, points, indexing="ij"), axis=-1).reshape((-1, 3))
+        b_points = b_field.b_field(mesh).reshape((points.shape[0], points.shape[0], points.shape[0], 3))
+        b_field = InterpolatedBField.from_array(b_points, domain_size, interpolation=config["interpolation"])
+
+    # Electrons are sampled with the same seed at every level
+    rng = np.random.default_rng(config["seed"])
+    num_particles = config["num_particles"]
+    speed = np.sqrt(2.0 * config["energy"] * PhysicalConstants.electron_charge / PhysicalConstants.electron_mass)
+    X = shell_positions(rng, num_particles, 0.0, 3.0 * radius / 16.0, uniform_in_volume=False)
+    V = mono_energetic_velocities(rng, num_particles, speed)
+    Q = -np.ones((num_particles, 1)) * PhysicalConstants.electron_charge
+    M = np.ones((num_particles, 1)) * PhysicalConstants.electron_mass
+
+    # Time steps are set relative to the Gummersall time step
+    base_dt = 1e-9 * radius
+    dt = config["dt_factor"] * base_dt
+    steps_per_output = int(round(config["output_interval"] / config["dt_factor"]))
+    assert abs(steps_per_output * config["dt_factor"] - config["output_interval"]) < 1e-9 * config["output_interval"], \
+        "The output interval must be a multiple of the time step"
+
+    outputs = np.zeros((config["num_outputs"], num_particles, 3))
+    active = np.ones(num_particles, dtype=bool)
+    for i in range(config["num_outputs"]):
+        for j in range(steps_per_output):
+            if not np.any(active):
+                break
+
+            B = b_field.b_field(X[active] / radius) * I / radius
+            X[active], V[active] = boris_solver_internal(np.zeros(B.shape), B, X[active], V[active],
+                                                         Q[active], M[active], dt)
+            active[np.any(np.abs(X) > domain_size * radius, axis=1)] = False
+
+        outputs[i] = X
+
+    return outputs.flatten()
+
+
+if __name__ == '__main__':
+    base_config = {
+        "I": 1e4,
+        "radius": 0.1,
+        "loop_offset": 1.25,
+        "loop_pts": 200,
+        "domain_pts": None,
+        "interpolation": "linear",
+        "dt_factor": 0.125,
+        "output_interval": 100.0,
+        "num_outputs": 10,
+        "num_particles": 20,
+        "energy": 100.0,
+        "seed": 1
+    }
+    refinements = {
+        "domain_pts": [33, 65, 129],
+        "loop_pts": [25, 50, 100, 200],
+        "dt_factor": [1.0, 0.5, 0.25, 0.125]
+    }
+
+    # The mesh has one less interval than it has points in each dimension
+    step_sizes = {"domain_pts": [1.0 / (pts - 1) for pts in refinements["domain_pts"]]}
+    study = ConvergenceStudy(run_polywell_trajectories, base_config, refinements, step_sizes=step_sizes)
+    study.run(num_processes=4)
+
+    tolerance = 1e-2
+    study.report(tolerance, reference="richardson")
+    print("Cheapest configuration: {}".format(study.get_cheapest_config(tolerance, reference="richardson")))
@@ -6,12 +6,14 @@ This file contains code to determine what loop resolution is necessary for accur
 """
 
 import os
+import time
 import numpy as np
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 import scipy
 
 from plasma_physics.pysrc.simulation.pic.algo.fields.magnetic_fields.generic_b_fields import *
+from plasma_physics.pysrc.simulation.pic.algo.fields.magnetic_fields.multipole_b_field import MultipoleBField
 from plasma_physics.pysrc.simulation.pic.algo.particle_pusher.boris_solver import *
 from plasma_physics.pysrc.simulation.pic.data.particles.charged_particle import PICParticle
 
@@ -24,8 +26,8 @@ def loop_pt_convergence():
 
     # Generate sample points
     num_tests = 1000
-    np.random.seed(1)
-    sample_points = np.random.uniform(-radius, radius, (3, num_tests))
+    rng = np.random.default_rng(1)
+    sample_points = rng.uniform(-radius, radius, (3, num_tests))
 
     # Generate result points
     results = []
@@ -62,7 +64,7 @@ def loop_pt_convergence():
     plt.show()
 
 
-def dom_pt_convergence():
+def dom_pt_convergence(interpolation="linear"):
     # Sim parameters
     I = 1e4
     radius = 0.15
@@ -70,8 +72,8 @@ def dom_pt_convergence():
 
     # Generate sample points
     num_tests = 100000
-    np.random.seed(1)
-    sample_points = np.random.uniform(-radius, radius, (3, num_tests))
+    rng = np.random.default_rng(1)
+    sample_points = rng.uniform(-radius, radius, (3, num_tests))
 
     # Generate result points
     results = []
@@ -79,7 +81,7 @@ def dom_pt_convergence():
     for i, dom_pts in enumerate(dom_points):
         file_name = "b_field_{}_{}_{}_{}_{}_{}".format(1.0 * 1e-3, 1.0, loop_offset, dom_pts, 200, 1.375)
         file_path = os.path.join("..", "mesh_generation", "data", "radius-1.0m", "current-0.001kA", "domres-{}".format(dom_pts), file_name)
-        b_field = InterpolatedBField(file_path, dom_pts_idx=6, dom_size_idx=8)
+        b_field = InterpolatedBField(file_path, dom_pts_idx=6, dom_size_idx=8, interpolation=interpolation)
 
         results.append([])
         for j in range(num_tests):
@@ -93,11 +95,51 @@ def dom_pt_convergence():
 
         plt.plot(np.asarray(results[i]) / np.asarray(results[0]), label="{}".format(dom_pts))
     plt.legend()
-    plt.savefig("field_resolution_convergence")
+    plt.savefig("field_resolution_convergence_{}".format(interpolation))
+    plt.show()
+
+
+def multipole_comparison(max_degree=16, tolerance=1e-4):
+    """
+    Compare the cost and accuracy of the multipole expansion of the polywell field against the direct Biot Savart sum
+    """
+    # Sim parameters
+    I = 1e4
+    radius = 0.15
+    loop_offset = 1.25
+    loop_pts = 200
+
+    # Generate sample points
+    num_tests = 100000
+    rng = np.random.default_rng(1)
+    sample_points = rng.uniform(-radius, radius, (num_tests, 3))
+
+    b_field = get_polywell_field(I, radius, loop_offset, loop_pts)
+    multipole_field = MultipoleBField(b_field, max_degree=max_degree, tolerance=tolerance)
+    print("Expansions used within {}m and beyond {}m, with errors {} and {}".format(
+        multipole_field.interior_radius, multipole_field.exterior_radius, multipole_field.interior_error,
+        multipole_field.exterior_error))
+
+    start = time.time()
+    b_direct = b_field.b_field(sample_points)
+    direct_time = time.time() - start
+    start = time.time()
+    b_multipole = multipole_field.b_field(sample_points)
+    multipole_time = time.time() - start
+    print("Direct sum: {}s, multipole expansion: {}s".format(direct_time, multipole_time))
+
+    plt.figure()
+    r = np.sqrt(np.sum(sample_points ** 2, axis=1))
+    error = np.sqrt(np.sum((b_multipole - b_direct) ** 2, axis=1)) / np.max(np.sqrt(np.sum(b_direct ** 2, axis=1)))
+    plt.semilogy(r, error, '.')
+    plt.xlabel("Distance from centre (m)")
+    plt.ylabel("Error relative to peak field")
+    plt.savefig("multipole_comparison_{}".format(max_degree))
     plt.show()
 
 
 if __name__ == '__main__':
     dom_pt_convergence()
+    dom_pt_convergence(interpolation="cubic")
 
 
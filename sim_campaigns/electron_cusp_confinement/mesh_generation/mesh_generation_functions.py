@@ -10,7 +10,9 @@ import numpy as np
 from matplotlib import pyplot as plt
 import multiprocessing as mp
 
-from plasma_physics.pysrc.simulation.pic.algo.fields.magnetic_fields.generic_b_fields import CurrentLoop, CombinedField, InterpolatedBField
+from plasma_physics.pysrc.simulation.pic.algo.fields.magnetic_fields.generic_b_fields import InterpolatedBField, \
+    get_polywell_field
+from plasma_physics.pysrc.simulation.pic.algo.fields.magnetic_fields.octree_b_field import OctreeBField
 from plasma_physics.pysrc.simulation.pic.algo.geometry.vector_ops import magnitude
 from plasma_physics.pysrc.simulation.pic.io.vtk_writers import write_vti_file
 
@@ -36,14 +38,7 @@ def generate_polywell_fields(params):
     print("Starting mesh {}".format(file_name))
 
     # Generate Polywell field
-    comp_loops = list()
-    comp_loops.append(CurrentLoop(I, radius, np.asarray([-loop_offset * radius, 0.0, 0.0]), np.asarray([1.0, 0.0, 0.0]), loop_pts))
-    comp_loops.append(CurrentLoop(I, radius, np.asarray([loop_offset * radius, 0.0, 0.0]), np.asarray([-1.0, 0.0, 0.0]), loop_pts))
-    comp_loops.append(CurrentLoop(I, radius, np.asarray([0.0, -loop_offset * radius, 0.0]), np.asarray([0.0, 1.0, 0.0]), loop_pts))
-    comp_loops.append(CurrentLoop(I, radius, np.asarray([0.0, loop_offset * radius, 0.0]), np.asarray([0.0, -1.0, 0.0]), loop_pts))
-    comp_loops.append(CurrentLoop(I, radius, np.asarray([0.0, 0.0, -loop_offset * radius]), np.asarray([0.0, 0.0, 1.0]), loop_pts))
-    comp_loops.append(CurrentLoop(I, radius, np.asarray([0.0, 0.0, loop_offset * radius]), np.asarray([0.0, 0.0, -1.0]), loop_pts))
-    combined_field = CombinedField(comp_loops)
+    combined_field = get_polywell_field(I, radius, loop_offset, loop_pts)
 
     # Calculate polywell field at all points
     min_dom = -dom_size
@@ -72,6 +67,36 @@ def generate_polywell_fields(params):
     write_vti_file(B, os.path.join(file_dir, file_name))
 
 
+def generate_polywell_octree(params):
+    """
+    Generate an adaptive octree mesh of a polywell field, refined towards the cusps and coils
+
+    I: Current in coils
+    radius: radius of coil
+    loop_offset: spacing of coils as a ratio of the radius
+    tolerance: relative interpolation error at which cells are refined
+    max_depth: maximum depth of the octree
+    loop_pts: Number of loop segments used to solve Biot Savart law
+    """
+    I, radius, loop_offset, tolerance, max_depth, loop_pts = params
+    assert loop_offset >= 1.0
+
+    convert_to_kA = 1e-3
+    dom_size = 1.1 * loop_offset * radius
+    file_dir = os.path.join("data", "radius-{}m".format(radius), "current-{}kA".format(I * convert_to_kA), "octree-{}".format(max_depth))
+    if not os.path.exists(file_dir):
+        os.makedirs(file_dir)
+    file_name = "b_field_octree_{}_{}_{}_{}_{}_{}".format(I * convert_to_kA, radius, loop_offset, tolerance, max_depth, loop_pts)
+    print("Starting mesh {}".format(file_name))
+
+    combined_field = get_polywell_field(I, radius, loop_offset, loop_pts)
+    octree = OctreeBField.generate(combined_field, dom_size, tolerance, max_depth=max_depth)
+    print("Generated {} leaves from {} field evaluations, compared to {} for a uniform mesh".format(
+        octree.num_leaves, octree.num_field_evaluations, (2 ** max_depth + 1) ** 3))
+
+    octree.save(os.path.join(file_dir, "{}.npz".format(file_name)))
+
+
 def generate_meshes():
     """
     Generate 10cm radius meshes to replicate figure 2 from Gummersall et al. from 2013
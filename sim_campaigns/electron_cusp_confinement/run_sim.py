@@ -14,12 +14,21 @@ from matplotlib import pyplot as plt
 from plasma_physics.pysrc.simulation.pic.algo.fields.magnetic_fields.generic_b_fields import InterpolatedBField
 from plasma_physics.pysrc.simulation.pic.algo.particle_pusher.boris_solver import boris_solver_internal
 from plasma_physics.pysrc.simulation.pic.algo.geometry.vector_ops import magnitude
+from plasma_physics.pysrc.simulation.pic.algo.sampling.particle_samplers import shell_positions, \
+    mono_energetic_velocities
+from plasma_physics.pysrc.simulation.pic.controller.controller import EnsembleController
+from plasma_physics.pysrc.simulation.pic.controller.particle_source import ParticleSource
+from plasma_physics.pysrc.simulation.pic.diagnostics.accumulators import DistributionAccumulator
+from plasma_physics.pysrc.simulation.pic.diagnostics.events import WallHit
+from plasma_physics.pysrc.simulation.pic.diagnostics.instrumentation import Instrumentation
 from plasma_physics.pysrc.simulation.pic.data.particles.charged_particle import PICParticle
 from plasma_physics.pysrc.utils.physical_constants import PhysicalConstants
+from plasma_physics.pysrc.utils.random_streams import get_generator, get_stream
 
 
-def run_simulation(params):
+def run_simulation(params, instrumentation=None):
     b_field, particle, radius, domain_size, I, dI_dt = params
+    timer = Instrumentation(enabled=False) if instrumentation is None else instrumentation
     print_output = False
     plot_sim = False
 
@@ -59,13 +68,16 @@ def run_simulation(params):
             print(t / final_time)
 
         # Get fields
+        timer.start_step()
         E = e_field(X)
         B = b_field_func(X)
+        timer.lap("fields")
 
         # Calculate time step
         dt = 0.2 * particle.mass / (magnitude(B[0]) * particle.charge)
         dt = min(max_dt, dt)
         dt = max(min_dt, dt)
+        timer.lap("time_step")
 
         # Update time step
         ts += 1
@@ -73,8 +85,12 @@ def run_simulation(params):
 
         # Move particles
         x, v = boris_solver_internal(E, B, X, V, Q, M, dt)
+        timer.lap("push")
 
-        if np.any(x[0, :] < -domain_size) or np.any(x[0, :] > domain_size):
+        escaped = np.any(x[0, :] < -domain_size) or np.any(x[0, :] > domain_size)
+        timer.lap("escape_check")
+        if escaped:
+            timer.end_step(1)
             if print_output:
                 print("PARTICLE ESCAPED! - {}, {}, {}".format(ts, t, X[0]))
 
@@ -107,6 +123,8 @@ def run_simulation(params):
         velocities.append(v)
         X = x
         V = v
+        timer.lap("append")
+        timer.end_step(1)
 
     # Convert points to x, y and z locations
     x = np.asarray(positions)[:, :, 0].flatten()
@@ -134,12 +152,112 @@ def run_simulation(params):
     return times, x, y, z, v_x, v_y, v_z, False
 
 
+def get_ensemble_time_step(radius):
+    """
+    Get the time step function for ensembles of particles, which takes the smallest time step of the particles still in
+    the domain
+    """
+    # Set timestep according to Gummersall approximation
+    max_dt = 1e-9 * radius
+    min_dt = 1e-3 * max_dt
+
+    def get_dt(t, X, V, Q, M, E, B):
+        dt = np.min(0.2 * M[:, 0] / (np.sqrt(np.sum(B ** 2, axis=1)) * np.abs(Q[:, 0])))
+        dt = min(max_dt, dt)
+        dt = max(min_dt, dt)
+        return dt
+
+    return get_dt
+
+
+def run_ensemble_simulation(params, instrumentation=None):
+    """
+    Run a set of particles together, recording only the time and position at which each particle escapes the domain,
+    rather than the full history of each particle. The time step is the smallest of the particles still in the domain.
+    The stages of each step are timed if instrumentation is given.
+    """
+    b_field, particles, radius, domain_size, I, dI_dt = params
+
+    def e_field(x):
+        B = b_field.b_field(x)
+        dB_dt = B / I * dI_dt
+        return -dB_dt
+
+    def b_field_func(x):
+        B = b_field.b_field(x / radius)
+        B *= I / radius
+        return B
+
+    X = np.concatenate([particle.position for particle in particles])
+    V = np.concatenate([particle.velocity for particle in particles])
+    Q = np.asarray([particle.charge for particle in particles])
+    M = np.asarray([particle.mass for particle in particles])
+
+    max_dt = 1e-9 * radius
+    final_time = 1e5 * max_dt
+    max_steps = int(1e7)
+
+    controller = EnsembleController(e_field, b_field_func, events=[WallHit(domain_size, name="escape")],
+                                    instrumentation=instrumentation)
+    t, X, V, active = controller.run(X, V, Q, M, get_ensemble_time_step(radius), final_time, max_steps=max_steps)
+
+    # Get final state of each particle, at the wall for escaped particles
+    escapes = controller.get_events()["escape"]
+    times = np.ones(X.shape[0]) * t
+    times[escapes["index"]] = escapes["time"]
+    X[escapes["index"]] = escapes["position"]
+
+    return times, X, np.logical_not(active)
+
+
+def run_steady_state_simulation(params, rng=1):
+    """
+    Run a single long simulation in which electrons are injected near the centre of the device at a constant rate, and
+    retired when they escape the domain. The time averaged radial and velocity distributions are accumulated after an
+    initial transient, giving the steady state distributions without stitching together one-shot simulations.
+
+    :param params: tuple of the simulation parameters
+    :param rng: numpy Generator or seed used to sample injected particles
+    """
+    b_field, radius, domain_size, I, electron_energy, injection_rate, max_particles, num_radial_bins, \
+        num_velocity_bins = params
+
+    def b_field_func(x):
+        B = b_field.b_field(x / radius)
+        B *= I / radius
+        return B
+
+    def e_field(x):
+        return np.zeros(x.shape)
+
+    max_dt = 1e-9 * radius
+    final_time = 1e5 * max_dt
+    start_time = 0.1 * final_time
+    source = ParticleSource(injection_rate, electron_energy, PhysicalConstants.electron_mass,
+                            PhysicalConstants.electron_charge, 0.0, 3.0 * radius / 16.0, max_particles,
+                            rng=get_generator(rng))
+    radial_bins = np.linspace(0.0, np.sqrt(3) * domain_size, num_radial_bins)
+    vel = np.sqrt(2.0 * electron_energy * PhysicalConstants.electron_charge / PhysicalConstants.electron_mass)
+    velocity_bins = np.linspace(-vel, vel, num_velocity_bins)
+    accumulator = DistributionAccumulator(radial_bins, velocity_bins, start_time=start_time)
+
+    controller = EnsembleController(e_field, b_field_func, events=[WallHit(domain_size, name="escape")],
+                                    source=source, accumulators=[accumulator])
+    controller.run(np.zeros((0, 3)), np.zeros((0, 3)), np.zeros(0), np.zeros(0), get_ensemble_time_step(radius),
+                   final_time)
+    position_count, velocity_count = accumulator.get_distributions()
+
+    return radial_bins, velocity_bins, position_count, velocity_count, controller.get_events()["escape"]
+
+
 def run_parallel_sims(params):
     radius, electron_energy, I, batch_num, get_final_state, get_histograms = params
     assert get_final_state or get_histograms
     dI_dt = 0.0
     to_kA = 1e-3
     use_cartesian_reference_frame = False
+    use_steady_state_injection = False
+    instrument = False
 
     # Get output directory
     res_dir = "results_low_loop_res_25"
@@ -155,6 +273,7 @@ def run_parallel_sims(params):
     # Get process name
     process_name = "radius-{}m-energy-{}eV-current-{}kA-batch-{}".format(radius, electron_energy, I * to_kA, batch_num)
     print("Starting process: {}".format(process_name))
+    timer = Instrumentation(enabled=instrument, json_file=os.path.join(output_dir, "{}-timings.jsonl".format(process_name)))
 
     # Generate Polywell field
     loop_pts = 200
@@ -165,8 +284,9 @@ def run_parallel_sims(params):
     file_path = os.path.join("..", "mesh_generation", "data", "radius-1.0m", "current-0.001kA", "domres-{}".format(domain_pts), file_name)
     b_field = InterpolatedBField(file_path, dom_pts_idx=6, dom_size_idx=8)
 
-    seed = batch_num
-    np.random.seed(seed)
+    # Each batch has its own stream of the campaign seed, independent of the worker it runs on
+    campaign_seed = 1
+    rng = get_stream(campaign_seed, batch_num)
 
     # Run simulations
     num_radial_bins = 200
@@ -180,67 +300,83 @@ def run_parallel_sims(params):
     velocity_bins = np.linspace(-vel, vel, num_velocity_bins)
     num_sims = 420
     final_positions = []
-    for i in range(num_sims):
-        # Define particle velocity
-        z_unit = np.random.uniform(-1.0, 1.0)
-        xy_plane = np.sqrt(1 - z_unit ** 2)
-        phi = np.random.uniform(0.0, 2 * np.pi)
-        velocity = np.asarray([xy_plane * np.cos(phi), xy_plane * np.sin(phi), z_unit]) * vel
-
-        # Generate particle position
-        z_unit = np.random.uniform(-1.0, 1.0)
-        xy_plane = np.sqrt(1 - z_unit ** 2)
-        phi = np.random.uniform(0.0, 2 * np.pi)
-        position = np.asarray([xy_plane * np.cos(phi), xy_plane * np.sin(phi), z_unit]) * np.random.uniform(0.0, 3.0 * radius / 16.0)
-
-        # Generate particle
-        particle = PICParticle(9.1e-31, 1.6e-19, position, velocity)
-
-        # Run simulation
-        t, x, y, z, v_x, v_y, v_z, escaped = run_simulation((b_field, particle, radius, loop_offset * radius, I, dI_dt))
-
-        # Save final position output
-        if get_final_state:
-            final_positions.append([t[-1], x[-1], y[-1], z[-1], escaped])
-
-        # Change coordinate system
-        if get_histograms:
-            radial_position = np.sqrt(x ** 2 + y ** 2 + z ** 2)
-            if use_cartesian_reference_frame:
-                particle_position_count, particle_velocity_count = get_particle_count(radial_bins, velocity_bins, radial_position, v_x, v_y, v_z)
-            else:
-                r_unit = np.zeros((3, x.shape[0]))
-                r_unit[0, :] = x
-                r_unit[1, :] = y
-                r_unit[2, :] = z
-                r_unit /= np.sqrt(x ** 2 + y ** 2 + z ** 2)
-
-                xy_unit = np.zeros((3, x.shape[0]))
-                xy_unit[0, :] = x
-                xy_unit[1, :] = y
-                xy_unit /= np.sqrt(np.sum(xy_unit ** 2, axis=0))
-
-                latitude_unit = np.zeros(xy_unit.shape)
-                latitude_unit[0] = xy_unit[1, :]
-                latitude_unit[1] = -xy_unit[0, :]
-                latitude_unit[2] = 0.0
-
-                longitude_unit = np.zeros((3, x.shape[0]))
-                longitude_unit[0, :] = r_unit[1, :] * latitude_unit[2, :] - r_unit[2] * latitude_unit[1]
-                longitude_unit[1, :] = r_unit[2, :] * latitude_unit[0, :] - r_unit[0] * latitude_unit[2]
-                longitude_unit[2, :] = r_unit[0, :] * latitude_unit[1, :] - r_unit[1] * latitude_unit[0]
-
-                v_r = v_x * r_unit[0, :] + v_y * r_unit[1, :] + v_z * r_unit[2, :]
-                v_lat = v_x * latitude_unit[0, :] + v_y * latitude_unit[1, :] + v_z * latitude_unit[2, :]
-                v_long = v_x * longitude_unit[0, :] + v_y * longitude_unit[1, :] + v_z * longitude_unit[2, :]
-
-                particle_position_count, particle_velocity_count = get_particle_count(radial_bins, velocity_bins, radial_position, v_r, v_lat, v_long)
-
-            # Get probability of electron in radial spacings in sim
-            total_particle_position_count += particle_position_count
-            total_particle_velocity_count_x += particle_velocity_count[0, :, :]
-            total_particle_velocity_count_y += particle_velocity_count[1, :, :]
-            total_particle_velocity_count_z += particle_velocity_count[2, :, :]
+    particles = []
+
+    # Inject the same number of particles over a single steady state simulation, with time averaged distributions in
+    # the spherical reference frame
+    if use_steady_state_injection:
+        assert get_histograms and not get_final_state and not use_cartesian_reference_frame
+        injection_rate = num_sims / (1e5 * 1e-9 * radius)
+        radial_bins, velocity_bins, position_count, velocity_count, _ = run_steady_state_simulation(
+            (b_field, radius, loop_offset * radius, I, electron_energy, injection_rate, num_sims, num_radial_bins,
+             num_velocity_bins), rng)
+        total_particle_position_count[:-1] = position_count
+        total_particle_velocity_count_x[:-1] = velocity_count[0]
+        total_particle_velocity_count_y[:-1] = velocity_count[1]
+        total_particle_velocity_count_z[:-1] = velocity_count[2]
+    else:
+        # Define particle velocities and positions
+        velocities = mono_energetic_velocities(rng, num_sims, vel)
+        positions = shell_positions(rng, num_sims, 0.0, 3.0 * radius / 16.0, uniform_in_volume=False)
+        for i in range(num_sims):
+            # Generate particle
+            particle = PICParticle(9.1e-31, 1.6e-19, positions[i], velocities[i])
+
+            # Only escape events are needed for the final state, so particles are run together after the loop
+            if not get_histograms:
+                particles.append(particle)
+                continue
+
+            # Run simulation
+            t, x, y, z, v_x, v_y, v_z, escaped = run_simulation((b_field, particle, radius, loop_offset * radius, I, dI_dt), timer)
+
+            # Save final position output
+            if get_final_state:
+                final_positions.append([t[-1], x[-1], y[-1], z[-1], escaped])
+
+            # Change coordinate system
+            if get_histograms:
+                radial_position = np.sqrt(x ** 2 + y ** 2 + z ** 2)
+                if use_cartesian_reference_frame:
+                    particle_position_count, particle_velocity_count = get_particle_count(radial_bins, velocity_bins, radial_position, v_x, v_y, v_z)
+                else:
+                    r_unit = np.zeros((3, x.shape[0]))
+                    r_unit[0, :] = x
+                    r_unit[1, :] = y
+                    r_unit[2, :] = z
+                    r_unit /= np.sqrt(x ** 2 + y ** 2 + z ** 2)
+
+                    xy_unit = np.zeros((3, x.shape[0]))
+                    xy_unit[0, :] = x
+                    xy_unit[1, :] = y
+                    xy_unit /= np.sqrt(np.sum(xy_unit ** 2, axis=0))
+
+                    latitude_unit = np.zeros(xy_unit.shape)
+                    latitude_unit[0] = xy_unit[1, :]
+                    latitude_unit[1] = -xy_unit[0, :]
+                    latitude_unit[2] = 0.0
+
+                    longitude_unit = np.zeros((3, x.shape[0]))
+                    longitude_unit[0, :] = r_unit[1, :] * latitude_unit[2, :] - r_unit[2] * latitude_unit[1]
+                    longitude_unit[1, :] = r_unit[2, :] * latitude_unit[0, :] - r_unit[0] * latitude_unit[2]
+                    longitude_unit[2, :] = r_unit[0, :] * latitude_unit[1, :] - r_unit[1] * latitude_unit[0]
+
+                    v_r = v_x * r_unit[0, :] + v_y * r_unit[1, :] + v_z * r_unit[2, :]
+                    v_lat = v_x * latitude_unit[0, :] + v_y * latitude_unit[1, :] + v_z * latitude_unit[2, :]
+                    v_long = v_x * longitude_unit[0, :] + v_y * longitude_unit[1, :] + v_z * longitude_unit[2, :]
+
+                    particle_position_count, particle_velocity_count = get_particle_count(radial_bins, velocity_bins, radial_position, v_r, v_lat, v_long)
+
+                # Get probability of electron in radial spacings in sim
+                total_particle_position_count += particle_position_count
+                total_particle_velocity_count_x += particle_velocity_count[0, :, :]
+                total_particle_velocity_count_y += particle_velocity_count[1, :, :]
+                total_particle_velocity_count_z += particle_velocity_count[2, :, :]
+                timer.lap("histograms")
+
+    if not get_histograms:
+        times, X, escaped = run_ensemble_simulation((b_field, particles, radius, loop_offset * radius, I, dI_dt), timer)
+        final_positions = np.concatenate((times[:, np.newaxis], X, escaped[:, np.newaxis]), axis=1)
 
     # Save results to file
     if get_histograms:
@@ -254,6 +390,7 @@ def run_parallel_sims(params):
         final_state_output_path = os.path.join(output_dir, "final_state-current-{}-radius-{}-energy-{}-batch-{}.txt".format(I, radius, electron_energy, batch_num))
         np.savetxt(final_state_output_path,  np.asarray(final_positions))
 
+    timer.report()
     print("Finished process: {}".format(process_name))
 
 
@@ -69,14 +69,14 @@ def test_aligned_fields():
     :return:
     """
     seed = 1
-    np.random.seed(seed)
+    rng = np.random.default_rng(seed)
     for direction in [np.asarray([1.0, 0.0, 0.0]), np.asarray([0.0, 1.0, 0.0]), np.asarray([0.0, 0.0, 1.0])]:
         for sign in [-1, 1]:
             # randomise initial conditions
-            B_mag = np.random.uniform(low=0.0, high=1.0)
-            E_mag = np.random.uniform(low=0.0, high=1.0)
-            X_0 = np.random.uniform(low=-1.0, high=1.0, size=(1, 3))
-            V_0 = np.random.uniform(low=-1.0, high=1.0, size=(1, 3))
+            B_mag = rng.uniform(low=0.0, high=1.0)
+            E_mag = rng.uniform(low=0.0, high=1.0)
+            X_0 = rng.uniform(low=-1.0, high=1.0, size=(1, 3))
+            V_0 = rng.uniform(low=-1.0, high=1.0, size=(1, 3))
 
             def B_field(x):
                 B = np.zeros(x.shape)
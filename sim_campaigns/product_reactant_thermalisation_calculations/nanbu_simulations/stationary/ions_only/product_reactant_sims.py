@@ -16,15 +16,19 @@ from plasma_physics.pysrc.theory.coulomb_collisions.relaxation_processes import
 from plasma_physics.pysrc.utils.unit_conversions import UnitConversions
 from plasma_physics.pysrc.utils.physical_constants import PhysicalConstants
 from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.abe_collison_model import AbeCoulombCollisionModel
-from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.nanbu_collision_model import NanbuCollisionModel
+from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.nanbu_ensemble_collision_model import NanbuEnsembleCollisionModel
+from plasma_physics.pysrc.simulation.coulomb_collisions.collision_models.diagnostics import SpeciesMoments
 
 
 
 def generate_sim_results(number_densities, T):
     # Set simulation independent parameters
     N = int(1e3)
-    dt_factor = 0.01
+    # A power of two, so that the final time of each number density is an exact multiple of its time step
+    dt_factor = 1.0 / 128
     w_1 = int(1)
+    # A single generator for the whole scan, so that the background of each number density is an independent sample
+    rng = np.random.default_rng(1)
     
     # Make results directory if it does not exist
     res_dir = "results"
@@ -44,34 +48,30 @@ def generate_sim_results(number_densities, T):
         t_theory[name] = np.zeros(number_densities.shape)
         energy_results[name] = []
         velocity_results[name] = []
-        for i, n in enumerate(number_densities):
-            print("Number density: {}".format(n))
 
-            # Set up beam sim
-            if "product" == name:
-                p_1 = ChargedParticle(6.64424e-27, 2 * PhysicalConstants.electron_charge)
-                energy = 3.5e6 * PhysicalConstants.electron_charge
-            elif "reactant" == name:
-                p_1 = ChargedParticle(2.014102 * UnitConversions.amu_to_kg, PhysicalConstants.electron_charge)
-                energy = 50e3 * PhysicalConstants.electron_charge
-            else:
-                raise ValueError()
-            beam_velocity = np.sqrt(2 * energy / p_1.m)
-            p_2 = ChargedParticle(2.014102 * UnitConversions.amu_to_kg, PhysicalConstants.electron_charge)
-
-            # Instantiate simulation
+        # Set up beam sim
+        if "product" == name:
+            p_1 = ChargedParticle(6.64424e-27, 2 * PhysicalConstants.electron_charge)
+            energy = 3.5e6 * PhysicalConstants.electron_charge
+        elif "reactant" == name:
+            p_1 = ChargedParticle(2.014102 * UnitConversions.amu_to_kg, PhysicalConstants.electron_charge)
+            energy = 50e3 * PhysicalConstants.electron_charge
+        else:
+            raise ValueError()
+        beam_velocity = np.sqrt(2 * energy / p_1.m)
+        p_2 = ChargedParticle(2.014102 * UnitConversions.amu_to_kg, PhysicalConstants.electron_charge)
+
+        # Set up velocities and time scales of each number density
+        particle_numbers = np.asarray([N, N])
+        weights = np.zeros((number_densities.shape[0], 2))
+        velocities = np.zeros((number_densities.shape[0], 2 * N, 3))
+        for i, n in enumerate(number_densities):
             w_2 = int(n / N)
-            particle_numbers = np.asarray([N, N])
-            sim = NanbuCollisionModel(particle_numbers, np.asarray([p_1, p_2]), np.asarray([w_1, w_2]), 
-                                      coulomb_logarithm=10.0, frozen_species=np.asarray([False, False]))
-
-            # Set up velocities
-            velocities = np.zeros((2 * N, 3))
-            velocities[:N, :] = np.asarray([0.0, 0.0, beam_velocity])
+            weights[i, :] = [w_1, w_2]
+            velocities[i, :N, :] = np.asarray([0.0, 0.0, beam_velocity])
             k_T = T * PhysicalConstants.boltzmann_constant
             sigma = np.sqrt(2 * k_T / p_2.m)
-            background_velocities = np.random.normal(loc=0.0, scale=sigma, size=velocities[N:2*N, :].shape) / np.sqrt(3)
-            velocities[N:2*N, :] = background_velocities
+            velocities[i, N:2*N, :] = rng.normal(loc=0.0, scale=sigma, size=(N, 3)) / np.sqrt(3)
 
             # Get approximate time scale
             impact_parameter_ratio = 1.0    # Is not necessary for this analysis
@@ -80,19 +80,29 @@ def generate_sim_results(number_densities, T):
                                                   beam_velocity)
             reactant_relaxation = MaxwellianRelaxationProcess(reactant_collision)
             deuterium_kinetic_frequency = reactant_relaxation.numerical_kinetic_loss_maxwellian_frequency(N * w_2, T, beam_velocity)
-            tau = 1.0 / deuterium_kinetic_frequency
-            dt = dt_factor * tau
-            final_time = 4.0 * tau
+            t_theory[name][i] = 1.0 / deuterium_kinetic_frequency
 
-            t, v_results = sim.run_sim(velocities, dt, final_time)
+        # Run all number densities in a single ensemble, as each replica takes the same number of steps. Only the mean
+        # speeds of each species are recorded, rather than the full velocity history
+        sim = NanbuEnsembleCollisionModel(particle_numbers, np.asarray([p_1, p_2]), weights, 10.0,
+                                          frozen_species=np.asarray([False, False]), rng=rng)
+        dt = dt_factor * t_theory[name]
+        final_time = 4.0 * t_theory[name]
+        moments = [[SpeciesMoments([p_1.m, p_2.m], particle_numbers)] for _ in number_densities]
+        sim.run_sim(velocities, dt, final_time, diagnostics=moments, history_interval=None)
+
+        for i, n in enumerate(number_densities):
+            print("Number density: {}".format(n))
+            moment_results = moments[i][0].get_results()
+            t = moment_results["time"]
 
             # Get salient results
-            velocities = np.mean(np.sqrt(v_results[:N, 0, :] ** 2 + v_results[:N, 1, :] ** 2 + v_results[:N, 2, :] ** 2), axis=0)
-            energies = 0.5 * p_1.m * velocities ** 2
+            velocities = moment_results["mean_speed"][:, 0]
+            energies = moment_results["energy"][:, 0]
             velocity_results[name].append(velocities)
             energy_results[name].append(energies)
-            velocities_deuterium = np.mean(np.sqrt(v_results[N:2*N, 0, :] ** 2 + v_results[N:2*N, 1, :] ** 2 + v_results[N:2*N, 2, :] ** 2), axis=0)
-            energies_deuterium = 0.5 * p_2.m * np.mean(np.sqrt(v_results[N:2*N, 0, :] ** 2 + v_results[N:2*N, 1, :] ** 2 + v_results[N:2*N, 2, :] ** 2), axis=0)
+            velocities_deuterium = moment_results["mean_speed"][:, 1]
+            energies_deuterium = moment_results["energy"][:, 1]
 
             # Plot results
             fig, ax = plt.subplots(2)
@@ -110,7 +120,6 @@ def generate_sim_results(number_densities, T):
             energy_time_interpolator = interp1d(energies / energy, t)
             t_half = energy_time_interpolator(0.5)
             t_halves[name][i] = t_half
-            t_theory[name][i] = tau
 
 
         # Save results
@@ -110,10 +110,11 @@ def generate_sim_results(number_densities, reactant_name, plot_individual_sims=F
             # Small maxwellian distribution used for background species
             k_T = T_b * PhysicalConstants.boltzmann_constant
             sigma = np.sqrt(2 * k_T / p_2.m)
-            p_2_velocities = np.random.normal(loc=0.0, scale=sigma, size=velocities[N:2*N, :].shape) / np.sqrt(3)
+            rng = np.random.default_rng(1)
+            p_2_velocities = rng.normal(loc=0.0, scale=sigma, size=velocities[N:2*N, :].shape) / np.sqrt(3)
             velocities[N:2*N, :] = p_2_velocities
             sigma = np.sqrt(2 * k_T / electron.m)
-            electron_velocities = np.random.normal(loc=0.0, scale=sigma, size=velocities[2*N:, :].shape) / np.sqrt(3)
+            electron_velocities = rng.normal(loc=0.0, scale=sigma, size=velocities[2*N:, :].shape) / np.sqrt(3)
             velocities[2*N:, :] = electron_velocities
 
             # Get approximate time scale
@@ -60,7 +60,8 @@ def generate_sim_results(number_densities, T):
             # Set up background velocities
             k_T = PhysicalConstants.boltzmann_constant * T
             sigma = np.sqrt(2 * k_T / p_2.m)
-            maxwell_velocities = np.random.normal(loc=0.0, scale=sigma, size=velocities[N:, :].shape) / np.sqrt(3)
+            rng = np.random.default_rng(1)
+            maxwell_velocities = rng.normal(loc=0.0, scale=sigma, size=velocities[N:, :].shape) / np.sqrt(3)
             velocities[N:] = maxwell_velocities
 
             # Get approximate time scale